@@ -1,4 +1,19 @@
-from .models import *
-from .views import *
-from .controllers import *
-from .main import *
\ No newline at end of file
+import importlib
+import importlib.util
+
+# Submodules are loaded on first access rather than at import, so
+# ``from App.database import db`` does not drag in every view and controller.
+# ``from App import X`` keeps working for names the old star imports exposed.
+_LAZY_MODULES = ("models", "controllers", "views", "main")
+
+
+def __getattr__(name):
+    if importlib.util.find_spec(f"{__name__}.{name}") is not None:
+        return importlib.import_module(f"{__name__}.{name}")
+    for module in _LAZY_MODULES:
+        module = importlib.import_module(f"{__name__}.{module}")
+        if hasattr(module, name):
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,6 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity, get_current_user
 
 
 def role_required(*roles):
@@ -16,6 +16,19 @@ def role_required(*roles):
     return wrapper
 
 
+def admin_required(fn):
+    """Only accounts made admins with ``flask user create_admin``. Read from
+    the database on each request, not from the token."""
+    @wraps(fn)
+    def inner(*a, **k):
+        verify_jwt_in_request()
+        user = get_current_user()
+        if user is None or not user.is_admin:
+            return jsonify({"error": {"code": "forbidden", "message": "admins only"}}), 403
+        return fn(*a, **k)
+    return inner
+
+
 def current_user_id():
     identity = get_jwt_identity()
     try:
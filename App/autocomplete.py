@@ -0,0 +1,125 @@
+"""In-memory prefix index over street and area names.
+
+Every word of a name is a key (``"upper warner street"``, ``"warner street"``,
+``"street"``), kept in one sorted list, so a lookup is a ``bisect`` to the
+first key at or after the typed prefix and a short scan while keys still
+start with it. Nothing touches the database on a lookup.
+
+The index is built when the app starts and rebuilt, in one query, on the
+first lookup after a commit writes to ``street`` or ``area``; on Postgres the
+domain event bus carries that to every worker (see ``App.events``). As with
+other caches keyed on data versions it is also rebuilt every
+``AUTOCOMPLETE_MAX_AGE`` seconds in case an event was missed.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app
+from sqlalchemy import exc
+
+from App.database import db, data_version
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_DEFAULTS = {
+    "AUTOCOMPLETE_MAX_AGE": 300,
+}
+
+TABLES = ("street", "area")
+STREET, AREA = "street", "area"
+
+
+class PrefixIndex:
+
+    def __init__(self, entries=()):
+        """``entries`` are ``(kind, id, name, area_id)`` tuples."""
+        keyed = []
+        for entry in entries:
+            words = entry[2].casefold().split()
+            for start in range(len(words)):
+                # start == 0 marks a match on the whole name, which ranks first
+                keyed.append((" ".join(words[start:]), start > 0, entry))
+        keyed.sort(key=lambda row: row[:2])
+        self._keys = [key for key, _, _ in keyed]
+        self._rows = [(inner, entry) for _, inner, entry in keyed]
+
+    def __len__(self):
+        return len({entry for _, entry in self._rows})
+
+    def search(self, prefix, limit=10, kind=None, area_id=None):
+        prefix = " ".join(prefix.casefold().split())
+        if not prefix:
+            return []
+        found, whole = {}, 0
+        position = bisect_left(self._keys, prefix)
+        # Keys are in order, so once ``limit`` whole-name matches are found
+        # nothing further along can outrank them
+        while position < len(self._keys) and self._keys[position].startswith(prefix) and whole < limit:
+            inner, entry = self._rows[position]
+            position += 1
+            if (kind and entry[0] != kind) or (area_id is not None and entry[3] != area_id):
+                continue
+            if found.get(entry, True) and not inner:
+                whole += 1
+            found[entry] = found.get(entry, True) and inner
+        ranked = sorted(found, key=lambda entry: (found[entry], entry[2].casefold()))
+        return ranked[:limit]
+
+
+class NameIndex:
+    """The app's ``PrefixIndex``, rebuilt when the tables change."""
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._index = PrefixIndex()
+        self._version = None
+        self._built = 0.0
+        self._lock = threading.Lock()
+
+    def _stale(self):
+        return self._version != data_version(*TABLES) or time.monotonic() - self._built > self.max_age
+
+    def rebuild(self):
+        # Read the version first: a commit landing mid-build then triggers
+        # another rebuild rather than being missed
+        version = data_version(*TABLES)
+        entries = [(AREA, area_id, name, area_id) for area_id, name in
+                   db.session.execute(db.text("SELECT id, name FROM area"))]
+        entries += [(STREET, street_id, name, area_id) for street_id, name, area_id in
+                    db.session.execute(db.text('SELECT id, name, "areaId" FROM street'))]
+        self._index, self._version, self._built = PrefixIndex(entries), version, time.monotonic()
+
+    def search(self, prefix, limit=10, kind=None, area_id=None):
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self.rebuild()
+        return self._index.search(prefix, limit, kind, area_id)
+
+
+def get_name_index(app=None):
+    return (app or current_app).extensions["name_index"]
+
+
+def suggest(prefix, limit=10, kind=None, area_id=None):
+    """Top ``limit`` streets and areas with a word starting with ``prefix``,
+    names that start with it first."""
+    return [
+        {"type": kind_, "id": id_, "name": name, "areaId": area}
+        for kind_, id_, name, area in get_name_index().search(prefix, limit, kind, area_id)
+    ]
+
+
+def init_autocomplete(app):
+    index = NameIndex(float(app.config["AUTOCOMPLETE_MAX_AGE"]))
+    app.extensions["name_index"] = index
+    with app.app_context():
+        try:
+            index.rebuild()
+        except exc.DBAPIError:
+            # No tables yet (a fresh database); built on first use instead
+            logger.info("Street names not indexed at startup")
+        finally:
+            db.session.remove()
@@ -0,0 +1,99 @@
+import importlib
+import os
+import sys
+
+import click
+
+from App.models import User, Driver, Resident
+
+
+class LazyGroup(click.Group):
+    """Stand-in for a CLI group that imports the real one on first use, so
+    ``flask --help`` and unrelated commands skip its controller imports."""
+
+    def __init__(self, name, import_path, **kwargs):
+        super().__init__(name, **kwargs)
+        self.import_path = import_path
+        self._group = None
+
+    def _load(self):
+        if self._group is None:
+            module, attr = self.import_path.split(":")
+            self._group = getattr(importlib.import_module(module), attr)
+        return self._group
+
+    def list_commands(self, ctx):
+        return self._load().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._load().get_command(ctx, name)
+
+
+COMMAND_GROUPS = {
+    "user": ("App.commands.user:user_cli", "User object commands"),
+    "driver": ("App.commands.driver:driver_cli", "Driver object commands"),
+    "resident": ("App.commands.resident:resident_cli", "Resident object commands"),
+    "export": ("App.commands.export:export_cli", "Bulk data export commands"),
+    "sync": ("App.commands.sync:sync_cli", "Delta sync commands"),
+    "assets": ("App.commands.assets:assets_cli", "Static asset commands"),
+    "test": ("App.commands.test:test", "Testing commands"),
+}
+
+# Commands that only need config and the database, see create_app(web=False)
+SLIM_COMMANDS = {"init", "db", *COMMAND_GROUPS}
+
+# flask's own options that take a value, skipped when finding the subcommand
+_VALUE_OPTIONS = {"-A", "--app", "-e", "--env-file"}
+
+
+def invoked_command(argv=None):
+    """Name of the ``flask`` subcommand being run, or None outside the CLI."""
+    if os.environ.get("FLASK_RUN_FROM_CLI") != "true":
+        return None
+    args = iter((argv if argv is not None else sys.argv)[1:])
+    for arg in args:
+        if arg in _VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def init():
+    from App.controllers.initialize import initialize
+
+    initialize()
+    print('Welcome to the Bread Van App!')
+    print("For documentation, visit: https://github.com/WGP-Industries/Bread_Van")
+
+
+def register_commands(app):
+    app.cli.command("init", help="Creates and initializes the database")(init)
+    for name, (import_path, help) in COMMAND_GROUPS.items():
+        app.cli.add_command(LazyGroup(name, import_path, help=help))
+
+
+def require_driver():
+    user = User.query.filter_by(logged_in=True).first()
+    if not user:
+        print("Must be logged in first.")
+        return None
+
+    if isinstance(user, Driver):
+        return user
+
+    print("Must be logged in as a driver to perform this action.")
+    return None
+
+
+def require_resident():
+    user = User.query.filter_by(logged_in=True).first()
+    if not user:
+        print("Must be logged in first.")
+        return None
+
+    if isinstance(user, Resident):
+        return user
+
+    print("Must be logged in as a resident to perform this action.")
+    return None
@@ -0,0 +1,16 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from App.middleware import compress_static_files
+
+
+assets_cli = AppGroup('assets', help='Static asset commands')
+
+
+@assets_cli.command("compress", help="Write .gz/.br copies of compressible static files")
+def compress_command():
+    written = compress_static_files(current_app.static_folder)
+    for path in written:
+        print(path)
+    print(f"Wrote {len(written)} precompressed files.")
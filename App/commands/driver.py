@@ -0,0 +1,265 @@
+import click
+from flask.cli import AppGroup
+
+from App.models import Area, Street
+from App.controllers.driver import (
+    driver_schedule_drive,
+    driver_cancel_drive,
+    driver_update_drive_eta,
+    driver_view_drives,
+    driver_start_drive,
+    driver_end_drive,
+    driver_view_requested_stops,
+    create_driver,
+    delete_driver,
+    driver_update_drive_menu
+)
+from App.controllers.schedule import create_schedule, materialize_schedules
+from App.controllers.inventory import load_drive_stock, expire_reservations
+from App.controllers.forecast import train_forecasts
+from App.controllers.dispatch import plan_dispatch, VAN_CAPACITY, TIME_LIMIT
+
+from . import require_driver
+
+
+driver_cli = AppGroup('driver', help='Driver object commands')
+
+@driver_cli.command("create_driver", help="Creates a driver")
+@click.argument("username")
+@click.argument("password")
+def create_driver_command(username, password):
+    try:
+        driver = create_driver(username, password)
+        print(f"Driver {driver.username} created!")
+    except ValueError as e:
+        print(str(e))
+
+
+        
+
+
+
+@driver_cli.command("schedule_drive", help="Schedule a drive")
+@click.argument("date_str")
+@click.argument("time_str")
+def schedule_drive_command(date_str, time_str):
+    driver = require_driver()
+    if not driver:
+        return
+    # Area/street selection logic remains in CLI for user prompts
+    areas = Area.query.all()
+    if not areas:
+        print("No areas available. Please create an area first.")
+        return
+    print("\nAvailable Areas:")
+    for i, area in enumerate(areas, start=1):
+        print(f"{i}. {area.name}")
+    chosen_area_index = click.prompt("Select an area by number", type=int)
+    if chosen_area_index < 1 or chosen_area_index > len(areas):
+        print("Invalid area choice.")
+        return
+    chosen_area = areas[chosen_area_index - 1]
+    streets = Street.query.filter_by(areaId=chosen_area.id).all()
+    if not streets:
+        print("No streets available in the selected area. Please create a street first.")
+        return
+    print(f"\nAvailable Streets in {chosen_area.name}:")
+    for i, street in enumerate(streets, start=1):
+        print(f"{i}. {street.name}")
+    chosen_index = click.prompt("Select a street by number", type=int)
+    if chosen_index < 1 or chosen_index > len(streets):
+        print("Invalid street choice.")
+        return
+    chosen_street = streets[chosen_index - 1]
+    
+    # Get optional menu and ETA
+    menu = click.prompt("Enter menu items (optional - press Enter to skip)", default="", show_default=False)
+    eta_str = click.prompt("Enter ETA (optional - format HH:MM, press Enter to skip)", default="", show_default=False)
+    
+    menu = menu if menu else None
+    eta_str = eta_str if eta_str else None
+    
+    try:
+        new_drive = driver_schedule_drive(driver, chosen_area.id, chosen_street.id, date_str, time_str, menu, eta_str)
+        print(f"\nDrive scheduled for {date_str} at {time_str} on {chosen_street.name}, {chosen_area.name}")
+        if menu:
+            print(f"Menu: {menu}")
+        if eta_str:
+            print(f"ETA: {eta_str}")
+    except ValueError as e:
+        print(str(e))
+
+
+@driver_cli.command("schedule_weekly", help="Schedule a weekly drive, e.g. schedule_weekly 1 2 MO,TH 09:30")
+@click.argument("area_id", type=int)
+@click.argument("street_id", type=int)
+@click.argument("weekdays")
+@click.argument("time_str")
+@click.option("--interval", type=int, default=1, help="Run every N weeks")
+@click.option("--until", default=None, help="Last date, YYYY-MM-DD")
+@click.option("--menu", default=None)
+def schedule_weekly_command(area_id, street_id, weekdays, time_str, interval, until, menu):
+    driver = require_driver()
+    if not driver:
+        return
+    try:
+        schedule = create_schedule(driver, area_id, street_id, weekdays.split(","), time_str,
+                                   menu=menu, until=until, interval=interval)
+        print(f"Schedule {schedule.id} created: {schedule.rrule} at {time_str}")
+    except ValueError as e:
+        print(str(e))
+
+
+@driver_cli.command("materialize_schedules", help="Create drives for all weekly schedules up to the horizon")
+def materialize_schedules_command():
+    created = materialize_schedules()
+    print(f"Created {len(created)} drives from schedules.")
+
+
+@driver_cli.command("load_stock", help="Load your current stock onto a drive")
+@click.argument("drive_id", type=int)
+def load_stock_command(drive_id):
+    driver = require_driver()
+    if not driver:
+        return
+    try:
+        for row in load_drive_stock(driver, drive_id):
+            print(f"{row['name']:<20} loaded {row['loaded']:<5} available {row['available']:<5} reserved {row['held']}")
+    except ValueError as e:
+        print(str(e))
+
+
+@driver_cli.command("expire_reservations", help="Return unclaimed reservations past their expiry to stock")
+def expire_reservations_command():
+    expired = expire_reservations()
+    print(f"Expired {expired} reservations.")
+
+
+@driver_cli.command("train_forecasts", help="Refit demand forecasts from all completed drives")
+def train_forecasts_command():
+    used = train_forecasts()
+    print(f"Trained demand forecasts on {used} completed drives.")
+
+
+@driver_cli.command("plan_dispatch", help="Split the day's streets with demand between the available drivers")
+@click.argument("date", required=False)
+@click.option("--capacity", type=int, default=VAN_CAPACITY, show_default=True, help="Stops per van")
+@click.option("--time-limit", type=float, default=TIME_LIMIT, show_default=True, help="Seconds to improve the plan")
+def plan_dispatch_command(date, capacity, time_limit):
+    try:
+        plan = plan_dispatch(date, capacity, time_limit)
+    except ValueError as e:
+        print(str(e))
+        return
+    print(f"{plan['date']}: {plan['served']} of {plan['stops']} expected stops served")
+    for van in plan["vans"]:
+        streets = ", ".join(map(str, van["streetIds"])) or "-"
+        print(f"Driver {van['driverId']:<5} {van['stops']:>4} stops {van['route_m']:>7} m  streets {streets}")
+    for street in plan["unserved"]:
+        print(f"Unserved street {street['streetId']} ({street['stops']} stops)")
+
+
+@driver_cli.command("cancel_drive", help="Cancel a drive")
+@click.argument("drive_id", type=int)
+def cancel_drive_command(drive_id):
+    driver = require_driver()
+    if not driver:
+        return
+    driver_cancel_drive(driver, drive_id)
+    print(f"Drive {drive_id} cancelled.")
+
+
+@driver_cli.command("update_drive_menu", help="Update menu for a drive")
+@click.argument("drive_id", type=int)
+@click.argument("menu")
+def update_drive_menu_command(drive_id, menu):
+    driver = require_driver()
+    if not driver:
+        return
+    try:
+        updated_drive = driver_update_drive_menu(driver, drive_id, menu)
+        print(f"Menu updated for drive {drive_id}")
+        print(f"New menu: {menu}")
+    except ValueError as e:
+        print(str(e))
+
+@driver_cli.command("update_drive_eta", help="Update ETA for a drive")
+@click.argument("drive_id", type=int)
+@click.argument("eta_str")
+def update_drive_eta_command(drive_id, eta_str):
+    driver = require_driver()
+    if not driver:
+        return
+    try:
+        updated_drive = driver_update_drive_eta(driver, drive_id, eta_str)
+        print(f"ETA updated for drive {drive_id}")
+        print(f"New ETA: {eta_str}")
+    except ValueError as e:
+        print(str(e))
+
+@driver_cli.command("view_my_drives", help="View driver's scheduled drives")
+def view_drives_command():
+    driver = require_driver()
+    if not driver:
+        return
+    drives = driver_view_drives(driver)
+    if not drives:
+        print("No scheduled drives.")
+        return
+    print("\nYour Scheduled Drives:")
+    print("-" * 100)
+    print(f"{'Drive ID':<10} {'Date':<12} {'Time':<8} {'Area':<20} {'Street':<20} {'Menu':<30}")
+    print("-" * 100)
+    for drive in drives:
+        date_str = drive.date.strftime("%Y-%m-%d")
+        time_str = drive.time.strftime("%H:%M")
+        menu_preview = drive.menu[:27] + "..." if drive.menu and len(drive.menu) > 30 else drive.menu
+        print(f"{drive.id:<10} {date_str:<12} {time_str:<8} {drive.area.name:<20} {drive.street.name:<20} {menu_preview or 'No menu':<30}")
+    print("\n")
+
+@driver_cli.command("start_drive", help="Start a drive")
+@click.argument("drive_id")
+def start_drive_command(drive_id):
+    driver = require_driver()
+    if not driver:
+        return
+    try:
+        driver_start_drive(driver, drive_id)
+        print(f"Drive {drive_id} has started.")
+    except ValueError as e:
+        print(str(e))
+
+@driver_cli.command("end_drive", help="End the current drive")
+def end_drive_command():
+    driver = require_driver()
+    if not driver:
+        return
+    try:
+        ended_drive = driver_end_drive(driver)
+        print(f"Drive {ended_drive.id} has ended.")
+    except ValueError as e:
+        print(str(e))
+
+@driver_cli.command("view_requested_stops", help="View requested stops for a drive")
+@click.argument("driveId")
+def view_requested_stops_command(driveId):
+    driver = require_driver()
+    if not driver:
+        return
+    stops = driver_view_requested_stops(driver, driveId)
+    if not stops:
+        print("No requested stops for this drive.")
+        return
+    print(f"\nRequested Stops from {stops[0].drive.street.name}, {stops[0].drive.area.name}:")
+    for stop in stops:
+        print(f"#{stop.resident.houseNumber} \tResident: {stop.resident.username}")
+
+@driver_cli.command("delete_driver", help="Deletes a driver")
+@click.argument("driver_id", type=int)
+def delete_driver_command(driver_id):
+
+    try:
+        driver = delete_driver(driver_id)
+        print(f"Driver {driver.username} deleted.")
+    except ValueError as e:
+        print(str(e))
@@ -0,0 +1,33 @@
+import click
+from flask.cli import AppGroup
+
+from App.controllers.export import export_lines, DATASETS
+
+
+export_cli = AppGroup('export', help='Bulk data export commands')
+
+
+def run_export(dataset, fmt, date_from, date_to, area_id, output):
+    try:
+        lines = export_lines(dataset, fmt, date_from, date_to, area_id)
+        with click.open_file(output, "w") as out:
+            for chunk in lines:
+                out.write(chunk)
+    except ValueError as e:
+        print(str(e))
+
+
+def export_command(dataset):
+    @export_cli.command(dataset, help=f"Stream {dataset} as NDJSON or CSV")
+    @click.option("--format", "fmt", type=click.Choice(["ndjson", "csv"]), default="ndjson")
+    @click.option("--from", "date_from", default=None, help="Start date YYYY-MM-DD")
+    @click.option("--to", "date_to", default=None, help="End date YYYY-MM-DD")
+    @click.option("--area-id", type=int, default=None)
+    @click.option("--output", "-o", default="-", help="File to write (default stdout)")
+    def command(fmt, date_from, date_to, area_id, output):
+        run_export(dataset, fmt, date_from, date_to, area_id, output)
+    return command
+
+
+for dataset in DATASETS:
+    export_command(dataset)
@@ -0,0 +1,369 @@
+import json
+
+import click
+from flask.cli import AppGroup
+
+from App.models import Area, Street, Drive
+from App.controllers.resident import (
+    resident_create,
+    resident_request_stop,
+    resident_cancel_stop,
+    resident_view_driver_stats,
+    resident_subscribe_to_drive,
+    resident_unsubscribe_from_drive,
+    resident_get_subscribed_drives,
+    resident_get_notifications,
+    resident_get_notification_stats,
+    resident_mark_notification_read,
+    resident_mark_all_notifications_read,
+    resident_clear_notifications,
+    resident_update_notification_preferences,
+    flush_notification_digests
+)
+from App.controllers.area import create_area, delete_area, set_area_boundary
+from App.controllers.street import create_street, delete_street, set_street_path
+
+from . import require_resident
+
+
+resident_cli = AppGroup('resident', help='Resident object commands')
+
+
+@resident_cli.command("create", help="Creates a resident")
+@click.argument("username")
+@click.argument("password")
+def create_resident_command(username, password):
+    areas = Area.query.all()
+    if not areas:
+        print("No areas available. Please create an area first.")
+        return
+    print("\nAvailable Areas:")
+    for i, area in enumerate(areas, start=1):
+        print(f"{i}. {area.name}")
+    chosen_area_index = click.prompt("Select an area by number", type=int)
+    if chosen_area_index < 1 or chosen_area_index > len(areas):
+        print("Invalid area choice.")
+        return
+    chosen_area = areas[chosen_area_index - 1]
+    streets = Street.query.filter_by(areaId=chosen_area.id).all()
+    if not streets:
+        print("No streets available in the selected area. Please create a street first.")
+        return
+    print(f"\nAvailable Streets in {chosen_area.name}:")
+    for i, street in enumerate(streets, start=1):
+        print(f"{i}. {street.name}")
+    chosen_index = click.prompt("Select a street by number", type=int)
+    if chosen_index < 1 or chosen_index > len(streets):
+        print("Invalid street choice.")
+        return
+    chosen_street = streets[chosen_index - 1]
+    house_number = click.prompt("Enter your house number", type=int)
+    resident = resident_create(username, password, chosen_area.id, chosen_street.id, house_number)
+    print(f"Resident {username} created at #{house_number} {chosen_street.name}, {chosen_area.name}")
+
+
+@resident_cli.command("add_area", help="Add a new area")
+@click.argument("name")
+def add_area_command(name):
+    resident = require_resident()
+    if not resident:
+        return
+
+    area = create_area(name)
+    print(f"Area '{area.name}' added.")
+
+
+
+
+@resident_cli.command("add_street", help="Add a new street to an area")
+@click.argument("area_id", type=int)
+@click.argument("name")
+def add_street_command(area_id, name):
+
+    resident = require_resident()
+    if not resident:
+        return
+  
+    try:
+        street = create_street(area_id, name)
+        area = Area.query.get(area_id)
+        print(f"Street '{street.name}' added to area '{area.name}'.")
+    except ValueError as e:
+        print(str(e))
+
+
+@resident_cli.command("set_area_boundary", help="Set an area's boundary polygon")
+@click.argument("area_id", type=int)
+@click.argument("points", required=False)
+def set_area_boundary_command(area_id, points):
+    """POINTS is a JSON list of [lat, lng]; leave it out to clear the boundary."""
+    resident = require_resident()
+    if not resident:
+        return
+
+    try:
+        area = set_area_boundary(area_id, json.loads(points) if points else None)
+        print(f"Boundary of '{area.name}' {'set' if area.boundary else 'cleared'}.")
+    except ValueError as e:
+        print(str(e))
+
+
+@resident_cli.command("set_street_path", help="Set a street's path as a polyline")
+@click.argument("street_id", type=int)
+@click.argument("points", required=False)
+def set_street_path_command(street_id, points):
+    """POINTS is a JSON list of [lat, lng]; leave it out to clear the path."""
+    resident = require_resident()
+    if not resident:
+        return
+
+    try:
+        street = set_street_path(street_id, json.loads(points) if points else None)
+        print(f"Path of '{street.name}' {'set' if street.path else 'cleared'}.")
+    except ValueError as e:
+        print(str(e))
+
+
+@resident_cli.command("delete_area", help="Delete an area")
+@click.argument("area_id", type=int)
+def delete_area_command(area_id):
+    resident_cli = require_resident()
+    if not resident_cli:
+        return  
+    
+
+    try:
+        area = delete_area(area_id)
+        print(f"Area '{area.name}' deleted.")
+    except ValueError as e:
+        print(str(e))
+
+
+@resident_cli.command("delete_street", help="Delete a street")
+@click.argument("street_id", type=int)
+def delete_street_command(street_id):
+    resident_cli = require_resident()
+    if not resident_cli:
+        return
+    try:
+        street = delete_street(street_id)
+        print(f"Street '{street.name}' deleted.")
+    except ValueError as e:
+        print(str(e))
+
+
+
+
+@resident_cli.command("request_stop", help="Requests a Stop from a drive on the resident's street")
+def request_stop_command():
+    resident = require_resident()
+    if not resident:
+        return
+    drives = Drive.query.filter(Drive.areaId == resident.areaId, Drive.on_street(resident.streetId),
+                                Drive.status == "Upcoming").all()
+    if not drives:
+        print("No scheduled drives to your street.")
+        return
+    print("\nScheduled Drives to your Street:")
+    print("-" * 50)
+    print(f"{'Drive ID':<10} {'Date':<12} {'Time':<8} {'Driver ID':<10}")
+    print("-" * 50)
+    for drive in drives:
+        date_str = drive.date.strftime("%Y-%m-%d")
+        time_str = drive.time.strftime("%H:%M")
+        print(f"{drive.id:<10} {date_str:<12} {time_str:<8} {drive.driverId:<20}")
+    print("\n")
+    chosen_drive = click.prompt("Select a drive by ID to request a stop", type=int)
+    try:
+        resident_request_stop(resident, chosen_drive)
+        print(f"Stop requested for drive {chosen_drive}.")
+    except ValueError as e:
+        print(str(e))
+
+@resident_cli.command("cancel_stop", help="Cancel a previously requested Stop from a drive")
+@click.argument("drive_id")
+def cancel_stop_command(drive_id):
+    resident = require_resident()
+    if not resident:
+        return
+    try:
+        resident_cancel_stop(resident, drive_id)
+        print(f"Stop for drive {drive_id} cancelled.")
+    except ValueError as e:
+        print(str(e))
+
+@resident_cli.command("view_inbox", help="View notifications in the resident's inbox")
+@click.option("--unread-only", is_flag=True, help="Show only unread notifications")
+def view_inbox_command(unread_only):
+    resident = require_resident()
+    if not resident:
+        return
+    notifications = resident_get_notifications(resident, unread_only=unread_only)
+    if not notifications:
+        print("Your inbox is empty." if not unread_only else "No unread notifications.")
+        return
+    
+    title = "UNREAD NOTIFICATIONS" if unread_only else "ALL NOTIFICATIONS"
+    print(f"\n{title}:")
+    print("=" * 80)
+    print(f"{'#':<3} {'Status':<6} {'Time':<19} {'Type':<15} {'Message'}")
+    print("=" * 80)
+    
+    for i, notif in enumerate(notifications, 1):
+        status = "Unread" if not notif.get('read', False) else "Read"
+        notif_type = notif.get('type', 'info')
+        timestamp = notif.get('timestamp', 'Unknown')
+        message = notif.get('message', 'No message')
+        
+        print(f"{i:<3} {status:<6} {timestamp:<19} {notif_type:<15} {message}")
+    
+    stats = resident_get_notification_stats(resident)
+    print(f"\nStatistics: {stats['total_notifications']} total, {stats['unread_notifications']} unread")
+
+@resident_cli.command("notification_stats", help="View notification statistics")
+def notification_stats_command():
+    resident = require_resident()
+    if not resident:
+        return
+    stats = resident_get_notification_stats(resident)
+    print(f"\nNotification Statistics for {resident.username}:")
+    print(f"   Total notifications: {stats['total_notifications']}")
+    print(f"   Unread notifications: {stats['unread_notifications']}")
+    print(f"   Notification preferences: {', '.join(stats['notification_preferences'])}")
+
+@resident_cli.command("mark_notification_read", help="Mark a specific notification as read")
+@click.argument("notification_index", type=int)
+def mark_notification_read_command(notification_index):
+    resident = require_resident()
+    if not resident:
+        return
+    try:
+        resident_mark_notification_read(resident, notification_index - 1)  
+        print(f"Notification #{notification_index} marked as read.")
+    except ValueError as e:
+        print(str(e))
+
+@resident_cli.command("mark_all_read", help="Mark all notifications as read")
+def mark_all_read_command():
+    resident = require_resident()
+    if not resident:
+        return
+    resident_mark_all_notifications_read(resident)
+    print("All notifications marked as read.")
+
+@resident_cli.command("clear_inbox", help="Clear all notifications")
+def clear_inbox_command():
+    resident = require_resident()
+    if not resident:
+        return
+    resident_clear_notifications(resident)
+    print("Inbox cleared.")
+
+@resident_cli.command("update_preferences", help="Update notification preferences")
+def update_preferences_command():
+    resident = require_resident()
+    if not resident:
+        return
+    
+    current_prefs = resident.notification_preferences
+    available_prefs = ["drive_scheduled", "menu_updated", "eta_updated", "stop_confirmed"]
+    
+    print(f"\nCurrent preferences: {current_prefs}")
+    print("\nAvailable notification types:")
+    for i, pref in enumerate(available_prefs, 1):
+        print(f"  {i}. {pref}")
+    
+    print("\nEnter the numbers of preferences you want (comma-separated):")
+    print("Example: 1,2,4 for drive_scheduled, menu_updated, stop_confirmed")
+    
+    try:
+        choices = click.prompt("Your choices", type=str)
+        chosen_indices = [int(x.strip()) for x in choices.split(',')]
+        
+        new_prefs = []
+        for idx in chosen_indices:
+            if 1 <= idx <= len(available_prefs):
+                new_prefs.append(available_prefs[idx-1])
+        
+        if not new_prefs:
+            print("No valid preferences selected.")
+            return
+            
+        resident_update_notification_preferences(resident, new_prefs)
+        print(f"Preferences updated to: {new_prefs}")
+        
+    except ValueError:
+        print("Invalid input. Please enter numbers separated by commas.")
+
+@resident_cli.command("view_driver_stats", help="View the status and location of a driver")
+@click.argument("driver_id")
+def view_driver_stats_command(driver_id):
+    resident = require_resident()
+    if not resident:
+        return
+    try:
+        driver = resident_view_driver_stats(resident, driver_id)
+        if driver.status == "Offline":
+            print(f"Driver {driver.username} is currently offline.")
+        elif driver.status == "Available":
+            area = Area.query.get(driver.areaId)
+            print(f"Driver {driver.username} is currently available at {area.name}")
+        elif driver.status == "Busy":
+            area = Area.query.get(driver.areaId)
+            street = Street.query.get(driver.streetId)
+            print(f"Driver {driver.username} is currently on a drive at {street.name}, {area.name}")
+    except ValueError as e:
+        print(str(e))
+
+
+@resident_cli.command("subscribe_drive", help="Subscribe to notifications for a drive")
+@click.argument("drive_id", type=int)
+def subscribe_drive_command(drive_id):
+    resident = require_resident()
+    if not resident:
+        return
+    try:
+        resident_subscribe_to_drive(resident, drive_id)
+        print(f"Subscribed to notifications for drive {drive_id}")
+    except ValueError as e:
+        print(str(e))
+
+@resident_cli.command("unsubscribe_drive", help="Unsubscribe from notifications for a drive")
+@click.argument("drive_id", type=int)
+def unsubscribe_drive_command(drive_id):
+    resident = require_resident()
+    if not resident:
+        return
+    try:
+        resident_unsubscribe_from_drive(resident, drive_id)
+        print(f"Unsubscribed from notifications for drive {drive_id}")
+    except ValueError as e:
+        print(str(e))
+
+@resident_cli.command("view_subscribed_drives", help="View drives you're subscribed to")
+def view_subscribed_drives_command():
+    resident = require_resident()
+    if not resident:
+        return
+    drives = resident_get_subscribed_drives(resident)
+    if not drives:
+        print("You are not subscribed to any drives.")
+        return
+    
+    print("\nYour Subscribed Drives:")
+    print("-" * 100)
+    print(f"{'Drive ID':<10} {'Date':<12} {'Time':<8} {'Area':<20} {'Street':<20} {'Menu':<30}")
+    print("-" * 100)
+    for drive in drives:
+        date_str = drive.date.strftime("%Y-%m-%d")
+        time_str = drive.time.strftime("%H:%M")
+        menu_preview = drive.menu[:27] + "..." if drive.menu and len(drive.menu) > 30 else drive.menu
+        eta_str = drive.eta.strftime("%H:%M") if drive.eta else "Not set"
+        print(f"{drive.id:<10} {date_str:<12} {time_str:<8} {drive.area.name:<20} {drive.street.name:<20} {menu_preview or 'No menu':<30}")
+    print("\n")
+
+@resident_cli.command("flush_digests", help="Deliver daily notification digests that are due")
+@click.option("--force", is_flag=True, help="Deliver all pending digests now")
+def flush_digests_command(force):
+    flushed = flush_notification_digests(force=force)
+    print(f"Delivered digests to {flushed} residents.")
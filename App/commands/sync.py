@@ -0,0 +1,14 @@
+import click
+from flask.cli import AppGroup
+
+from App.controllers.sync import prune_change_log
+
+
+sync_cli = AppGroup('sync', help='Delta sync commands')
+
+
+@sync_cli.command("prune", help="Delete change log rows older than --days")
+@click.option("--days", type=int, default=30)
+def prune_command(days):
+    removed = prune_change_log(days)
+    print(f"Removed {removed} change log rows older than {days} days.")
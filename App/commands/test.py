@@ -0,0 +1,20 @@
+import sys
+
+import click
+from flask.cli import AppGroup
+
+
+test = AppGroup('test', help='Testing commands')
+
+
+@test.command("user", help="Run User tests")
+@click.argument("type", default="all")
+def user_tests_command(type):
+    import pytest
+
+    if type == "unit":
+        sys.exit(pytest.main(["-k", "UserUnitTests"]))
+    elif type == "int":
+        sys.exit(pytest.main(["-k", "UserIntegrationTests"]))
+    else:
+        sys.exit(pytest.main(["-k", "App"]))
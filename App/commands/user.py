@@ -0,0 +1,152 @@
+import click
+from flask.cli import AppGroup
+
+from App.models import User
+from App.controllers.user import create_admin, get_all_users, user_login, user_logout, user_view_street_drives
+from App.controllers.area import get_all_areas, get_streets_in_area
+from App.controllers.street import get_all_streets
+
+
+user_cli = AppGroup('user', help='User object commands')
+
+
+@user_cli.command("login", help="Login to the Bread Van App")
+@click.argument("username", default="rob")
+@click.argument("password", default="robpass")
+def login_user_command(username, password):
+    logged_in_users = User.query.filter_by(logged_in=True).all()
+    for u in logged_in_users:
+        user_logout(u)
+    try:
+        user = user_login(username, password)
+        print(f"{user.type} {user.username} logged in!")
+    except ValueError as e:
+        print(str(e))
+
+
+@user_cli.command("create_admin", help="Creates an admin account")
+@click.argument("username")
+@click.argument("password")
+def create_admin_command(username, password):
+    if User.query.filter_by(username=username).first():
+        print("Username already taken.")
+        return
+    user = create_admin(username, password)
+    print(f"Admin {user.username} created!")
+
+
+@user_cli.command("logout", help="Logout of the Bread Van App")
+def logout_user_command():
+    user = User.query.filter_by(logged_in=True).first()
+    if not user:
+        print("No user is logged in.")
+        return
+
+    user_logout(user)
+    print(f'{user.username} logged out')
+
+
+@user_cli.command("view_street_drives", help="View all drives on a street")
+def view_street_drives_command():
+    user = User.query.filter_by(logged_in=True).first()
+    if not user:
+        print("Must be logged in to perform this action.")
+        return
+
+    areas =  get_all_areas()
+    if not areas:
+        print("No areas available. Please create an area first.")
+        return
+
+    print("\nAvailable Areas:")
+    for i, area in enumerate(areas, start=1):
+        print(f"{i}. {area.name}")
+
+    chosen_area_index = click.prompt("Select an area by number", type=int)
+    if chosen_area_index < 1 or chosen_area_index > len(areas):
+        print("Invalid area choice.")
+        return
+    chosen_area = areas[chosen_area_index - 1]
+
+    streets = get_streets_in_area(chosen_area.id)
+    if not streets:
+        print(
+            "No streets available in the selected area. Please create a street first."
+        )
+        return
+
+    print(f"\nAvailable Streets in {chosen_area.name}:")
+    for i, street in enumerate(streets, start=1):
+        print(f"{i}. {street.name}")
+
+    chosen_index = click.prompt("Select a street by number", type=int)
+
+    if chosen_index < 1 or chosen_index > len(streets):
+        print("Invalid street choice.")
+        return
+
+    chosen_street = streets[chosen_index - 1]
+
+    drives = user_view_street_drives(user, chosen_area.id, chosen_street.id)
+    if not drives:
+        print("No drives scheduled for this street.")
+        return
+
+    print(
+        f"\nAll Scheduled Drives on {drives[0].street.name}, {drives[0].area.name}:"
+    )
+    print("-" * 70)
+    print(f"{'Drive ID':<10} {'Date':<12} {'Time':<8} {'Driver':<20}")
+    print("-" * 70)
+    for drive in drives:
+        date_str = drive.date.strftime("%Y-%m-%d")
+        time_str = drive.time.strftime("%H:%M")
+        print(
+            f"{drive.id:<10} {date_str:<12} {time_str:<8} {drive.driverId:<20}"
+        )
+    print("\n")
+
+
+@user_cli.command("list", help="Lists users in the database")
+@click.argument("format", default="string")
+def list_user_command(format):
+
+        
+        users = get_all_users()
+        if users is None:
+            print("No users found.")
+            return
+
+        print("\nUsers in the database:")
+        print("-" * 70)
+        print(f"{'ID':<10} {'Username':<20} {'Type':<20}")
+        print("-" * 70)
+        for user in users:
+            print(f"{user.id:<10} {user.username:<20} {user.type:<20}")
+        print("\n")
+
+
+@user_cli.command("view_all_areas", help="View all areas")
+def view_all_areas_command():
+
+        areas = get_all_areas()
+        if not areas:
+            print("No areas available.")
+            return
+        print("\nAll Areas:")
+        for area in areas:
+            print(f"{area.id}. {area.name}")
+        print("\n")
+
+
+@user_cli.command("view_all_streets", help="View all streets")
+def view_all_streets_command():
+
+        streets = get_all_streets()
+        if not streets:
+            print("No streets available.")
+            return
+        print("\nAll Streets:")
+        for street in streets:
+            print(f"{street.id}. {street.name} (Area ID: {street.areaId})")
+        print("\n")
@@ -1,5 +1,16 @@
 import os
 
+from App.database import POOL_DEFAULTS, engine_options
+from App.templating import TEMPLATE_DEFAULTS
+from App.middleware import HTTP_DEFAULTS
+from App.realtime import REALTIME_DEFAULTS
+from App.events import EVENT_DEFAULTS
+from App.autocomplete import AUTOCOMPLETE_DEFAULTS
+from App.geo import GEO_DEFAULTS
+from App.nearby import NEARBY_DEFAULTS
+from App.tiles import TILE_DEFAULTS
+from App.models.change_log import SYNC_DEFAULTS
+
 def load_config(app, overrides):
     if os.path.exists(os.path.join('./App', 'custom_config.py')):
         app.config.from_object('App.custom_config')
@@ -7,7 +18,6 @@ def load_config(app, overrides):
         app.config.from_object('App.default_config')
     app.config.from_prefixed_env()
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['TEMPLATES_AUTO_RELOAD'] = True
     app.config['PREFERRED_URL_SCHEME'] = 'https'
     app.config['UPLOADED_PHOTOS_DEST'] = "App/uploads"
     app.config['JWT_ACCESS_COOKIE_NAME'] = 'access_token'
@@ -16,4 +26,10 @@ def load_config(app, overrides):
     app.config["JWT_COOKIE_CSRF_PROTECT"] = False
     app.config['FLASK_ADMIN_SWATCH'] = 'darkly'
     for key in overrides:
-        app.config[key] = overrides[key]
\ No newline at end of file
+        app.config[key] = overrides[key]
+    for key, value in {**POOL_DEFAULTS, **TEMPLATE_DEFAULTS, **HTTP_DEFAULTS,
+                       **REALTIME_DEFAULTS, **EVENT_DEFAULTS, **AUTOCOMPLETE_DEFAULTS,
+                       **GEO_DEFAULTS, **NEARBY_DEFAULTS,
+                       **TILE_DEFAULTS, **SYNC_DEFAULTS}.items():
+        app.config.setdefault(key, value)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from App.models import Area, Street
 from App.database import db
+from App.geo import parse_points
 
 # All area-related business logic will be moved here as functions
 def create_area(name):
@@ -21,6 +22,15 @@ def get_streets_in_area(area_id):
         raise ValueError("Invalid area ID.")
     return Street.query.filter_by(areaId=area_id).all()
 
+def set_area_boundary(area_id, points):
+    """Set or (with ``None``) clear the area's polygon, ``[[lat, lng], ...]``."""
+    area = Area.query.get(area_id)
+    if not area:
+        raise ValueError("Invalid area ID.")
+    area.boundary = parse_points(points, 3) if points is not None else None
+    db.session.commit()
+    return area
+
 def get_all_areas():
     return Area.query.all()
 
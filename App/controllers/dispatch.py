@@ -0,0 +1,217 @@
+"""Split a day's streets between the available vans.
+
+``plan_dispatch`` collects each street's expected stops for the day and the
+available drivers' positions. ``assign`` then gives every street to at most
+one van, so no street is double-covered. Each van carries at most
+``capacity`` stops, and the plan keeps the distance from each van to its
+streets low.
+
+``assign`` starts from a greedy plan: streets are placed in order of regret
+(how much worse off they are with their second-best van). Local search then
+moves single streets between vans and swaps pairs, until no move helps or
+``time_limit`` seconds pass. Leaving a street unserved costs
+``UNSERVED_PENALTY_M`` per stop, so a street only stays unserved when no
+van has room for it.
+"""
+import time
+from datetime import date as date_type
+from math import inf
+
+from App.database import db
+from App.geo import distance_to_path, get_geo_index
+from App.models import Area, Drive, Driver, DemandModel, Resident, Stop, Street
+from App.models.demand_model import ALL_DAYS, STOPS
+from App.controllers.forecast import MIN_WEEKDAY_OBSERVATIONS
+
+# Stops one van can serve in a day
+VAN_CAPACITY = 40
+TIME_LIMIT = 2.0
+# Longest search a web request may ask for. The search is CPU-bound and
+# holds its worker (every greenlet on it, under gevent) until it ends.
+MAX_REQUEST_TIME_LIMIT = 5.0
+# Distance assumed when a van or street has no position: a van is assumed
+# to be somewhere in its own area, and far from every other one
+SAME_AREA_M = 1_000
+OTHER_AREA_M = 20_000
+UNSERVED_PENALTY_M = 1_000_000
+
+
+# DEMAND AND POSITIONS
+
+def street_demand(day):
+    """{street_id: expected stops} on ``day``: the stops already requested
+    on that day's drives, or the street's forecast when that is higher."""
+    demand = dict(db.session.execute(
+        db.select(Resident.streetId, db.func.count(Stop.id))
+        .join(Stop, Stop.residentId == Resident.id).join(Drive, Drive.id == Stop.driveId)
+        .where(Drive.date == day, Drive.status != "Cancelled")
+        .group_by(Resident.streetId)
+    ).all())
+    weekday = day.weekday()
+    forecast = {}
+    for street_id, model_day, level, observations in db.session.execute(
+        db.select(DemandModel.streetId, DemandModel.weekday, DemandModel.level, DemandModel.observations)
+        .where(DemandModel.itemId == STOPS, DemandModel.weekday.in_((weekday, ALL_DAYS)))
+    ):
+        if model_day == ALL_DAYS:
+            forecast.setdefault(street_id, level)
+        elif observations >= MIN_WEEKDAY_OBSERVATIONS:
+            forecast[street_id] = level
+    for street_id, level in forecast.items():
+        demand[street_id] = max(demand.get(street_id, 0), round(level))
+    return {street_id: stops for street_id, stops in demand.items() if stops > 0}
+
+
+def _centre(points):
+    if not points:
+        return None
+    return (sum(lat for lat, _ in points) / len(points), sum(lng for _, lng in points) / len(points))
+
+
+def _distance(a, b):
+    return distance_to_path([a], *b)
+
+
+def cost_matrix(vans, streets):
+    """``cost[v][s]`` in metres, from each van's ``(id, area_id, point)`` to
+    each street's ``(id, stops, area_id, point)``."""
+    cost = []
+    for _, van_area, van_point in vans:
+        row = []
+        for _, _, street_area, street_point in streets:
+            if van_point and street_point:
+                row.append(_distance(van_point, street_point))
+            else:
+                row.append(SAME_AREA_M if van_area == street_area else OTHER_AREA_M)
+        cost.append(row)
+    return cost
+
+
+# SOLVER
+
+def assign(cost, demand, capacity, time_limit=TIME_LIMIT):
+    """Van index for each street, or None when unserved. ``cost[v][s]`` is
+    the cost of van ``v`` serving street ``s`` and ``demand[s]`` its stops."""
+    deadline = time.monotonic() + time_limit
+    vans, streets = len(cost), len(demand)
+    # The unserved streets are one more "van" with unlimited room
+    unserved = vans
+    cost = [*cost, [UNSERVED_PENALTY_M * stops for stops in demand]]
+    room = [capacity] * vans + [inf]
+    load = [0] * (vans + 1)
+    where = [unserved] * streets
+    load[unserved] = sum(demand)
+
+    def move(s, to):
+        load[where[s]] -= demand[s]
+        load[to] += demand[s]
+        where[s] = to
+
+    def regret(s):
+        first, second = sorted([cost[v][s] for v in range(vans)] + [inf, inf])[:2]
+        return second - first if second < inf else inf
+
+    for s in sorted(range(streets), key=lambda s: (-regret(s), -demand[s], s)):
+        fits = [v for v in range(vans) if load[v] + demand[s] <= room[v]]
+        if fits:
+            move(s, min(fits, key=lambda v: cost[v][s]))
+
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        # Relocate: the best other van with room for the street
+        for s in range(streets):
+            here = where[s]
+            best, gain = None, 1e-9
+            for v in range(vans + 1):
+                if v != here and load[v] + demand[s] <= room[v] and cost[here][s] - cost[v][s] > gain:
+                    best, gain = v, cost[here][s] - cost[v][s]
+            if best is not None:
+                move(s, best)
+                improved = True
+        # Swap: two streets on different vans trade places
+        for s in range(streets):
+            if time.monotonic() >= deadline:
+                break
+            for t in range(s + 1, streets):
+                a, b = where[s], where[t]
+                if a == b:
+                    continue
+                change = demand[t] - demand[s]
+                if load[a] + change > room[a] or load[b] - change > room[b]:
+                    continue
+                if cost[a][t] + cost[b][s] < cost[a][s] + cost[b][t] - 1e-9:
+                    move(s, b)
+                    move(t, a)
+                    improved = True
+    return [None if v == unserved else v for v in where]
+
+
+def route_order(start, stops):
+    """Nearest-neighbour order of ``stops`` (``(key, point)`` pairs) from
+    ``start``, and its length in metres. Stops without a point go last."""
+    placed = [stop for stop in stops if stop[1]]
+    order, length, here = [], 0.0, start
+    while placed:
+        if here is None:
+            nearest = placed[0]
+        else:
+            nearest = min(placed, key=lambda stop: _distance(here, stop[1]))
+            length += _distance(here, nearest[1])
+        placed.remove(nearest)
+        order.append(nearest[0])
+        here = nearest[1]
+    return order + [key for key, point in stops if not point], length
+
+
+# PLAN
+
+def plan_dispatch(day=None, capacity=VAN_CAPACITY, time_limit=TIME_LIMIT, max_time_limit=60):
+    """Streets for each available driver on ``day`` (a date or YYYY-MM-DD,
+    default today), each van's streets in driving order. ``time_limit`` may
+    be at most ``max_time_limit`` seconds."""
+    try:
+        day = date_type.fromisoformat(day) if isinstance(day, str) else day or date_type.today()
+        capacity, time_limit = int(capacity), float(time_limit)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date, capacity or time limit.")
+    if capacity < 1 or not 0 < time_limit <= max_time_limit:
+        raise ValueError(f"capacity must be at least 1 and time_limit between 0 and {max_time_limit:g} seconds.")
+
+    demand = street_demand(day)
+    geo = get_geo_index()
+    areas = {area_id: _centre(boundary) for area_id, boundary in
+             db.session.execute(db.select(Area.id, Area.boundary))}
+    street_areas = dict(db.session.execute(
+        db.select(Street.id, Street.areaId).where(Street.id.in_(demand))).all()) if demand else {}
+
+    def street_point(street_id, area_id):
+        return _centre(geo.street_path(street_id)) or areas.get(area_id)
+
+    streets = [(street_id, demand[street_id], area_id, street_point(street_id, area_id))
+               for street_id, area_id in sorted(street_areas.items())]
+    vans = []
+    for driver_id, area_id, street_id, lat, lng in db.session.execute(
+        db.select(Driver.id, Driver.areaId, Driver.streetId, Driver.lat, Driver.lng)
+        .where(Driver.status == "Available").order_by(Driver.id)
+    ):
+        point = (lat, lng) if lat is not None and lng is not None else street_point(street_id, area_id)
+        vans.append((driver_id, area_id, point))
+
+    assignment = assign(cost_matrix(vans, streets), [stops for _, stops, _, _ in streets], capacity, time_limit)
+    plan = []
+    for v, (driver_id, area_id, point) in enumerate(vans):
+        mine = [streets[s] for s, van in enumerate(assignment) if van == v]
+        order, length = route_order(point, [(street[0], street[3]) for street in mine])
+        plan.append({"driverId": driver_id, "areaId": area_id, "streetIds": order,
+                     "stops": sum(street[1] for street in mine), "route_m": round(length)})
+    unserved = [{"streetId": street[0], "stops": street[1]}
+                for street, van in zip(streets, assignment) if van is None]
+    return {
+        "date": day.isoformat(),
+        "capacity": capacity,
+        "stops": sum(demand.values()),
+        "served": sum(van["stops"] for van in plan),
+        "vans": plan,
+        "unserved": unserved,
+    }
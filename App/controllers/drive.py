@@ -1,4 +1,4 @@
-from App.models import Drive, Street, Area
+from App.models import Drive, Street, Area, Stop, Resident
 from App.database import db
 
 # All drive-related business logic will be moved here as functions
@@ -10,10 +10,10 @@ def add_drive(new_drive):
 
 
 def get_drives_by_area_and_street(area_id, street_id):
-    return Drive.query.filter_by(areaId=area_id, streetId=street_id).all()
+    return Drive.with_route().filter(Drive.areaId == area_id, Drive.on_street(street_id)).all()
 
 def get_upcoming_drives():
-    return Drive.query.filter_by(status="Upcoming").all()
+    return Drive.with_route().filter_by(status="Upcoming").all()
 
 def delete_drive(drive_id):
     drive = Drive.query.get(drive_id)
@@ -24,27 +24,39 @@ def delete_drive(drive_id):
     return drive
 
 def get_drives_by_driver(driver_id):
-    return Drive.query.filter_by(driverId=driver_id).all()
+    return Drive.with_route().filter_by(driverId=driver_id).all()
 
 
 def get_drives_by_status(status):
-    return Drive.query.filter_by(status=status).all()
+    return Drive.with_route().filter_by(status=status).all()
 
 
 def get_drives_scheduled_between(start_date, end_date):
-    return Drive.query.filter(Drive.scheduledTime >= start_date, Drive.scheduledTime <= end_date).all()
+    return Drive.with_route().filter(Drive.scheduledTime >= start_date, Drive.scheduledTime <= end_date).all()
 
 
 def get_all_drives():
-    return Drive.query.all()
+    return Drive.with_route().all()
 
 def get_drives_by_area(area_id):
-    return Drive.query.filter_by(areaId=area_id).all()
+    return Drive.with_route().filter_by(areaId=area_id).all()
 
 
 def get_drives_by_street(street_id):
-    return Drive.query.filter_by(streetId=street_id).all()
+    return Drive.with_route().filter(Drive.on_street(street_id)).all()
 
 def get_drives_by_date(date):
-    return Drive.query.filter(db.func.date(Drive.scheduledTime) == date).all()
-
+    return Drive.with_route().filter(db.func.date(Drive.scheduledTime) == date).all()
+
+
+def get_stops_for_drive(drive_id):
+    """A drive's stops with each resident's street and location, in one query."""
+    rows = db.session.execute(
+        db.select(Stop.id, Stop.residentId, Resident.streetId, Resident.houseNumber, Resident.lat, Resident.lng)
+        .join(Resident, Resident.id == Stop.residentId)
+        .where(Stop.driveId == drive_id)
+        .order_by(Stop.id)
+    )
+    return [{"id": stop_id, "driveId": drive_id, "residentId": resident_id, "streetId": street_id,
+             "houseNumber": house, "lat": lat, "lng": lng}
+            for stop_id, resident_id, street_id, house, lat, lng in rows]
@@ -1,5 +1,9 @@
-from App.models import Driver, Drive, Street, Item, DriverStock, Resident
+from App.models import Driver, Drive, DriveStreet, Street, Item, DriverStock, Resident
 from App.database import db
+from App import serializers
+from App import events
+from App import geo
+from App.controllers.forecast import observe_drive
 from datetime import datetime, timedelta
 from math import radians, sin, cos, sqrt, atan2
 
@@ -39,8 +43,13 @@ def delete_driver(driver_id):
 
 # DRIVER DRIVE MANAGEMENT
 
+# Drives can be scheduled at most this many days ahead
+SCHEDULE_HORIZON_DAYS = 60
 
-def driver_schedule_drive(driver, area_id, street_id, date_str, time_str, menu=None, eta_str=None):
+
+def driver_schedule_drive(driver, area_id, street_id, date_str, time_str, menu=None, eta_str=None, route=None):
+    """Schedule a drive starting on ``street_id`` and then visiting the
+    streets in ``route``, in order, all in ``area_id``."""
     # Validate date + time formats
     try:
         date = datetime.strptime(date_str, "%Y-%m-%d").date()
@@ -55,16 +64,27 @@ def driver_schedule_drive(driver, area_id, street_id, date_str, time_str, menu=N
         raise ValueError("Cannot schedule a drive in the past.")
 
     # Prevent scheduling too far into the future
-    max_days = datetime.now() + timedelta(days=60)
+    max_days = datetime.now() + timedelta(days=SCHEDULE_HORIZON_DAYS)
     if scheduled_datetime > max_days:
-        raise ValueError("Cannot schedule a drive more than 60 days in advance.")
-
-    # Prevent duplicate same-day drive on same area/street
-    existing_drive = Drive.query.filter_by(
-        areaId=area_id, streetId=street_id, date=date
-    ).first()
+        raise ValueError(f"Cannot schedule a drive more than {SCHEDULE_HORIZON_DAYS} days in advance.")
+
+    streets = [street_id, *(route or [])]
+    if len(set(streets)) != len(streets):
+        raise ValueError("A street appears twice in the route.")
+    if route:
+        in_area = db.session.scalar(
+            db.select(db.func.count(Street.id)).where(Street.id.in_(streets), Street.areaId == area_id))
+        if in_area != len(streets):
+            raise ValueError("Every street on the route must be in the drive's area.")
+
+    # Prevent duplicate same-day drive on any street of the route
+    existing_drive = db.session.scalar(
+        db.select(DriveStreet.streetId).join(Drive, Drive.id == DriveStreet.driveId)
+        .where(DriveStreet.streetId.in_(streets), Drive.areaId == area_id, Drive.date == date)
+        .limit(1)
+    )
 
-    if existing_drive:
+    if existing_drive is not None:
         raise ValueError("A drive is already scheduled for this area and street on this date.")
 
     # Process ETA if provided
@@ -84,7 +104,8 @@ def driver_schedule_drive(driver, area_id, street_id, date_str, time_str, menu=N
         time=time,
         status="Upcoming",
         menu=menu,
-        eta=eta_time
+        eta=eta_time,
+        route=route
     )
 
     db.session.add(new_drive)
@@ -92,6 +113,7 @@ def driver_schedule_drive(driver, area_id, street_id, date_str, time_str, menu=N
 
     # Notify subscribed residents
     new_drive.notify_new_drive()
+    events.emit(events.DRIVE_SCHEDULED, new_drive.get_json())
 
     return new_drive
 
@@ -102,7 +124,9 @@ def driver_cancel_drive(driver, drive_id):
     if not drive or drive.driverId != driver.id:
         raise ValueError("Drive not found or you don't have permission.")
 
-    return driver.cancel_drive(drive_id)
+    result = driver.cancel_drive(drive_id)
+    events.emit(events.DRIVE_CANCELLED, drive.get_json())
+    return result
 
 
 def driver_view_drives(driver):
@@ -112,6 +136,14 @@ def driver_view_drives(driver):
     ]
 
 
+def driver_view_drives_json(driver_id):
+    return serializers.DRIVE.all(
+        Drive.driverId == driver_id,
+        Drive.status.in_(("Upcoming", "In Progress")),
+        order_by=Drive.id
+    )
+
+
 def driver_start_drive(driver, drive_id):
     # Check if driver already has an active drive
     active = Drive.query.filter_by(driverId=driver.id, status="In Progress").first()
@@ -127,7 +159,9 @@ def driver_start_drive(driver, drive_id):
     if not drive:
         raise ValueError("Drive not found or cannot be started.")
 
-    return driver.start_drive(drive_id)
+    drive = driver.start_drive(drive_id)
+    events.emit(events.DRIVE_STARTED, drive.get_json())
+    return drive
 
 
 def driver_end_drive(driver):
@@ -136,7 +170,11 @@ def driver_end_drive(driver):
     if not active:
         raise ValueError("No drive in progress.")
 
-    return driver.end_drive(active.id)
+    drive = driver.end_drive(active.id)
+    # Train on the finished drive so the next one's load recommendation uses it
+    observe_drive(drive)
+    events.emit(events.DRIVE_ENDED, drive.get_json())
+    return drive
 
 
 def driver_view_requested_stops(driver, drive_id):
@@ -156,6 +194,7 @@ def driver_update_drive_menu(driver, drive_id, menu):
 
     drive.set_menu_and_eta(menu, drive.eta)
     db.session.commit()
+    events.emit(events.DRIVE_UPDATED, drive.get_json())
 
     return drive
 
@@ -173,6 +212,7 @@ def driver_update_drive_eta(driver, drive_id, eta_str):
 
     drive.set_menu_and_eta(drive.menu, eta_time)
     db.session.commit()
+    events.emit(events.DRIVE_UPDATED, drive.get_json())
 
     return drive
 
@@ -218,8 +258,23 @@ def haversine(lat1, lon1, lat2, lon2):
     c = 2 * atan2(sqrt(a), sqrt(1 - a))
     return R * c
 
+# Residents this close to the van get an arrival alert
+ARRIVAL_RADIUS_M = 400
+
+def _residents_near(driver):
+    """Residents on mapped streets near the van, plus those on the area's
+    unmapped streets; every resident of the area if nothing is mapped."""
+    index = geo.get_geo_index()
+    if not index.mapped:
+        return Resident.query.filter_by(areaId=driver.areaId).all()
+    streets = geo.streets_near(driver.last_lat, driver.last_lng, ARRIVAL_RADIUS_M)
+    streets += index.unmapped_streets(driver.areaId)
+    if not streets:
+        return []
+    return Resident.query.filter(Resident.streetId.in_(streets)).all()
+
 def notify_residents_of_arrival(driver):
-    residents = Resident.query.filter_by(areaId=driver.areaId).all()
+    residents = _residents_near(driver)
 
     for r in residents:
         # Skip if resident has no coordinates
@@ -228,8 +283,8 @@ def notify_residents_of_arrival(driver):
 
         distance_km = haversine(driver.last_lat, driver.last_lng, r.lat, r.lng)
 
-        if distance_km < 0.4:  # 400 meters
-            r.receive_notif(
+        if distance_km < ARRIVAL_RADIUS_M / 1000:
+            r.add_notif(
                 "The Bread Van is near your area!",
                 "arrival_alert",
                 None
@@ -242,11 +297,26 @@ def update_driver_location(driver_id, lat, lng):
     driver = Driver.query.get(driver_id)
     if not driver:
         raise ValueError("Driver not found.")
+    lat, lng = geo.parse_points([[lat, lng]], 1)[0]
 
     driver.last_lat = lat
     driver.last_lng = lng
+    driver.lat, driver.lng = lat, lng
+    located = geo.locate(lat, lng)
+    if located["street"]:
+        driver.areaId, driver.streetId = located["street"]["areaId"], located["street"]["id"]
+    elif located["area"]:
+        driver.areaId = located["area"]["id"]
     db.session.commit()
 
+    active = Drive.query.filter_by(driverId=driver.id, status="In Progress").first()
+    events.emit(events.LOCATION_UPDATED, {
+        "driverId": driver.id, "lat": lat, "lng": lng, "at": int(datetime.now().timestamp()),
+        "areaId": driver.areaId,
+        "driveId": active.id if active else None,
+        "streetId": active.streetId if active else None,
+    })
+
     # Notify residents nearby
     notify_residents_of_arrival(driver)
 
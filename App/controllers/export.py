@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from App.models import Drive, Stop, Resident, DriverStock, Driver, Item
+from App.database import db
+from App import serializers
+
+# Rows fetched per round trip; on Postgres this is a server-side cursor,
+# so memory stays bounded by the chunk size rather than the table size.
+EXPORT_CHUNK_SIZE = 1000
+
+DATASETS = ("drives", "stops", "notifications", "stock")
+
+
+def parse_export_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+
+def _stream(stmt):
+    result = db.session.execute(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+    for partition in result.partitions():
+        yield partition
+
+
+def _export_drives(start, end, area_id):
+    stmt = serializers.DRIVE.select(order_by=Drive.id)
+    if start:
+        stmt = stmt.where(Drive.date >= start)
+    if end:
+        stmt = stmt.where(Drive.date <= end)
+    if area_id:
+        stmt = stmt.where(Drive.areaId == area_id)
+    for partition in _stream(stmt):
+        yield from serializers.DRIVE.dump(partition)
+
+
+STOP_EXPORT = serializers.RowSerializer(
+    ("id", Stop.id),
+    ("driveId", Stop.driveId),
+    ("residentId", Stop.residentId),
+    ("date", Drive.date, serializers.iso_date),
+    ("areaId", Drive.areaId),
+    ("streetId", Drive.streetId),
+)
+
+
+def _export_stops(start, end, area_id):
+    stmt = STOP_EXPORT.select(order_by=Stop.id).join_from(Stop, Drive, Stop.driveId == Drive.id)
+    if start:
+        stmt = stmt.where(Drive.date >= start)
+    if end:
+        stmt = stmt.where(Drive.date <= end)
+    if area_id:
+        stmt = stmt.where(Drive.areaId == area_id)
+    for partition in _stream(stmt):
+        yield from STOP_EXPORT.dump(partition)
+
+
+def _export_notifications(start, end, area_id):
+    # Notifications live in each resident's JSON inbox, so only the area filter
+    # can run in SQL; the date range is applied to the entry timestamps.
+    stmt = db.select(Resident.id, Resident.areaId, Resident.streetId, Resident.inbox).order_by(Resident.id)
+    if area_id:
+        stmt = stmt.where(Resident.areaId == area_id)
+    start_str = start.isoformat() if start else None
+    end_str = end.isoformat() if end else None
+    for partition in _stream(stmt):
+        for resident_id, resident_area, resident_street, inbox in partition:
+            for notification in inbox or []:
+                day = (notification.get("timestamp") or "")[:10]
+                if (start_str and day < start_str) or (end_str and day > end_str):
+                    continue
+                yield {
+                    "residentId": resident_id,
+                    "areaId": resident_area,
+                    "streetId": resident_street,
+                    "timestamp": notification.get("timestamp"),
+                    "type": notification.get("type"),
+                    "driveId": notification.get("drive_id"),
+                    "read": notification.get("read", False),
+                    "message": notification.get("message"),
+                }
+
+
+STOCK_EXPORT = serializers.RowSerializer(
+    ("id", DriverStock.id),
+    ("driverId", DriverStock.driverId),
+    ("areaId", Driver.areaId),
+    ("itemId", DriverStock.itemId),
+    ("itemName", Item.name),
+    ("quantity", DriverStock.quantity),
+)
+
+
+def _export_stock(start, end, area_id):
+    # Stock rows are a current snapshot, there is no date to filter on
+    stmt = (STOCK_EXPORT.select(order_by=DriverStock.id)
+            .join_from(DriverStock, Driver, DriverStock.driverId == Driver.id)
+            .join(Item, DriverStock.itemId == Item.id))
+    if area_id:
+        stmt = stmt.where(Driver.areaId == area_id)
+    for partition in _stream(stmt):
+        yield from STOCK_EXPORT.dump(partition)
+
+
+_EXPORTERS = {
+    "drives": (serializers.DRIVE.keys, _export_drives),
+    "stops": (STOP_EXPORT.keys, _export_stops),
+    "notifications": (("residentId", "areaId", "streetId", "timestamp", "type",
+                       "driveId", "read", "message"), _export_notifications),
+    "stock": (STOCK_EXPORT.keys, _export_stock),
+}
+
+
+def export_rows(dataset, start=None, end=None, area_id=None):
+    """Return (fieldnames, row generator) for a dataset. Nothing is queried
+    until the generator is consumed."""
+    if dataset not in _EXPORTERS:
+        raise ValueError(f"Unknown export '{dataset}'. Choose from: {', '.join(DATASETS)}.")
+    start = parse_export_date(start) if isinstance(start, str) else start
+    end = parse_export_date(end) if isinstance(end, str) else end
+    fieldnames, exporter = _EXPORTERS[dataset]
+    return fieldnames, exporter(start, end, area_id)
+
+
+def to_ndjson(rows, flush_every=EXPORT_CHUNK_SIZE):
+    dumps = json.dumps
+    lines = []
+    for row in rows:
+        lines.append(dumps(row))
+        if len(lines) == flush_every:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def to_csv(fieldnames, rows, flush_every=EXPORT_CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for n, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if n % flush_every == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_lines(dataset, fmt="ndjson", start=None, end=None, area_id=None):
+    if fmt not in ("ndjson", "csv"):
+        raise ValueError("Invalid format. Use ndjson or csv.")
+    fieldnames, rows = export_rows(dataset, start, end, area_id)
+    if fmt == "csv":
+        return to_csv(fieldnames, rows)
+    return to_ndjson(rows)
@@ -0,0 +1,144 @@
+from math import ceil
+
+from App.models import Drive, DriveStreet, DemandModel, Item, Reservation, Resident, Stop
+from App.models.demand_model import ALL_DAYS, STOPS
+from App.models.reservation import HELD, CLAIMED
+from App.database import db
+
+# Weight of the newest drive in the smoothed level
+SMOOTHING = 0.3
+# A weekday model is trusted once it has seen this many drives; before
+# that the street's all-days model is used
+MIN_WEEKDAY_OBSERVATIONS = 3
+# Recommended loads are padded by this share to avoid selling out
+SAFETY_MARGIN = 0.2
+
+
+def _observed_demand(drive_ids):
+    """{drive_id: {street_id: {item_id: quantity}}}, with STOPS holding the
+    stop count. Demand goes to the street of the resident who asked, and
+    every street on the route is observed, with no stops if none asked."""
+    demand = {drive_id: {} for drive_id in drive_ids}
+    first = {}
+    for drive_id, street_id, position in db.session.execute(
+        db.select(DriveStreet.driveId, DriveStreet.streetId, DriveStreet.position)
+        .where(DriveStreet.driveId.in_(drive_ids)).order_by(DriveStreet.driveId, DriveStreet.position)
+    ):
+        demand[drive_id][street_id] = {STOPS: 0}
+        first.setdefault(drive_id, street_id)
+
+    def street_demand(drive_id, street_id):
+        # A resident who has since moved off the route counts for its first street
+        streets = demand[drive_id]
+        return streets[street_id if street_id in streets else first[drive_id]]
+
+    for drive_id, street_id, count in db.session.execute(
+        db.select(Stop.driveId, Resident.streetId, db.func.count(Stop.id))
+        .join(Resident, Resident.id == Stop.residentId)
+        .where(Stop.driveId.in_(drive_ids)).group_by(Stop.driveId, Resident.streetId)
+    ):
+        street_demand(drive_id, street_id)[STOPS] += count
+    for drive_id, street_id, item_id, quantity in db.session.execute(
+        db.select(Reservation.driveId, Resident.streetId, Reservation.itemId, db.func.sum(Reservation.quantity))
+        .join(Resident, Resident.id == Reservation.residentId)
+        .where(Reservation.driveId.in_(drive_ids), Reservation.status.in_((HELD, CLAIMED)))
+        .group_by(Reservation.driveId, Resident.streetId, Reservation.itemId)
+    ):
+        items = street_demand(drive_id, street_id)
+        items[item_id] = items.get(item_id, 0) + quantity
+    return demand
+
+
+def _index(models):
+    """``(street, day) -> items`` of the models, kept up to date by ``_smooth``."""
+    index = {}
+    for street, day, item in models:
+        index.setdefault((street, day), set()).add(item)
+    return index
+
+
+def _smooth(models, index, street_id, weekday, observed):
+    """Fold one drive's demand on a street into the street's weekday and
+    all-days models. Items the street has bought before count as zero when
+    absent."""
+    for day in (weekday, ALL_DAYS):
+        items = index.setdefault((street_id, day), set())
+        items.update(observed)
+        for item in items:
+            level, count = models.get((street_id, day, item), (0.0, 0))
+            x = observed.get(item, 0)
+            level = x if count == 0 else SMOOTHING * x + (1 - SMOOTHING) * level
+            models[(street_id, day, item)] = (level, count + 1)
+
+
+def _street_models(street_ids, weekday):
+    return DemandModel.query.filter(DemandModel.streetId.in_(street_ids),
+                                    DemandModel.weekday.in_((weekday, ALL_DAYS))).all()
+
+
+def observe_drive(drive):
+    """Update the models of each street on the route with a completed
+    drive's stops and reserved items."""
+    weekday = drive.date.weekday()
+    existing = {(r.streetId, r.weekday, r.itemId): r for r in _street_models(drive.street_ids, weekday)}
+    models = {key: (r.level, r.observations) for key, r in existing.items()}
+    index = _index(models)
+    for street_id, observed in _observed_demand([drive.id])[drive.id].items():
+        _smooth(models, index, street_id, weekday, observed)
+    for key, (level, count) in models.items():
+        row = existing.get(key)
+        if row is None:
+            db.session.add(DemandModel(*key, level=level, observations=count))
+        else:
+            row.level, row.observations = level, count
+    db.session.commit()
+
+
+def train_forecasts():
+    """Refit every model from all completed drives, oldest first. Returns
+    the number of drives used."""
+    drives = db.session.execute(
+        db.select(Drive.id, Drive.date).where(Drive.status == "Completed")
+        .order_by(Drive.date, Drive.time, Drive.id)
+    ).all()
+    demand = _observed_demand([drive_id for drive_id, _ in drives])
+    models, index = {}, {}
+    for drive_id, day in drives:
+        for street_id, observed in demand[drive_id].items():
+            _smooth(models, index, street_id, day.weekday(), observed)
+    db.session.execute(db.delete(DemandModel))
+    if models:
+        db.session.execute(DemandModel.__table__.insert(), [
+            {"streetId": street, "weekday": day, "itemId": item, "level": level, "observations": count}
+            for (street, day, item), (level, count) in models.items()
+        ])
+    db.session.commit()
+    return len(drives)
+
+
+def recommend_load(drive):
+    """Suggested quantity of each item to load for ``drive``, plus the
+    expected number of stops, summed over the models of the route's
+    streets. ``observations`` is the fewest drives behind any street's
+    model of the item."""
+    weekday = drive.date.weekday()
+    rows = _street_models(drive.street_ids, weekday)
+    best = {(row.streetId, row.itemId): row for row in rows if row.weekday == ALL_DAYS}
+    best.update({(row.streetId, row.itemId): row for row in rows
+                 if row.weekday == weekday and row.observations >= MIN_WEEKDAY_OBSERVATIONS})
+    totals = {}
+    for (_, item_id), row in best.items():
+        level, observations = totals.get(item_id, (0.0, row.observations))
+        totals[item_id] = (level + row.level, min(observations, row.observations))
+    stops = totals.pop(STOPS, None)
+    names = dict(db.session.execute(db.select(Item.id, Item.name).where(Item.id.in_(totals))).all()) if totals else {}
+    items = [
+        {"itemId": item_id, "name": names[item_id], "quantity": ceil(level * (1 + SAFETY_MARGIN)),
+         "observations": observations}
+        for item_id, (level, observations) in sorted(totals.items()) if item_id in names and level > 0
+    ]
+    return {
+        "driveId": drive.id,
+        "expected_stops": round(stops[0], 1) if stops else None,
+        "items": items,
+    }
@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta
+
+from App.models import Drive, DriverStock, DriveStock, Item, Reservation
+from App.models.reservation import HELD, CLAIMED, RELEASED, EXPIRED
+from App.database import db, insert_ignoring_conflicts
+
+# Unclaimed reservations are returned to stock this long after the drive's
+# scheduled time
+RESERVATION_GRACE = timedelta(hours=2)
+
+_stock = DriveStock.__table__
+_reservation = Reservation.__table__
+
+
+def _parse_quantities(items):
+    """``[{"item_id": 3, "quantity": 2}, ...]`` or ``{3: 2}`` -> ``{3: 2}``."""
+    if isinstance(items, dict):
+        items = [{"item_id": key, "quantity": value} for key, value in items.items()]
+    if not isinstance(items, list):
+        raise ValueError("items must be a list of {item_id, quantity}.")
+    quantities = {}
+    for entry in items:
+        try:
+            item_id, quantity = int(entry["item_id"]), int(entry["quantity"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("items must be a list of {item_id, quantity}.")
+        if quantity < 0:
+            raise ValueError("quantity must not be negative.")
+        quantities[item_id] = quantities.get(item_id, 0) + quantity
+    return quantities
+
+
+def load_drive_stock(driver, drive_id, items=None):
+    """Set what the van carries on a drive, from ``items`` or else the
+    driver's current stock. Reloading keeps existing reservations: the
+    available count moves by the change in the loaded count, and loading
+    less than is already reserved is refused."""
+    drive = Drive.query.get(drive_id)
+    if not drive or drive.driverId != driver.id:
+        raise ValueError("Drive not found or you don't have permission.")
+    if items is None:
+        quantities = {s.itemId: s.quantity for s in DriverStock.query.filter_by(driverId=driver.id)}
+    else:
+        quantities = _parse_quantities(items)
+    known = set(db.session.scalars(db.select(Item.id).where(Item.id.in_(quantities))))
+    if set(quantities) - known:
+        raise ValueError("Invalid item ID.")
+
+    for item_id, quantity in sorted(quantities.items()):
+        inserted = db.session.execute(
+            insert_ignoring_conflicts(_stock, ["driveId", "itemId"])
+            .values(driveId=drive_id, itemId=item_id, loaded=quantity, available=quantity)
+            .returning(_stock.c.id)
+        ).first()
+        if inserted:
+            continue
+        updated = db.session.execute(
+            _stock.update()
+            .where(_stock.c.driveId == drive_id, _stock.c.itemId == item_id,
+                   _stock.c.available + quantity - _stock.c.loaded >= 0)
+            .values(available=_stock.c.available + quantity - _stock.c.loaded, loaded=quantity)
+        )
+        if updated.rowcount == 0:
+            db.session.rollback()
+            raise ValueError(f"Cannot load fewer of item {item_id} than are already reserved.")
+    db.session.commit()
+    return drive_stock_snapshot(drive_id)
+
+
+def sold_out_drives(drive_ids):
+    """The drives among ``drive_ids`` whose van was loaded and has nothing
+    left, in one query."""
+    return set(db.session.scalars(
+        db.select(_stock.c.driveId)
+        .where(_stock.c.driveId.in_(drive_ids))
+        .group_by(_stock.c.driveId)
+        .having(db.func.sum(_stock.c.available) == 0)
+    ))
+
+
+def drive_sold_out(drive_id):
+    return drive_id in sold_out_drives([drive_id])
+
+
+def reserve_items(resident, drive, items):
+    """Hold ``items`` on ``drive`` for ``resident``, all or nothing. Each item
+    is taken with one conditional ``UPDATE ... WHERE available >= n``, so
+    concurrent reservations can never oversell and no row is locked for
+    longer than that statement. Does not commit; the caller commits with
+    the stop it belongs to."""
+    quantities = {item_id: n for item_id, n in _parse_quantities(items).items() if n > 0}
+    expires_at = datetime.combine(drive.date, drive.time) + RESERVATION_GRACE
+    # A fixed order keeps two multi-item reservations from deadlocking
+    for item_id, quantity in sorted(quantities.items()):
+        taken = db.session.execute(
+            _stock.update()
+            .where(_stock.c.driveId == drive.id, _stock.c.itemId == item_id, _stock.c.available >= quantity)
+            .values(available=_stock.c.available - quantity)
+        )
+        if taken.rowcount == 0:
+            db.session.rollback()
+            item = Item.query.get(item_id)
+            name = item.name if item else f"item {item_id}"
+            raise ValueError(f"Not enough {name} left on this drive.")
+    reservations = [Reservation(drive.id, item_id, resident.id, quantity, expires_at)
+                    for item_id, quantity in sorted(quantities.items())]
+    db.session.add_all(reservations)
+    return reservations
+
+
+def _return_to_stock(rows):
+    returned = {}
+    for drive_id, item_id, quantity in rows:
+        returned[(drive_id, item_id)] = returned.get((drive_id, item_id), 0) + quantity
+    for (drive_id, item_id), quantity in returned.items():
+        db.session.execute(
+            _stock.update()
+            .where(_stock.c.driveId == drive_id, _stock.c.itemId == item_id)
+            .values(available=_stock.c.available + quantity)
+        )
+    return len(rows)
+
+
+def _finish_held(status, *criteria):
+    # Flipping status with RETURNING hands each reservation to exactly one
+    # caller, even when a cancel and the expiry job race
+    return db.session.execute(
+        _reservation.update()
+        .where(_reservation.c.status == HELD, *criteria)
+        .values(status=status)
+        .returning(_reservation.c.driveId, _reservation.c.itemId, _reservation.c.quantity)
+    ).all()
+
+
+def release_reservations(resident_id, drive_id):
+    """Return a resident's held items on a drive to stock. Does not commit."""
+    return _return_to_stock(_finish_held(
+        RELEASED, _reservation.c.residentId == resident_id, _reservation.c.driveId == drive_id))
+
+
+def claim_reservations(driver, drive_id, resident_id):
+    """Mark a resident's held items as handed over. Returns how many."""
+    drive = Drive.query.get(drive_id)
+    if not drive or drive.driverId != driver.id:
+        raise ValueError("Drive not found or you don't have permission.")
+    claimed = _finish_held(CLAIMED, _reservation.c.residentId == resident_id, _reservation.c.driveId == drive_id)
+    db.session.commit()
+    return len(claimed)
+
+
+def expire_reservations(now=None):
+    """Return unclaimed reservations past their expiry to stock. Returns the
+    number expired."""
+    expired = _return_to_stock(_finish_held(EXPIRED, _reservation.c.expires_at < (now or datetime.now())))
+    db.session.commit()
+    return expired
+
+
+def drive_stock_snapshot(drive_id):
+    """Per item: loaded, available, and quantities held and claimed, in one
+    query."""
+    held = db.func.coalesce(db.func.sum(db.case((_reservation.c.status == HELD, _reservation.c.quantity))), 0)
+    claimed = db.func.coalesce(db.func.sum(db.case((_reservation.c.status == CLAIMED, _reservation.c.quantity))), 0)
+    rows = db.session.execute(
+        db.select(_stock.c.itemId, Item.name, _stock.c.loaded, _stock.c.available,
+                  held.label("held"), claimed.label("claimed"))
+        .join(Item, Item.id == _stock.c.itemId)
+        .outerjoin(_reservation, db.and_(_reservation.c.driveId == _stock.c.driveId,
+                                         _reservation.c.itemId == _stock.c.itemId))
+        .where(_stock.c.driveId == drive_id)
+        .group_by(_stock.c.itemId, Item.name, _stock.c.loaded, _stock.c.available)
+        .order_by(_stock.c.itemId)
+    ).all()
+    return [
+        {"itemId": item_id, "name": name, "loaded": loaded, "available": available,
+         "held": held, "claimed": claimed}
+        for item_id, name, loaded, available, held, claimed in rows
+    ]
@@ -1,6 +1,12 @@
-from App.models import  Driver, Area, Street, Item
+import re
+
+from App.models import  Driver, Area, Street, Item, ItemTag
+from App.models.item import SEARCH_VECTOR, normalize_tags
 from App.database import db
 
+# Relative weight of a match in the name and in the description (SQLite)
+NAME_WEIGHT, DESCRIPTION_WEIGHT = 10.0, 1.0
+
 
 def add_item(name, price, description, tags):
     item = Item(name=name, price=price, description=description, tags=tags)
@@ -28,10 +34,71 @@ def delete_item(item_id):
 
 
 def get_items_by_name(name):
-    return Item.query.filter(Item.name.ilike(f"%{name}%")).all()
+    return search_items(name)
 
 def get_items_by_tag(tag):
-    return Item.query.filter(Item.tags.ilike(f"%{tag}%")).all()
+    normalized = normalize_tags([tag])
+    if not normalized:
+        return []
+    return Item.query.join(ItemTag).filter(ItemTag.tag == normalized[0]).order_by(Item.name).all()
+
+
+def _terms(query):
+    return re.findall(r"\w+", (query or "").lower())
+
+
+def _ranked_item_ids(terms, tag, limit):
+    """Ids of items matching every term, best first. The last term also
+    matches as a prefix, so a half-typed word finds its completions."""
+    params = {"limit": limit, "tag": tag}
+    tag_filter = "AND {id} IN (SELECT \"itemId\" FROM item_tag WHERE tag = :tag)" if tag else ""
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        params["query"] = " ".join(f'"{term}"' for term in terms) + "*"
+        sql = (f"SELECT rowid FROM item_search WHERE item_search MATCH :query {tag_filter.format(id='rowid')} "
+               f"ORDER BY bm25(item_search, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}), rowid LIMIT :limit")
+    elif dialect == "postgresql":
+        params["query"] = " & ".join(terms) + ":*"
+        sql = (f"SELECT id FROM item WHERE {SEARCH_VECTOR} @@ to_tsquery('simple', :query) "
+               f"{tag_filter.format(id='id')} "
+               f"ORDER BY ts_rank({SEARCH_VECTOR}, to_tsquery('simple', :query)) DESC, id LIMIT :limit")
+    else:
+        select = db.select(Item.id).where(*(Item.name.ilike(f"%{term}%") for term in terms))
+        if tag:
+            select = select.where(Item.id.in_(db.select(ItemTag.itemId).where(ItemTag.tag == tag)))
+        return list(db.session.scalars(select.order_by(Item.name).limit(limit)))
+    return list(db.session.scalars(db.text(sql), params))
+
+
+def search_items(query, tag=None, limit=20):
+    """Items whose name or description contains every word of ``query``,
+    ranked with name matches first, optionally only those tagged ``tag``."""
+    terms = _terms(query)
+    tag = (normalize_tags([tag]) or [None])[0] if tag else None
+    if not terms:
+        return get_items_by_tag(tag)[:limit] if tag else []
+    ids = _ranked_item_ids(terms, tag, limit)
+    items = {item.id: item for item in Item.query.filter(Item.id.in_(ids))} if ids else {}
+    return [items[item_id] for item_id in ids if item_id in items]
+
+
+def _prefix(column, prefix):
+    # A range rather than LIKE, so a plain btree index serves it on any database
+    return db.and_(column >= prefix, column < prefix + "\uffff")
+
+
+def suggest(prefix, limit=10):
+    """Autocomplete for the menu search box: matching items and tags."""
+    prefix = (prefix or "").strip().lower()
+    if not prefix:
+        return {"items": [], "tags": []}
+    tags = db.session.scalars(
+        db.select(ItemTag.tag).where(_prefix(ItemTag.tag, prefix)).distinct().order_by(ItemTag.tag).limit(limit)
+    )
+    return {
+        "items": [{"id": item.id, "name": item.name} for item in search_items(prefix, limit=limit)],
+        "tags": list(tags),
+    }
 
 def update_item(item_id, name=None, price=None, description=None, tags=None):
     item = Item.query.get(item_id)
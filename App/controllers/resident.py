@@ -1,5 +1,13 @@
-from App.models import Resident, Stop, Drive, Area, Street, DriverStock
-from App.database import db
+import hashlib
+from datetime import datetime, timedelta
+
+from App.models import Resident, Stop, Drive, DriveStreet, Area, Street, DriverStock, IdempotencyKey
+from App.models.change_log import log_changes, stop_change, UPSERT, DELETE
+from App.database import db, insert_ignoring_conflicts
+from App.controllers.inventory import reserve_items, release_reservations, drive_sold_out, sold_out_drives
+from App import events
+from App import geo
+from App import nearby
 
 
 
@@ -19,6 +27,44 @@ def resident_create(username, password, areaId, streetId, houseNumber):
     return resident
 
 
+def resident_set_location(resident, lat, lng):
+    """Store the resident's GPS position and move them to the mapped area
+    and street it falls in. Returns what ``geo.locate`` found."""
+    lat, lng = geo.parse_points([[lat, lng]], 1)[0]
+    found = geo.locate(lat, lng)
+    resident.lat, resident.lng = lat, lng
+    if found["street"]:
+        resident.areaId, resident.streetId = found["street"]["areaId"], found["street"]["id"]
+    elif found["area"]:
+        resident.areaId = found["area"]["id"]
+    db.session.commit()
+    return found
+
+
+# Lookups wider than this would scan most of the van grid
+MAX_NEARBY_RADIUS_M = 10_000
+MAX_NEARBY_HOURS = 24
+
+
+def resident_nearby_drives(resident, lat=None, lng=None, radius_m=2000, hours=2):
+    """Active drives near the given point, or the resident's stored
+    position, nearest first (see ``App.nearby``)."""
+    if lat is None and lng is None:
+        lat, lng = resident.lat, resident.lng
+        if lat is None or lng is None:
+            raise ValueError("No location given and none stored.")
+    lat, lng = geo.parse_points([[lat, lng]], 1)[0]
+    try:
+        radius_m, hours = float(radius_m), float(hours)
+    except (TypeError, ValueError):
+        raise ValueError("radius_m and hours must be numbers.")
+    if not (0 < radius_m <= MAX_NEARBY_RADIUS_M):
+        raise ValueError(f"radius_m must be between 0 and {MAX_NEARBY_RADIUS_M}.")
+    if not (0 < hours <= MAX_NEARBY_HOURS):
+        raise ValueError(f"hours must be between 0 and {MAX_NEARBY_HOURS}.")
+    return nearby.drives_near(lat, lng, radius_m, hours)
+
+
 
 # DRIVE SUBSCRIPTIONS
 
@@ -29,7 +75,7 @@ def resident_subscribe_to_drive(resident, drive_id):
     if not drive:
         raise ValueError("Drive not found.")
 
-    if drive.areaId != resident.areaId or drive.streetId != resident.streetId:
+    if drive.areaId != resident.areaId or resident.streetId not in drive.street_ids:
         raise ValueError("Cannot subscribe to drives outside your area and street.")
 
     resident.subscribe_to_drive(drive_id)
@@ -42,14 +88,16 @@ def resident_unsubscribe_from_drive(resident, drive_id):
 
 
 def resident_get_subscribed_drives(resident):
-    return Drive.query.filter(Drive.id.in_(resident.subscribed_drives)).all()
+    return Drive.with_route().filter(Drive.id.in_(resident.subscribed_drives)).all()
 
 
 
 # STOP REQUESTS
 
 
-def resident_request_stop(resident, drive_id):
+def resident_request_stop(resident, drive_id, items=None):
+    """Request a stop, optionally reserving ``items`` (``[{"item_id",
+    "quantity"}]``) from the van's stock for the drive."""
     # Check the drive exists AND is upcoming AND in the correct location
     drive = Drive.query.get(drive_id)
     if not drive:
@@ -58,7 +106,7 @@ def resident_request_stop(resident, drive_id):
     if drive.status != "Upcoming":
         raise ValueError("Cannot request stops for drives that have started or ended.")
 
-    if drive.areaId != resident.areaId or drive.streetId != resident.streetId:
+    if drive.areaId != resident.areaId or resident.streetId not in drive.street_ids:
         raise ValueError("Invalid drive choice: Not your area/street.")
 
     # Check if stop already exists
@@ -69,13 +117,26 @@ def resident_request_stop(resident, drive_id):
     if existing_stop:
         raise ValueError(f"You have already requested a stop for drive {drive_id}.")
 
+    # Committed together with the stop below
+    if items:
+        reserve_items(resident, drive, items)
+    elif drive_sold_out(drive.id):
+        raise ValueError("This drive is sold out.")
+
     stop =  resident.request_stop(drive_id)
+    if stop is None:
+        # The commit failed and was rolled back with the reservations. With
+        # the check above passed, a concurrent submit got there first.
+        raise ValueError(f"You have already requested a stop for drive {drive_id}.")
 
     resident.receive_notif(
         f"Your stop request for Drive {drive_id} was submitted.",
         "stop_requested",
         drive_id
     )
+    events.emit(events.STOP_REQUESTED, {
+        "id": stop.id, "driveId": drive.id, "driverId": drive.driverId, "residentId": resident.id,
+    })
 
     return stop
 
@@ -93,10 +154,187 @@ def resident_cancel_stop(resident, drive_id):
     if not stop:
         raise ValueError("No stop requested for this drive.")
 
+    # Committed together with the cancellation
+    release_reservations(resident.id, stop.driveId)
     resident.cancel_stop(stop.id)
     return stop
 
 
+# Most operations one batch may carry
+MAX_STOP_BATCH = 50
+
+# How long an idempotency key keeps replaying its first result
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+
+class IdempotencyKeyReused(ValueError):
+    pass
+
+
+def _request_hash(op, drive_id):
+    return hashlib.sha256(f"{op}:{drive_id}".encode()).hexdigest()
+
+
+def _parse_stop_batch(operations):
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("operations must be a non-empty list.")
+    if len(operations) > MAX_STOP_BATCH:
+        raise ValueError(f"At most {MAX_STOP_BATCH} operations per batch.")
+    parsed, keys = [], set()
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise ValueError("Each operation must be an object.")
+        op = operation.get("op", "request")
+        drive_id = operation.get("drive_id")
+        key = operation.get("idempotency_key")
+        if op not in ("request", "cancel"):
+            raise ValueError("op must be 'request' or 'cancel'.")
+        if not isinstance(drive_id, int) or isinstance(drive_id, bool):
+            raise ValueError("drive_id must be an integer.")
+        if key is not None:
+            if not isinstance(key, str) or not 0 < len(key) <= 64:
+                raise ValueError("idempotency_key must be a string of 1 to 64 characters.")
+            if key in keys:
+                raise ValueError(f"Duplicate idempotency_key {key}.")
+            keys.add(key)
+        parsed.append((op, drive_id, key))
+    return parsed
+
+
+def _stop_error(drive_id, op, message):
+    return {"drive_id": drive_id, "op": op, "status": "error", "error": message}
+
+
+def resident_batch_stops(resident, operations):
+    """Request or cancel stops on several drives at once.
+
+    ``operations`` is a list of ``{"op": "request"|"cancel", "drive_id": id,
+    "idempotency_key": key}``. Each gets its own result, so one bad drive does
+    not fail the rest. A key seen in the last day replays its first result
+    instead of running again, and raises ``IdempotencyKeyReused`` when it
+    came with a different operation. Drives and stops are read in one query each,
+    new stops go in with one insert that skips duplicates, and the resident
+    gets one notification for the whole batch.
+    """
+    parsed = _parse_stop_batch(operations)
+    now = datetime.now()
+
+    keys = {key: _request_hash(op, drive_id) for op, drive_id, key in parsed if key}
+    replayed = {}
+    if keys:
+        for key, request_hash, result in db.session.execute(
+            db.select(IdempotencyKey.key, IdempotencyKey.requestHash, IdempotencyKey.result).where(
+                IdempotencyKey.residentId == resident.id,
+                IdempotencyKey.key.in_(keys),
+                IdempotencyKey.created_at >= now - IDEMPOTENCY_KEY_TTL,
+            )
+        ):
+            # Keys stored before hashes were kept replay as before
+            if request_hash is not None and request_hash != keys[key]:
+                raise IdempotencyKeyReused(f"idempotency_key {key} was already used for a different operation.")
+            replayed[key] = result
+
+    drive_ids = {drive_id for _, drive_id, key in parsed if key not in replayed}
+    drives = {d.id: d for d in Drive.query.filter(Drive.id.in_(drive_ids))} if drive_ids else {}
+    stops = {
+        stop.driveId: stop
+        for stop in Stop.query.filter(Stop.residentId == resident.id, Stop.driveId.in_(drive_ids))
+    } if drive_ids else {}
+    sold_out = sold_out_drives(drive_ids) if drive_ids else set()
+    on_my_street = set(db.session.scalars(
+        db.select(DriveStreet.driveId).where(DriveStreet.driveId.in_(drive_ids),
+                                             DriveStreet.streetId == resident.streetId)
+    )) if drive_ids else set()
+
+    results = [None] * len(parsed)
+    to_request, to_cancel, seen = [], [], set()
+    for index, (op, drive_id, key) in enumerate(parsed):
+        if key in replayed:
+            results[index] = dict(replayed[key], replayed=True)
+            continue
+        drive = drives.get(drive_id)
+        if (op, drive_id) in seen:
+            results[index] = _stop_error(drive_id, op, "Drive appears twice in this batch.")
+        elif not drive:
+            results[index] = _stop_error(drive_id, op, "Drive not found.")
+        elif drive.status != "Upcoming":
+            results[index] = _stop_error(drive_id, op, "Cannot change stops for drives that have started or ended.")
+        elif op == "request" and (drive.areaId != resident.areaId or drive_id not in on_my_street):
+            results[index] = _stop_error(drive_id, op, "Invalid drive choice: Not your area/street.")
+        elif op == "request" and drive_id in stops:
+            results[index] = _stop_error(drive_id, op, f"You have already requested a stop for drive {drive_id}.")
+        elif op == "request" and drive_id in sold_out:
+            results[index] = _stop_error(drive_id, op, "This drive is sold out.")
+        elif op == "cancel" and drive_id not in stops:
+            results[index] = _stop_error(drive_id, op, "No stop requested for this drive.")
+        else:
+            (to_request if op == "request" else to_cancel).append(index)
+        seen.add((op, drive_id))
+
+    created = {}
+    if to_request:
+        inserted = db.session.execute(
+            insert_ignoring_conflicts(Stop.__table__, ["driveId", "residentId"])
+            .values([{"driveId": parsed[i][1], "residentId": resident.id} for i in to_request])
+            .returning(Stop.__table__.c.id, Stop.__table__.c.driveId)
+        ).all()
+        created = {drive_id: stop_id for stop_id, drive_id in inserted}
+    for index in to_request:
+        drive_id = parsed[index][1]
+        if drive_id in created:
+            results[index] = {"drive_id": drive_id, "op": "request", "status": "created",
+                              "stop": {"id": created[drive_id], "driveId": drive_id, "residentId": resident.id}}
+        else:
+            # Another request inserted it between our read and the insert
+            results[index] = _stop_error(drive_id, "request", f"You have already requested a stop for drive {drive_id}.")
+
+    cancelled = {parsed[index][1]: stops[parsed[index][1]].id for index in to_cancel}
+    if cancelled:
+        db.session.execute(db.delete(Stop.__table__).where(Stop.__table__.c.id.in_(cancelled.values())))
+        for drive_id in cancelled:
+            release_reservations(resident.id, drive_id)
+    for index in to_cancel:
+        drive_id = parsed[index][1]
+        results[index] = {"drive_id": drive_id, "op": "cancel", "status": "cancelled", "stop_id": cancelled[drive_id]}
+
+    # Read before the commit expires the drives
+    driver_of = {drive_id: drive.driverId for drive_id, drive in drives.items()}
+    log_changes(db.session, [
+        stop_change(stop_id, UPSERT, driver_of[d], resident.id) for d, stop_id in created.items()
+    ] + [
+        stop_change(stop_id, DELETE, driver_of[d], resident.id) for d, stop_id in cancelled.items()
+    ])
+
+    fresh = [(key, results[index]) for index, (_, _, key) in enumerate(parsed) if key and key not in replayed]
+    if fresh:
+        db.session.execute(db.delete(IdempotencyKey).where(
+            IdempotencyKey.residentId == resident.id, IdempotencyKey.created_at < now - IDEMPOTENCY_KEY_TTL
+        ))
+        db.session.execute(
+            insert_ignoring_conflicts(IdempotencyKey.__table__, ["residentId", "key"]).values([
+                {"residentId": resident.id, "key": key, "requestHash": keys[key], "result": result, "created_at": now}
+                for key, result in fresh
+            ])
+        )
+
+    parts = []
+    if created:
+        parts.append("Stops requested for drives " + ", ".join(str(d) for d in sorted(created)) + ".")
+    if cancelled:
+        parts.append("Stops cancelled for drives " + ", ".join(str(d) for d in sorted(cancelled)) + ".")
+    if parts:
+        # Commits the stops, the change log and the keys together
+        resident.receive_notif(" ".join(parts), "stops_updated")
+    else:
+        db.session.commit()
+
+    for event, changed in ((events.STOP_REQUESTED, created), (events.STOP_CANCELLED, cancelled)):
+        for drive_id, stop_id in changed.items():
+            events.emit(event, {"id": stop_id, "driveId": drive_id, "driverId": driver_of[drive_id],
+                                "residentId": resident.id})
+    return results
+
+
 
 # NOTIFICATIONS
 
@@ -141,6 +379,17 @@ def resident_update_notification_preferences(resident, preferences):
     return resident
 
 
+def flush_notification_digests(force=False):
+    """Add each resident's pending daily digest once it is due. Returns how
+    many residents got one."""
+    flushed = 0
+    for resident in Resident.query.filter(Resident.notification_state.isnot(None)):
+        if resident.flush_digest(force=force):
+            flushed += 1
+    db.session.commit()
+    return flushed
+
+
 
 # DRIVER INFORMATION VIEWS
 
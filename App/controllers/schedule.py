@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+
+from App.models import Drive, DriveSchedule, DriveStreet, Resident, Street
+from App.models.change_log import log_changes, drive_change, UPSERT
+from App.models.drive_schedule import WEEKDAYS
+from App.database import db
+from App.controllers.driver import SCHEDULE_HORIZON_DAYS
+from App import events, serializers
+
+
+def create_schedule(driver, area_id, street_id, weekdays, time_str, menu=None, eta_str=None,
+                    starts_on=None, until=None, interval=1):
+    """Add a weekly route and create its drives for the scheduling horizon.
+    ``weekdays`` are RRULE BYDAY codes (``["MO", "TH"]``); dates are
+    ``YYYY-MM-DD`` strings. Returns the schedule."""
+    weekdays = [str(day).upper() for day in (weekdays or [])]
+    if not weekdays or any(day not in WEEKDAYS for day in weekdays):
+        raise ValueError("weekdays must be a list of MO, TU, WE, TH, FR, SA, SU.")
+    weekdays = sorted(set(weekdays), key=WEEKDAYS.index)
+    try:
+        time = datetime.strptime(time_str, "%H:%M").time()
+        eta = datetime.strptime(eta_str, "%H:%M").time() if eta_str else None
+        starts_on = datetime.strptime(starts_on, "%Y-%m-%d").date() if starts_on else datetime.now().date()
+        until = datetime.strptime(until, "%Y-%m-%d").date() if until else None
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date or time format. Use YYYY-MM-DD and HH:MM.")
+    if not isinstance(interval, int) or not 1 <= interval <= 4:
+        raise ValueError("interval must be a number of weeks from 1 to 4.")
+    if until and until < starts_on:
+        raise ValueError("until must not be before starts_on.")
+
+    street = Street.query.get(street_id)
+    if not street or street.areaId != area_id:
+        raise ValueError("Street not found in this area.")
+
+    schedule = DriveSchedule(driver.id, area_id, street_id, weekdays, time, starts_on,
+                             interval=interval, until=until, menu=menu, eta=eta)
+    db.session.add(schedule)
+    db.session.commit()
+    materialize_schedules([schedule])
+    return schedule
+
+
+def get_driver_schedules(driver):
+    return DriveSchedule.query.filter_by(driverId=driver.id, active=True).order_by(DriveSchedule.id).all()
+
+
+def stop_schedule(driver, schedule_id):
+    """Stop creating drives from a schedule. Drives already created stay."""
+    schedule = DriveSchedule.query.get(schedule_id)
+    if not schedule or schedule.driverId != driver.id:
+        raise ValueError("Schedule not found or you don't have permission.")
+    schedule.active = False
+    db.session.commit()
+    return schedule
+
+
+def materialize_schedules(schedules=None, now=None):
+    """Create the drives that active schedules call for between now and the
+    scheduling horizon, skipping any street that already has a drive that
+    day. Safe to run repeatedly, e.g. nightly to roll the horizon forward.
+
+    New drives are written with one insert, and each resident on an affected
+    street gets one notification listing them. Returns the new drive ids.
+    """
+    now = now or datetime.now()
+    # The same window driver_schedule_drive accepts, to the minute
+    horizon = now + timedelta(days=SCHEDULE_HORIZON_DAYS)
+    today = now.date()
+    if schedules is None:
+        schedules = DriveSchedule.query.filter_by(active=True).order_by(DriveSchedule.id).all()
+    if not schedules:
+        return []
+
+    streets = {schedule.streetId for schedule in schedules}
+    taken = set(db.session.execute(
+        db.select(Drive.areaId, DriveStreet.streetId, Drive.date)
+        .join(DriveStreet, DriveStreet.driveId == Drive.id)
+        .where(DriveStreet.streetId.in_(streets), Drive.date.between(today, horizon.date()))
+    ).all())
+
+    rows = []
+    for schedule in schedules:
+        for day in schedule.occurrences(today, horizon.date()):
+            if not now < datetime.combine(day, schedule.time) <= horizon \
+                    or (schedule.areaId, schedule.streetId, day) in taken:
+                continue
+            taken.add((schedule.areaId, schedule.streetId, day))
+            rows.append({
+                "driverId": schedule.driverId, "areaId": schedule.areaId, "streetId": schedule.streetId,
+                "date": day, "time": schedule.time, "status": "Upcoming",
+                "menu": schedule.menu, "eta": schedule.eta,
+            })
+    if not rows:
+        return []
+
+    # A multi-row RETURNING makes no promise about order, so match the ids
+    # back to their rows by (area, street, date), which is unique per batch
+    table = Drive.__table__
+    inserted = db.session.execute(
+        table.insert().values(rows).returning(table.c.id, table.c.areaId, table.c.streetId, table.c.date)
+    ).all()
+    by_key = {(row["areaId"], row["streetId"], row["date"]): row for row in rows}
+    drives = [dict(by_key[(area_id, street_id, day)], id=drive_id)
+              for drive_id, area_id, street_id, day in inserted]
+    ids = [drive["id"] for drive in drives]
+    db.session.execute(DriveStreet.__table__.insert(), [
+        {"driveId": d["id"], "streetId": d["streetId"], "position": 0} for d in drives
+    ])
+    log_changes(db.session, [drive_change(d["id"], UPSERT, d["driverId"], d["streetId"]) for d in drives])
+
+    by_street = {}
+    for drive in drives:
+        by_street.setdefault(drive["streetId"], []).append(drive)
+    residents = Resident.query.filter(Resident.streetId.in_(by_street)).all()
+    for resident in residents:
+        if "drive_scheduled" not in (resident.notification_preferences or []):
+            continue
+        street_drives = by_street[resident.streetId]
+        when = ", ".join(f"{d['date'].isoformat()} {d['time'].strftime('%H:%M')}" for d in street_drives[:10])
+        if len(street_drives) > 10:
+            when += f" and {len(street_drives) - 10} more"
+        resident.add_notif(f"{len(street_drives)} bread van drives scheduled: {when}", "drive_scheduled")
+        if resident.subscribed_drives is None:
+            resident.subscribed_drives = []
+        resident.subscribed_drives.extend(d["id"] for d in street_drives)
+    db.session.commit()
+
+    events.emit_many(events.DRIVE_SCHEDULED, serializers.DRIVE.all(Drive.id.in_(ids), order_by=Drive.id))
+    return ids
+
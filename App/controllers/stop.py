@@ -35,16 +35,15 @@ def get_stops_by_drive_and_resident(drive_id, resident_id):
 
 
 def get_resident_stops_for_map(resident):
-    stops = Stop.query.filter_by(residentId=resident.id).all()
-    stops_data = []
-    for stop in stops:
-        drive = Drive.query.get(stop.driveId)
-        # Assuming each Drive has area/street lat/lng or resident has lat/lng
-        lat, lng = resident.lat, resident.lng  # store lat/lng for each resident
-        stops_data.append({
-            "id": stop.id,
-            "driveId": stop.driveId,
-            "lat": lat,
-            "lng": lng
-        })
-    return stops_data
+    """The resident's stops on upcoming and in-progress drives, placed at
+    the resident's location."""
+    if resident.lat is None or resident.lng is None:
+        return []
+    rows = db.session.execute(
+        db.select(Stop.id, Stop.driveId, Drive.status)
+        .join(Drive, Drive.id == Stop.driveId)
+        .where(Stop.residentId == resident.id, Drive.status.in_(("Upcoming", "In Progress")))
+        .order_by(Stop.id)
+    )
+    return [{"id": stop_id, "driveId": drive_id, "status": status, "lat": resident.lat, "lng": resident.lng}
+            for stop_id, drive_id, status in rows]
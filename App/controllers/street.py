@@ -1,5 +1,8 @@
 from App.models import Street, Area
 from App.database import db
+from App import serializers
+from App.autocomplete import STREET, get_name_index
+from App.geo import parse_points
 
 # All street-related business logic will be moved here as functions
 def create_street(areaId, name):
@@ -21,6 +24,15 @@ def get_street_by_id(areaId, street_id):
         raise ValueError("Invalid street ID.")
     return street
 
+def set_street_path(street_id, points):
+    """Set or (with ``None``) clear the street's polyline, ``[[lat, lng], ...]``."""
+    street = Street.query.get(street_id)
+    if not street:
+        raise ValueError("Invalid street ID.")
+    street.path = parse_points(points, 2) if points is not None else None
+    db.session.commit()
+    return street
+
 def get_all_streets():
     return Street.query.all()
 
@@ -36,9 +48,16 @@ def delete_street(areaId, street_id):
 
 
 
-def get_streets_by_name(name):
-    return Street.query.filter(Street.name.ilike(f"%{name}%")).all()
+def get_streets_by_name(name, limit=20):
+    ids = [entry[1] for entry in get_name_index().search(name, limit, kind=STREET)]
+    streets = {street.id: street for street in Street.query.filter(Street.id.in_(ids))} if ids else {}
+    return [streets[street_id] for street_id in ids if street_id in streets]
 
 def get_streets_by_area(area_id):
     return Street.query.filter_by(areaId=area_id).all()
 
+def get_streets_json(area_id=None):
+    if area_id:
+        return serializers.STREET.all(Street.areaId == area_id, order_by=Street.id)
+    return serializers.STREET.all(order_by=Street.id)
+
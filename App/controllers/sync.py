@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from App.models import ChangeLog, Drive, DriveStreet, Stop, Item, Driver, Resident
+from App.models.change_log import DELETE
+from App.database import db
+from App import serializers
+
+# Change log rows handed out per call; clients keep calling while "more" is true
+SYNC_PAGE_SIZE = 500
+
+_ENTITIES = {
+    "drives": (serializers.DRIVE, Drive.id),
+    "stops": (serializers.STOP, Stop.id),
+    "items": (serializers.ITEM, Item.id),
+}
+
+
+class SyncTokenExpired(ValueError):
+    pass
+
+
+def parse_sync_token(value):
+    if value in (None, ""):
+        return None
+    if not value.isdigit():
+        raise ValueError("Invalid sync token.")
+    return int(value)
+
+
+def latest_seq():
+    return db.session.scalar(db.select(db.func.max(ChangeLog.id))) or 0
+
+
+def _rescan_seconds():
+    seconds = current_app.config.get("SYNC_RESCAN_SECONDS")
+    if seconds is None:
+        seconds = 0 if db.engine.dialect.name == "sqlite" else 60
+    return float(seconds)
+
+
+def _window_start(seq):
+    """When the rescan window below ``seq`` starts, or None without one."""
+    seconds = _rescan_seconds()
+    if not seconds or not seq:
+        return None
+    logged = db.session.scalar(db.select(ChangeLog.created_at).where(ChangeLog.id == seq))
+    return logged - timedelta(seconds=seconds) if logged else None
+
+
+def change_version():
+    """Moves whenever a change is logged, including one that commits below
+    the latest id inside the rescan window."""
+    seq = latest_seq()
+    start = _window_start(seq)
+    if start is None:
+        return str(seq)
+    recent = db.session.scalar(
+        db.select(db.func.count(ChangeLog.id)).where(ChangeLog.created_at >= start))
+    return f"{seq}.{recent}"
+
+
+def _visible_to(user):
+    everyone = db.and_(ChangeLog.driverId.is_(None), ChangeLog.residentId.is_(None),
+                       ChangeLog.streetId.is_(None))
+    if isinstance(user, Driver):
+        return db.or_(everyone, ChangeLog.driverId == user.id)
+    if isinstance(user, Resident):
+        # Drive changes are logged against the route's first street; later
+        # streets find theirs through the route
+        on_route = db.and_(ChangeLog.entity == "drives", ChangeLog.rowId.in_(
+            db.select(DriveStreet.driveId).where(DriveStreet.streetId == user.streetId)))
+        return db.or_(everyone, ChangeLog.residentId == user.id, ChangeLog.streetId == user.streetId, on_route)
+    return everyone
+
+
+def _drive_scope(user):
+    if isinstance(user, Driver):
+        return Drive.driverId == user.id
+    if isinstance(user, Resident):
+        return Drive.on_street(user.streetId)
+    return db.false()
+
+
+def _stop_scope(user):
+    if isinstance(user, Driver):
+        return Stop.driveId.in_(db.select(Drive.id).where(Drive.driverId == user.id))
+    if isinstance(user, Resident):
+        return Stop.residentId == user.id
+    return db.false()
+
+
+def _snapshot(user):
+    # Read the sequence first: anything committed while the snapshot is read is
+    # sent again on the next call, which is harmless for upserts.
+    token = latest_seq()
+    result = {
+        "token": str(token),
+        "full": True,
+        "more": False,
+        "drives": {"upserted": serializers.DRIVE.all(_drive_scope(user), order_by=Drive.id), "deleted": []},
+        "stops": {"upserted": serializers.STOP.all(_stop_scope(user), order_by=Stop.id), "deleted": []},
+        "items": {"upserted": serializers.ITEM.all(order_by=Item.id), "deleted": []},
+    }
+    if isinstance(user, Resident):
+        result["notifications"] = {"inbox": list(user.inbox or [])}
+    return result
+
+
+def sync_changes(user, since=None, limit=SYNC_PAGE_SIZE):
+    """Everything ``user`` can see that changed after the ``since`` token.
+
+    Without a token the full visible state is returned. Rows changed several
+    times are sent once, in their current form; deleted rows only by id.
+    Changes in the rescan window just below the token are sent again.
+    """
+    if since is None:
+        return _snapshot(user)
+
+    oldest = db.session.scalar(db.select(db.func.min(ChangeLog.id)))
+    if oldest is not None and since < oldest - 1:
+        raise SyncTokenExpired("Sync token has expired, sync again without a token.")
+
+    columns = (ChangeLog.id, ChangeLog.entity, ChangeLog.rowId, ChangeLog.op)
+    rows = db.session.execute(
+        db.select(*columns)
+        .where(ChangeLog.id > since, _visible_to(user))
+        .order_by(ChangeLog.id)
+        .limit(limit + 1)
+    ).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    # Changes that may have committed after the token was handed out; they
+    # neither count towards the page nor move the token
+    start = _window_start(since)
+    resent = db.session.execute(
+        db.select(*columns)
+        .where(ChangeLog.id <= since, ChangeLog.created_at >= start, _visible_to(user))
+        .order_by(ChangeLog.id)
+    ).all() if start else []
+
+    # Only the last change to each row matters
+    latest = {}
+    for _, entity, row_id, op in resent + rows:
+        latest[(entity, row_id)] = op
+
+    result = {"token": str(rows[-1][0] if rows else since), "full": False, "more": more}
+    for entity, (serializer, id_column) in _ENTITIES.items():
+        upserted = [row_id for (kind, row_id), op in latest.items() if kind == entity and op != DELETE]
+        deleted = [row_id for (kind, row_id), op in latest.items() if kind == entity and op == DELETE]
+        result[entity] = {
+            "upserted": serializer.all(id_column.in_(upserted), order_by=id_column) if upserted else [],
+            "deleted": sorted(deleted),
+        }
+    if isinstance(user, Resident) and ("notifications", user.id) in latest:
+        result["notifications"] = {"inbox": list(user.inbox or [])}
+    return result
+
+
+def prune_change_log(days=30):
+    """Delete change log rows older than ``days``, always keeping the newest
+    so older tokens can still be recognised as expired. Returns the count."""
+    cutoff = datetime.now() - timedelta(days=days)
+    newest = latest_seq()
+    result = db.session.execute(
+        db.delete(ChangeLog).where(ChangeLog.created_at < cutoff, ChangeLog.id < newest)
+    )
+    db.session.commit()
+    return result.rowcount
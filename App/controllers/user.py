@@ -1,5 +1,6 @@
 from App.models import User, Driver
 from App.database import db
+from App import serializers
 
 def create_user(username, password):
     newuser = User(username=username, password=password)
@@ -7,6 +8,14 @@ def create_user(username, password):
     db.session.commit()
     return newuser
 
+def create_admin(username, password):
+    """A plain user account with admin rights. Only the CLI calls this."""
+    admin = User(username=username, password=password)
+    admin.is_admin = True
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
 def get_user_by_username(username):
     result = db.session.execute(db.select(User).filter_by(username=username))
     return result.scalar_one_or_none()
@@ -18,11 +27,7 @@ def get_all_users():
     return db.session.scalars(db.select(User)).all()
 
 def get_all_users_json():
-    users = get_all_users()
-    if not users:
-        return []
-    users = [user.get_json() for user in users]
-    return users
+    return serializers.users_json()
 
 def update_user(id, username):
     user = get_user(id)
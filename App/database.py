@@ -1,14 +1,362 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, request, has_app_context, has_request_context, current_app
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from jwt import PyJWTError
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, exc, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.expression import UpdateBase
+
+
+# READ REPLICA ROUTING
+
+PRIMARY_COOKIE = "db_primary_until"
+
+# JWT identity -> Unix time until which that user's reads go to the primary.
+# Per process; App.events carries new entries to other workers.
+_primary_until = {}
+
+# Called with (identity, until) when a user's reads are pinned to the primary
+primary_pin_hooks = []
+
+
+class RoutingSession(Session):
+    """Sends reads to a replica engine while replica reads are switched on
+    (see ``replica_reads`` and ``use_replica``). Flushes, DML statements and
+    anything outside those scopes go to the primary."""
+
+    _replica = None
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase) and _replica_enabled(self):
+            if self._replica is None:
+                replicas = current_app.extensions.get("db_replicas")
+                # One replica per session keeps a request's reads consistent
+                self._replica = random.choice(replicas) if replicas else False
+            if self._replica:
+                return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _replica_enabled(session):
+    if session.info.get("wrote") or not has_app_context() or not g.get("_db_use_replica"):
+        return False
+    if has_request_context():
+        # Users who wrote within the stickiness window keep reading the
+        # primary. The cookie also covers anonymous clients, and a worker
+        # that has not heard about the write yet.
+        until = request.cookies.get(PRIMARY_COOKIE, "")
+        if until.isdigit() and int(until) > time.time():
+            return False
+        identity = _request_identity()
+        # False while the token's user is being loaded: that lookup reads the
+        # primary, as it does under jwt_required
+        if identity is False or (identity is not None and _primary_until.get(identity, 0) > time.time()):
+            return False
+    return True
+
+
+def _request_identity():
+    """The JWT identity of the request, or None without a valid token."""
+    if "_db_identity" not in g:
+        g._db_identity = False
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except (JWTExtendedException, PyJWTError):
+            identity = None
+        g._db_identity = None if identity is None else str(identity)
+    return g._db_identity
+
+
+def _forget_identity(exc=None):
+    g.pop("_db_identity", None)
+
+
+def pin_to_primary(identity, until):
+    """Send ``identity``'s reads to the primary until Unix time ``until``."""
+    now = time.time()
+    if len(_primary_until) > 10_000:
+        for key in [key for key, value in _primary_until.items() if value <= now]:
+            _primary_until.pop(key, None)
+    _primary_until[identity] = max(until, _primary_until.get(identity, 0))
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_dml(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@contextmanager
+def use_replica():
+    """Run the enclosed queries against a replica when one is configured."""
+    previous = g.get("_db_use_replica", False)
+    g._db_use_replica = True
+    try:
+        yield
+    finally:
+        g._db_use_replica = previous
+
+
+def replica_reads(view):
+    """View decorator: route the request's reads to a replica unless the
+    client wrote recently (read-your-writes)."""
+    @wraps(view)
+    def inner(*args, **kwargs):
+        with use_replica():
+            return view(*args, **kwargs)
+    return inner
+
+
+def _stick_writers_to_primary(response):
+    if db.session.info.get("wrote"):
+        window = int(current_app.config["DB_READ_YOUR_WRITES_SECONDS"])
+        until = int(time.time()) + window
+        identity = _request_identity()
+        if identity is not None:
+            pin_to_primary(identity, until)
+            for hook in primary_pin_hooks:
+                hook(identity, until)
+        response.set_cookie(PRIMARY_COOKIE, str(until), max_age=window, httponly=True, samesite="Lax")
+    return response
+
+
+# DATA VERSIONS
+
+# Per-table counters bumped after each commit that wrote to the table. They are
+# per process; App.events carries the bumps to other workers, but anything
+# keyed on them should still expire on a timer in case an event is missed.
+_table_versions = {}
+
+# Called with the written table names after each commit
+table_write_hooks = []
+
+
+def data_version(*tables):
+    """Current version of each named table, as a tuple usable in cache keys."""
+    return tuple(_table_versions.get(table, 0) for table in tables)
+
 
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_written_tables(session, flush_context):
+    written = session.info.setdefault("written_tables", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        written.update(table.name for table in inspect(obj).mapper.tables)
 
-db = SQLAlchemy()
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    if not orm_execute_state.is_select:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            orm_execute_state.session.info.setdefault("written_tables", set()).add(table.name)
+
+
+def bump_versions(tables):
+    for table in tables:
+        _table_versions[table] = _table_versions.get(table, 0) + 1
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _bump_versions(session):
+    tables = session.info.pop("written_tables", None)
+    if tables:
+        bump_versions(tables)
+        for hook in table_write_hooks:
+            hook(tables)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_written_tables(session):
+    session.info.pop("written_tables", None)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+def insert_ignoring_conflicts(table, conflict_columns):
+    """``INSERT ... ON CONFLICT DO NOTHING`` on Postgres and SQLite. Rows that
+    hit the unique index on ``conflict_columns`` are skipped; ``RETURNING``
+    only yields the rows actually inserted."""
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table).on_conflict_do_nothing(index_elements=conflict_columns)
 
 def get_migrate(app):
+    from flask_migrate import Migrate
+
     return Migrate(app, db)
 
 def create_db():
     db.create_all()
-    
+
 def init_db(app):
-    db.init_app(app)
\ No newline at end of file
+    db.init_app(app)
+    app.teardown_request(_forget_identity)
+    uris = app.config.get("SQLALCHEMY_REPLICA_URIS")
+    if uris:
+        if isinstance(uris, str):
+            uris = [uri.strip() for uri in uris.split(",") if uri.strip()]
+        # Replicas are kept out of SQLALCHEMY_BINDS so create_all/drop_all and
+        # migrations never touch them.
+        app.extensions["db_replicas"] = [
+            create_engine(uri, **engine_options(dict(app.config, SQLALCHEMY_DATABASE_URI=uri)))
+            for uri in uris
+        ]
+        app.after_request(_stick_writers_to_primary)
+
+
+# CONNECTION POOL
+
+POOL_DEFAULTS = {
+    "DB_POOL_SIZE": 5,
+    "DB_MAX_OVERFLOW": 10,
+    "DB_POOL_TIMEOUT": 30,
+    "DB_POOL_RECYCLE": 1800,
+    "DB_POOL_PRE_PING": True,
+    "DB_PGBOUNCER": False,
+    "DB_READ_YOUR_WRITES_SECONDS": 5,
+}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        with self._stats_lock:
+            self.waiting += 1
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.waiting -= 1
+                self.timeouts += 1
+            raise
+        except BaseException:
+            with self._stats_lock:
+                self.waiting -= 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.waiting -= 1
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return record
+
+    def stats(self):
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+def engine_options(config):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings.
+
+    SQLite keeps Flask-SQLAlchemy's driver defaults. Anything already set in
+    SQLALCHEMY_ENGINE_OPTIONS wins over the DB_* values.
+    """
+    explicit = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite":
+        return explicit
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(config["DB_POOL_SIZE"]),
+        "max_overflow": int(config["DB_MAX_OVERFLOW"]),
+        "pool_timeout": float(config["DB_POOL_TIMEOUT"]),
+        "pool_recycle": int(config["DB_POOL_RECYCLE"]),
+        "pool_pre_ping": bool(config["DB_POOL_PRE_PING"]),
+    }
+    if config["DB_PGBOUNCER"]:
+        # PgBouncer in transaction mode hands each transaction a different
+        # server connection, so statements prepared on one are missing on the
+        # next. psycopg 3 prepares automatically; psycopg2 (the driver in
+        # requirements.txt) never does.
+        driver = url.get_driver_name()
+        if driver == "psycopg":
+            options["connect_args"] = {"prepare_threshold": None}
+        elif driver != "psycopg2":
+            raise ValueError(f"DB_PGBOUNCER supports the psycopg2 and psycopg drivers, not {driver}.")
+    options.update(explicit)
+    return options
+
+
+def pool_stats():
+    stats = {}
+    for bind, engine in db.engines.items():
+        pool = engine.pool
+        if isinstance(pool, InstrumentedQueuePool):
+            stats[bind or "default"] = pool.stats()
+        else:
+            stats[bind or "default"] = {"status": pool.status()}
+    return stats
+
+
+def dispose_engines(app):
+    """Drop pooled connections inherited from a parent process. Call in each
+    worker after fork; ``close=False`` leaves the parent's sockets alone."""
+    with app.app_context():
+        engines = list(db.engines.values())
+    engines += app.extensions.get("db_replicas", [])
+    for engine in engines:
+        engine.dispose(close=False)
+
+
+def gevent_wait_callback(conn, timeout=None):
+    """psycopg2 wait callback that yields to the gevent hub instead of
+    blocking the whole worker on socket I/O."""
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import extensions, OperationalError
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+
+def patch_psycopg2_for_gevent():
+    from psycopg2 import extensions
+
+    if not hasattr(extensions, "set_wait_callback"):
+        raise ImportError("psycopg2 was built without coroutine support")
+    extensions.set_wait_callback(gevent_wait_callback)
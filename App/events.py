@@ -0,0 +1,249 @@
+"""Domain events shared by every worker.
+
+Controllers ``emit`` events such as ``drive_started`` once their change is
+committed, and any module can ``subscribe`` a handler to run in every worker
+when one arrives. That is how per-process state (live update streams, cached
+fragments) follows writes made by another worker.
+
+On Postgres events travel as ``NOTIFY`` on one channel and a listener thread
+in each worker (a greenlet under gevent) receives them, including the
+worker's own. On SQLite there is only ever one process, so they are handed
+to the handlers directly.
+
+Events emitted while handling a request are held until the request ends and
+sent together; outside a request they go out at once. Payloads are encoded
+as compact JSON, ``[[event, data], ...]``, split to fit ``NOTIFY``'s limit.
+"""
+import abc
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+
+from flask import current_app, g, has_app_context, has_request_context
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from App.database import db, bump_versions, table_write_hooks, pin_to_primary, primary_pin_hooks
+
+logger = logging.getLogger(__name__)
+
+EVENT_DEFAULTS = {
+    # "postgres" or "local"; chosen from SQLALCHEMY_DATABASE_URI when None
+    "EVENTS_BACKEND": None,
+    "EVENTS_CHANNEL": "bread_van_events",
+}
+
+DRIVE_SCHEDULED = "drive_scheduled"
+DRIVE_CANCELLED = "drive_cancelled"
+DRIVE_STARTED = "drive_started"
+DRIVE_ENDED = "drive_ended"
+DRIVE_UPDATED = "drive_updated"
+STOP_REQUESTED = "stop_requested"
+STOP_CANCELLED = "stop_cancelled"
+LOCATION_UPDATED = "location_updated"
+TABLES_CHANGED = "tables_changed"
+READS_PINNED = "reads_pinned"
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD = 7900
+
+# With os.getpid(), tells a worker's own events apart from other workers'
+# (pids repeat across hosts)
+HOST_ID = uuid.uuid4().hex[:8]
+
+
+def process_id():
+    return f"{HOST_ID}:{os.getpid()}"
+
+
+def encode(batch):
+    return json.dumps(batch, separators=(",", ":"), default=str)
+
+
+def chunks(batch, limit=MAX_PAYLOAD):
+    """Encoded payloads for ``batch``, each under ``limit`` bytes. A single
+    event that cannot fit is dropped and logged."""
+    payloads, current = [], []
+    for item in batch:
+        if len(encode(current + [item]).encode()) < limit:
+            current.append(item)
+            continue
+        if current:
+            payloads.append(encode(current))
+        if len(encode([item]).encode()) < limit:
+            current = [item]
+        else:
+            logger.error("Event %s is too large to send", item[0])
+            current = []
+    if current:
+        payloads.append(encode(current))
+    return payloads
+
+
+class EventBus(abc.ABC):
+    """Handlers by event name plus ``send(batch)`` to reach every worker."""
+
+    def __init__(self, app=None):
+        self.app = app
+        self._handlers = {}
+
+    def subscribe(self, event, handler):
+        self._handlers.setdefault(event, []).append(handler)
+
+    def dispatch(self, batch):
+        for event, data in batch:
+            for handler in self._handlers.get(event, ()):
+                try:
+                    handler(event, data)
+                except Exception:
+                    logger.exception("Handler for %s failed", event)
+
+    def start(self):
+        pass
+
+    @abc.abstractmethod
+    def send(self, batch):
+        """Deliver ``batch`` (``[(event, data)]``) to every worker's handlers."""
+
+
+class LocalBus(EventBus):
+    """Single process: handlers run straight away."""
+
+    def send(self, batch):
+        self.dispatch(batch)
+
+
+class PostgresBus(EventBus):
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.channel = app.config["EVENTS_CHANNEL"]
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start this process's listener; safe to call repeatedly, and again
+        after a fork, which does not carry threads over."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._listen, name="events-listener", daemon=True).start()
+
+    def send(self, batch):
+        payloads = chunks(batch)
+        if not payloads:
+            return
+        with db.engine.connect() as connection:
+            for payload in payloads:
+                connection.execute(text("SELECT pg_notify(:channel, :payload)"),
+                                   {"channel": self.channel, "payload": payload})
+            connection.commit()
+
+    def _listen(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    # Kept out of the pool: it is held for the life of the worker
+                    raw = db.engine.raw_connection()
+                    connection = raw.driver_connection
+                    raw.detach()
+                    connection.autocommit = True
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'LISTEN "{self.channel}"')
+                    while True:
+                        if select.select([connection], [], [], 30) == ([], [], []):
+                            continue
+                        connection.poll()
+                        while connection.notifies:
+                            notify = connection.notifies.pop(0)
+                            self.dispatch(json.loads(notify.payload))
+            except Exception:
+                logger.exception("Event listener lost its connection, reconnecting")
+                time.sleep(5)
+
+
+BACKENDS = {"local": LocalBus, "postgres": PostgresBus}
+
+
+def backend_name(config):
+    if config["EVENTS_BACKEND"]:
+        return config["EVENTS_BACKEND"]
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    return "postgres" if url.get_backend_name() == "postgresql" else "local"
+
+
+def get_bus(app=None):
+    app = app or (current_app if has_app_context() else None)
+    return app.extensions.get("events") if app is not None else None
+
+
+def subscribe(event, handler, app=None):
+    get_bus(app).subscribe(event, handler)
+
+
+def emit(event, data):
+    """Send ``event`` to every worker. Call once the change is committed."""
+    emit_many(event, [data])
+
+
+def emit_many(event, items):
+    """``emit`` for each of ``items``, sent as one batch."""
+    bus = get_bus()
+    if bus is None or not items:
+        return
+    batch = [[event, data] for data in items]
+    if has_request_context():
+        g.setdefault("pending_events", []).extend(batch)
+    else:
+        bus.send(batch)
+
+
+def _send_pending(exc=None):
+    pending = g.pop("pending_events", None)
+    if pending:
+        try:
+            get_bus().send(pending)
+        except Exception:
+            logger.exception("Could not send %d events", len(pending))
+
+
+def _announce_tables(tables):
+    emit(TABLES_CHANGED, {"from": process_id(), "tables": sorted(tables)})
+
+
+def _bump_table_versions(event, data):
+    # The sender bumped its own versions on commit
+    if data["from"] != process_id():
+        bump_versions(data["tables"])
+
+
+def _announce_pin(identity, until):
+    emit(READS_PINNED, {"from": process_id(), "identity": identity, "until": until})
+
+
+def _pin_reads(event, data):
+    if data["from"] != process_id():
+        pin_to_primary(data["identity"], data["until"])
+
+
+def init_events(app):
+    bus = BACKENDS[backend_name(app.config)](app)
+    app.extensions["events"] = bus
+    # Listener threads do not survive a fork, so each worker starts its own
+    # from gunicorn's post_fork, or on its first request
+    app.before_request(bus.start)
+    app.teardown_request(_send_pending)
+    if isinstance(bus, PostgresBus):
+        if _announce_tables not in table_write_hooks:
+            table_write_hooks.append(_announce_tables)
+        bus.subscribe(TABLES_CHANGED, _bump_table_versions)
+        if _announce_pin not in primary_pin_hooks:
+            primary_pin_hooks.append(_announce_pin)
+        bus.subscribe(READS_PINNED, _pin_reads)
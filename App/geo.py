@@ -0,0 +1,282 @@
+"""Area boundaries, street paths and the spatial index over them.
+
+An area's ``boundary`` is a polygon and a street's ``path`` a polyline, both
+stored as JSON lists of ``[lat, lng]`` points. ``locate`` resolves a GPS fix
+to the area containing it and the nearest street, and ``streets_near`` lists
+the streets within a distance, so proximity checks only look at residents on
+those streets.
+
+Both come from sort-tile-recursive (STR) packed R-trees of the shapes'
+bounding boxes, built in memory and rebuilt on the first lookup after a
+commit writes to ``area`` or ``street`` (or every ``GEO_INDEX_MAX_AGE``
+seconds), the same way as ``App.autocomplete``. Distances use a local flat
+projection, which is accurate to well under a metre at street scale.
+"""
+import heapq
+import threading
+import time
+from math import ceil, cos, radians, sqrt
+
+from flask import current_app
+
+from App.database import db, data_version
+from App.models import Area, Street
+
+GEO_DEFAULTS = {
+    "GEO_INDEX_MAX_AGE": 300,
+    # A fix further than this from every street is not put on one
+    "STREET_SNAP_DISTANCE_M": 100,
+}
+
+TABLES = ("area", "street")
+
+METRES_PER_DEGREE_LAT = 110_540
+METRES_PER_DEGREE_LNG = 111_320
+
+
+def parse_points(points, minimum):
+    """Validate a JSON list of ``[lat, lng]`` pairs; returns floats."""
+    if not isinstance(points, list) or len(points) < minimum:
+        raise ValueError(f"Expected a list of at least {minimum} [lat, lng] points.")
+    parsed = []
+    for point in points:
+        try:
+            lat, lng = float(point[0]), float(point[1])
+        except (TypeError, ValueError, IndexError, KeyError):
+            raise ValueError("Each point must be [lat, lng].")
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError("Point out of range.")
+        parsed.append([lat, lng])
+    return parsed
+
+
+# GEOMETRY
+
+def bounding_box(points):
+    lats = [lat for lat, _ in points]
+    lngs = [lng for _, lng in points]
+    return (min(lats), min(lngs), max(lats), max(lngs))
+
+
+def _metres(lat, lng, origin_lat, origin_lng):
+    return ((lng - origin_lng) * METRES_PER_DEGREE_LNG * cos(radians(origin_lat)),
+            (lat - origin_lat) * METRES_PER_DEGREE_LAT)
+
+
+def contains(ring, lat, lng):
+    """Ray casting; points on the edge may go either way."""
+    inside = False
+    previous_lat, previous_lng = ring[-1]
+    for point_lat, point_lng in ring:
+        if (point_lat > lat) != (previous_lat > lat):
+            crossing = point_lng + (lat - point_lat) * (previous_lng - point_lng) / (previous_lat - point_lat)
+            if lng < crossing:
+                inside = not inside
+        previous_lat, previous_lng = point_lat, point_lng
+    return inside
+
+
+def distance_to_path(path, lat, lng):
+    """Metres from the point to the nearest segment of ``path``."""
+    points = [_metres(p_lat, p_lng, lat, lng) for p_lat, p_lng in path]
+    if len(points) == 1:
+        return sqrt(points[0][0] ** 2 + points[0][1] ** 2)
+    best = float("inf")
+    for (ax, ay), (bx, by) in zip(points, points[1:]):
+        dx, dy = bx - ax, by - ay
+        length = dx * dx + dy * dy
+        t = 0.0 if length == 0 else max(0.0, min(1.0, -(ax * dx + ay * dy) / length))
+        x, y = ax + t * dx, ay + t * dy
+        best = min(best, sqrt(x * x + y * y))
+    return best
+
+
+def distance_to_box(box, lat, lng):
+    """Metres from the point to the nearest point of ``box``; 0 inside."""
+    x, y = _metres(min(max(lat, box[0]), box[2]), min(max(lng, box[1]), box[3]), lat, lng)
+    return sqrt(x * x + y * y)
+
+
+def _intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _around(lat, lng, metres):
+    dlat = metres / METRES_PER_DEGREE_LAT
+    dlng = metres / (METRES_PER_DEGREE_LNG * max(cos(radians(lat)), 1e-6))
+    return (lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+
+
+# STR-TREE
+
+class STRtree:
+    """Static R-tree over ``(box, value)`` pairs, packed by sort-tile-recursive:
+    sort by box centre longitude, cut into vertical slices, sort each slice by
+    latitude and group runs of ``capacity``, then repeat a level up."""
+
+    def __init__(self, entries, capacity=8):
+        self.capacity = capacity
+        # A node is (box, value, children); leaves have children None
+        level = [(box, value, None) for box, value in entries]
+        self.size = len(level)
+        while len(level) > capacity:
+            level = self._pack(level)
+        self.root = ((self._union(level), None, level) if level else None)
+
+    def _union(self, nodes):
+        return (min(n[0][0] for n in nodes), min(n[0][1] for n in nodes),
+                max(n[0][2] for n in nodes), max(n[0][3] for n in nodes))
+
+    def _pack(self, nodes):
+        groups = ceil(len(nodes) / self.capacity)
+        per_slice = ceil(sqrt(groups)) * self.capacity
+        nodes = sorted(nodes, key=lambda n: n[0][1] + n[0][3])
+        parents = []
+        for start in range(0, len(nodes), per_slice):
+            column = sorted(nodes[start:start + per_slice], key=lambda n: n[0][0] + n[0][2])
+            for group_start in range(0, len(column), self.capacity):
+                group = column[group_start:group_start + self.capacity]
+                parents.append((self._union(group), None, group))
+        return parents
+
+    def __len__(self):
+        return self.size
+
+    def query(self, box):
+        """Values whose box intersects ``box``."""
+        found, stack = [], [self.root] if self.root else []
+        while stack:
+            node_box, value, children = stack.pop()
+            if not _intersects(node_box, box):
+                continue
+            if children is None:
+                found.append(value)
+            else:
+                stack.extend(children)
+        return found
+
+    def nearest(self, lat, lng, distance, max_distance=float("inf")):
+        """``(metres, value)`` for the value closest to the point by
+        ``distance(value, lat, lng)``, or None beyond ``max_distance``.
+        Nodes are visited nearest box first, so most are never opened."""
+        if self.root is None:
+            return None
+        best, counter = (max_distance, None), 0
+        queue = [(distance_to_box(self.root[0], lat, lng), counter, self.root)]
+        while queue:
+            bound, _, (box, value, children) = heapq.heappop(queue)
+            if bound > best[0]:
+                break
+            if children is None:
+                exact = distance(value, lat, lng)
+                if exact <= best[0] and exact != float("inf"):
+                    best = (exact, value)
+                continue
+            for child in children:
+                counter += 1
+                heapq.heappush(queue, (distance_to_box(child[0], lat, lng), counter, child))
+        return best if best[1] is not None else None
+
+
+# INDEX
+
+class GeoIndex:
+    """STR-trees of the mapped areas and streets, rebuilt when the tables
+    change."""
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._areas = self._streets = STRtree([])
+        self._unmapped, self._paths = {}, {}
+        # Bumped on every rebuild, for indexes built on top of this one
+        self.generation = 0
+        self._version = None
+        self._built = 0.0
+        self._lock = threading.Lock()
+
+    def _stale(self):
+        return self._version != data_version(*TABLES) or time.monotonic() - self._built > self.max_age
+
+    def rebuild(self):
+        version = data_version(*TABLES)
+        areas, streets, unmapped = [], [], {}
+        for area_id, name, boundary in db.session.execute(db.select(Area.id, Area.name, Area.boundary)):
+            if boundary:
+                areas.append((bounding_box(boundary), (area_id, name, boundary)))
+        for street_id, name, area_id, path in db.session.execute(
+                db.select(Street.id, Street.name, Street.areaId, Street.path)):
+            if path:
+                streets.append((bounding_box(path), (street_id, name, area_id, path)))
+            else:
+                unmapped.setdefault(area_id, []).append(street_id)
+        self._areas, self._streets, self._unmapped = STRtree(areas), STRtree(streets), unmapped
+        self._paths = {street[0]: street[3] for _, street in streets}
+        self._version, self._built = version, time.monotonic()
+        self.generation += 1
+
+    def current(self):
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self.rebuild()
+        return self
+
+    def area_at(self, lat, lng):
+        point = (lat, lng, lat, lng)
+        matches = [area for area in self._areas.query(point) if contains(area[2], lat, lng)]
+        # Nested areas: the smallest wins
+        return min(matches, key=lambda area: _box_area(bounding_box(area[2])), default=None)
+
+    def nearest_street(self, lat, lng, max_distance, area_id=None):
+        def distance(street, lat, lng):
+            if area_id is not None and street[2] != area_id:
+                return float("inf")
+            return distance_to_path(street[3], lat, lng)
+        return self._streets.nearest(lat, lng, distance, max_distance)
+
+    def streets_within(self, lat, lng, metres):
+        return [street for street in self._streets.query(_around(lat, lng, metres))
+                if distance_to_path(street[3], lat, lng) <= metres]
+
+    def street_path(self, street_id):
+        return self._paths.get(street_id)
+
+    def unmapped_streets(self, area_id):
+        return self._unmapped.get(area_id, [])
+
+    @property
+    def mapped(self):
+        return len(self._areas) + len(self._streets) > 0
+
+
+def _box_area(box):
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+def get_geo_index(app=None):
+    app = app or current_app
+    index = app.extensions.get("geo_index")
+    if index is None:
+        index = app.extensions["geo_index"] = GeoIndex(float(app.config["GEO_INDEX_MAX_AGE"]))
+    return index.current()
+
+
+def locate(lat, lng):
+    """The area containing the point and the nearest street, preferring that
+    area's streets. Either may be None."""
+    index = get_geo_index()
+    area = index.area_at(lat, lng)
+    snap = float(current_app.config["STREET_SNAP_DISTANCE_M"])
+    street = index.nearest_street(lat, lng, snap, area[0] if area else None)
+    if street is None and area is not None:
+        street = index.nearest_street(lat, lng, snap)
+    return {
+        "area": {"id": area[0], "name": area[1]} if area else None,
+        "street": ({"id": street[1][0], "name": street[1][1], "areaId": street[1][2],
+                    "distance_m": round(street[0], 1)} if street else None),
+    }
+
+
+def streets_near(lat, lng, metres):
+    """Ids of mapped streets within ``metres`` of the point."""
+    return [street[0] for street in get_geo_index().streets_within(lat, lng, metres)]
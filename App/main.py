@@ -7,32 +7,51 @@ from werkzeug.datastructures import  FileStorage
 
 from App.database import init_db
 from App.config import load_config
-
-
-from App.controllers import (
-    setup_jwt,
-    add_auth_context
-)
-from App.api.errors import register_error_handlers
-
-from App.views import views
+from App.serializers import init_json
+from App.templating import init_templates
+from App.middleware import init_http
+from App.events import init_events
+from App.realtime import init_realtime
+from App.autocomplete import init_autocomplete
+from App.nearby import init_nearby
+from App.vans import init_vans
 
 
 
 def add_views(app):
+    # Imported here so CLI and worker apps never load the views
+    from App.views import views
+
     for view in views:
         app.register_blueprint(view)
     # API views live under App/views and are registered above
 
-def create_app(overrides={}):
+def create_app(overrides={}, web=True):
+    """Build the app. ``web=False`` gives a slim app for CLI commands and
+    background workers: config, JSON, the database and domain events, without
+    blueprints, CORS, uploads or JWT."""
     app = Flask(__name__, static_url_path='/static')
     load_config(app, overrides)
+    init_json(app)
+    init_db(app)
+    init_events(app)
+    if not web:
+        return app
+
+    from App.controllers import setup_jwt, add_auth_context
+    from App.api.errors import register_error_handlers
+
+    init_http(app)
+    init_realtime(app)
+    init_autocomplete(app)
+    init_nearby(app)
+    init_vans(app)
     CORS(app)
     add_auth_context(app)
     photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES)
     configure_uploads(app, photos)
     add_views(app)
-    init_db(app)
+    init_templates(app)
     jwt = setup_jwt(app)
    
     register_error_handlers(app)
@@ -40,6 +59,5 @@ def create_app(overrides={}):
     @jwt.unauthorized_loader
     def custom_unauthorized_response(error):
         return render_template('401.html', error=error), 401
-    app.app_context().push()
     return app
 
@@ -0,0 +1,154 @@
+"""Conditional GETs and response compression.
+
+Every successful JSON ``GET`` gets a strong ETag over its body and a ``304``
+when the client already has it. Views whose JSON only depends on change-logged
+rows can use ``change_etag`` instead, which answers ``If-None-Match`` before the
+view runs. Compressible bodies above ``COMPRESS_MIN_SIZE`` are sent as brotli
+or gzip, and static files are served from ``.br``/``.gz`` siblings when
+``flask assets compress`` has created them.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from functools import wraps
+
+from flask import current_app, request, make_response, send_from_directory
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # optional, gzip is used without it
+        brotli = None
+
+HTTP_DEFAULTS = {
+    "COMPRESS_MIN_SIZE": 500,
+    "COMPRESS_GZIP_LEVEL": 6,
+    # Brotli's default (11) is meant for static assets; 4 compresses about as
+    # well as gzip 6 for a fraction of the CPU
+    "COMPRESS_BR_QUALITY": 4,
+    "COMPRESS_MIMETYPES": ("application/json", "text/html", "text/css", "text/plain",
+                           "application/javascript", "text/javascript", "image/svg+xml"),
+}
+
+# Tried in order of preference
+STATIC_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepted_encodings():
+    accepted = request.accept_encodings
+    encodings = []
+    if brotli is not None and accepted["br"]:
+        encodings.append("br")
+    if accepted["gzip"]:
+        encodings.append("gzip")
+    return encodings
+
+
+def compress(data, encoding, config):
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESS_BR_QUALITY"])
+    return gzip.compress(data, compresslevel=config["COMPRESS_GZIP_LEVEL"], mtime=0)
+
+
+def _conditional_and_compress(response):
+    if (request.method not in ("GET", "HEAD") or response.status_code != 200
+            or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers):
+        return response
+
+    config = current_app.config
+    if response.mimetype == "application/json":
+        if "ETag" not in response.headers:
+            response.add_etag()
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+
+    if response.mimetype not in config["COMPRESS_MIMETYPES"]:
+        return response
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    encodings = _accepted_encodings()
+    if len(data) < config["COMPRESS_MIN_SIZE"] or not encodings:
+        return response
+
+    response.set_data(compress(data, encodings[0], config))
+    response.headers["Content-Encoding"] = encodings[0]
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The compressed bytes differ from what the strong tag describes;
+        # a weak tag still matches If-None-Match on the next request
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def change_etag(view):
+    """ETag a JSON view from the change log, the user and the URL, and answer
+    a matching ``If-None-Match`` with 304 without running the view.
+
+    Only for views whose output depends on nothing but rows recorded in the
+    change log (drives, stops, items, inboxes)."""
+    @wraps(view)
+    def inner(*args, **kwargs):
+        from App.controllers.sync import change_version
+
+        key = f"{change_version()}|{get_jwt_identity()}|{request.full_path}"
+        etag = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response.set_etag(etag)
+        return response
+    return inner
+
+
+def _precompressed_static(app):
+    def static(filename):
+        # Keep the original type: "x.css.br" would otherwise be served as brotli
+        mimetype = mimetypes.guess_type(filename)[0]
+        accepted = _accepted_encodings() if mimetype in app.config["COMPRESS_MIMETYPES"] else ()
+        for encoding, suffix in STATIC_ENCODINGS:
+            path = safe_join(app.static_folder, filename + suffix)
+            if encoding in accepted and path and os.path.isfile(path):
+                response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype)
+                response.headers["Content-Encoding"] = encoding
+                response.vary.add("Accept-Encoding")
+                return response
+        return app.send_static_file(filename)
+    return static
+
+
+def compress_static_files(folder, types=HTTP_DEFAULTS["COMPRESS_MIMETYPES"], gzip_level=9, br_quality=11):
+    """Write ``.gz`` and ``.br`` next to each compressible static file. Returns
+    the paths written; files that do not get smaller are skipped."""
+    written = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith((".gz", ".br")) or mimetypes.guess_type(name)[0] not in types:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            outputs = [(".gz", gzip.compress(data, compresslevel=gzip_level, mtime=0))]
+            if brotli is not None:
+                outputs.append((".br", brotli.compress(data, quality=br_quality)))
+            for suffix, packed in outputs:
+                if len(packed) < len(data):
+                    with open(path + suffix, "wb") as f:
+                        f.write(packed)
+                    written.append(path + suffix)
+    return written
+
+
+def init_http(app):
+    app.after_request(_conditional_and_compress)
+    if app.static_folder:
+        app.view_functions["static"] = _precompressed_static(app)
@@ -3,10 +3,16 @@ from .driver import Driver
 from .resident import Resident
 
 from .drive import Drive
+from .drive_street import DriveStreet
 from .stop import Stop
 from .area import Area
 from .street import Street
-from .item import Item
+from .item import Item, ItemTag
 from .driver_stock import DriverStock
+from .change_log import ChangeLog
+from .idempotency_key import IdempotencyKey
+from .drive_schedule import DriveSchedule
+from .reservation import DriveStock, Reservation
+from .demand_model import DemandModel
 
 from .observer import Observer, SubjectMixin
\ No newline at end of file
@@ -4,6 +4,8 @@ from App.database import db
 class Area(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(20), nullable=False, unique=True)
+    # Polygon as [[lat, lng], ...]; see App.geo
+    boundary = db.Column(db.JSON)
 
     streets = db.relationship('Street', backref='area')
 
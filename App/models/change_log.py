@@ -0,0 +1,98 @@
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+
+from App.database import db, RoutingSession
+from .drive import Drive
+from .stop import Stop
+from .item import Item
+from .resident import Resident
+
+SYNC_DEFAULTS = {
+    # Change log ids are taken at insert, not at commit, so on Postgres a
+    # transaction can commit a lower id after a client was handed a higher
+    # one. Each delta therefore sends again the changes logged this many
+    # seconds before the token's row (see App.controllers.sync); repeats
+    # are harmless upserts and deletes. None means 60 on Postgres and 0 on SQLite, whose writers
+    # commit one at a time.
+    "SYNC_RESCAN_SECONDS": None,
+}
+
+
+class ChangeLog(db.Model):
+    """One row per create, update or delete of a synced row. ``id`` doubles as
+    the sequence number clients send back as their sync token."""
+    __tablename__ = "change_log"
+    # For the sync rescan window (App.controllers.sync)
+    __table_args__ = (db.Index("ix_change_log_created_at", "created_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    rowId = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)
+    # Who may see the change; all three empty means everyone
+    driverId = db.Column(db.Integer, nullable=True)
+    residentId = db.Column(db.Integer, nullable=True)
+    streetId = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'entity': self.entity,
+            'rowId': self.rowId,
+            'op': self.op,
+        }
+
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+
+def _change(session, obj, op):
+    """The change_log row for a flushed object, or None if it is not synced."""
+    if isinstance(obj, Drive):
+        return drive_change(obj.id, op, obj.driverId, obj.streetId)
+    if isinstance(obj, Stop):
+        with session.no_autoflush:
+            drive = session.get(Drive, obj.driveId)
+        return stop_change(obj.id, op, drive.driverId if drive else None, obj.residentId)
+    if isinstance(obj, Item):
+        return dict(entity="items", rowId=obj.id, op=op, driverId=None, residentId=None, streetId=None)
+    if isinstance(obj, Resident) and op == UPSERT and inspect(obj).attrs.inbox.history.has_changes():
+        return dict(entity="notifications", rowId=obj.id, op=op, driverId=None,
+                    residentId=obj.id, streetId=None)
+    return None
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _log_changes(session, flush_context):
+    changes = []
+    modified = [obj for obj in session.dirty if session.is_modified(obj)]
+    for objects, op in ((session.new, UPSERT), (modified, UPSERT), (session.deleted, DELETE)):
+        for obj in objects:
+            change = _change(session, obj, op)
+            if change:
+                changes.append(change)
+    log_changes(session, changes)
+
+
+def log_changes(session, changes):
+    """Insert change_log rows. The ORM logs flushed objects itself; bulk
+    inserts and deletes that bypass it call this directly."""
+    if changes:
+        now = datetime.now()
+        for change in changes:
+            change["created_at"] = now
+        # Same connection and transaction as the flush, so a rollback drops both
+        session.connection().execute(ChangeLog.__table__.insert(), changes)
+
+
+def drive_change(drive_id, op, driver_id, street_id):
+    return dict(entity="drives", rowId=drive_id, op=op, driverId=driver_id,
+                residentId=None, streetId=street_id)
+
+
+def stop_change(stop_id, op, driver_id, resident_id):
+    return dict(entity="stops", rowId=stop_id, op=op, driverId=driver_id,
+                residentId=resident_id, streetId=None)
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from App.database import db
+
+# Weekday value for the model that covers every day of the week
+ALL_DAYS = 7
+# itemId value for the model of stop requests per drive
+STOPS = 0
+
+
+class DemandModel(db.Model):
+    """Exponentially smoothed demand for one item (or stops) on one street,
+    on one weekday or on all days. One row per model, updated in place as
+    drives complete."""
+    __tablename__ = "demand_model"
+    __table_args__ = (db.Index('uq_demand_model_street_weekday_item', 'streetId', 'weekday', 'itemId', unique=True),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    streetId = db.Column(db.Integer, nullable=False)
+    weekday = db.Column(db.SmallInteger, nullable=False)
+    itemId = db.Column(db.Integer, nullable=False)
+    level = db.Column(db.Float, nullable=False)
+    observations = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    def __init__(self, streetId, weekday, itemId, level=0.0, observations=0):
+        self.streetId = streetId
+        self.weekday = weekday
+        self.itemId = itemId
+        self.level = level
+        self.observations = observations
+
+    def get_json(self):
+        return {
+            'streetId': self.streetId,
+            'weekday': self.weekday,
+            'itemId': self.itemId,
+            'level': self.level,
+            'observations': self.observations,
+        }
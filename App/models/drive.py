@@ -1,4 +1,5 @@
 from App.database import db
+from .drive_street import DriveStreet
 from .observer import SubjectMixin
 
 class Drive(db.Model, SubjectMixin):
@@ -14,8 +15,10 @@ class Drive(db.Model, SubjectMixin):
 
     area = db.relationship("Area", backref="drives")
     street = db.relationship("Street", backref="drives")
+    route = db.relationship("DriveStreet", order_by=DriveStreet.position, cascade="all, delete-orphan")
 
-    def __init__(self, driverId, areaId, streetId, date, time, status, menu=None, eta=None):
+    def __init__(self, driverId, areaId, streetId, date, time, status, menu=None, eta=None, route=None):
+        """``route`` lists the streets visited after ``streetId``, in order."""
         db.Model.__init__(self)
         SubjectMixin.__init__(self)
         self.driverId = driverId
@@ -26,6 +29,22 @@ class Drive(db.Model, SubjectMixin):
         self.status = status
         self.menu = menu
         self.eta = eta
+        self.route = [DriveStreet(street_id, position)
+                      for position, street_id in enumerate([streetId, *(route or [])])]
+
+    @property
+    def street_ids(self):
+        return [stop.streetId for stop in self.route]
+
+    @classmethod
+    def on_street(cls, street_id):
+        """Filter for drives whose route includes ``street_id``."""
+        return cls.id.in_(db.select(DriveStreet.driveId).where(DriveStreet.streetId == street_id))
+
+    @classmethod
+    def with_route(cls):
+        """``Drive.query`` that loads every listed drive's route in one more query."""
+        return cls.query.options(db.selectinload(cls.route))
 
     def get_json(self):
         date_str = self.date.isoformat() if self.date else None
@@ -37,6 +56,7 @@ class Drive(db.Model, SubjectMixin):
             'driverId': self.driverId,
             'areaId': self.areaId,
             'streetId': self.streetId,
+            'streetIds': self.street_ids,
             'date': date_str,
             'time': time_str,
             'status': self.status,
@@ -63,9 +83,9 @@ class Drive(db.Model, SubjectMixin):
     def notify_new_drive(self):
         """Notify all residents in the area/street about a new drive"""
         from .resident import Resident
-        residents_in_area = Resident.query.filter_by(
-            areaId=self.areaId, 
-            streetId=self.streetId
+        residents_in_area = Resident.query.filter(
+            Resident.areaId == self.areaId,
+            Resident.streetId.in_(self.street_ids)
         ).all()
         
         for resident in residents_in_area:
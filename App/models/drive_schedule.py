@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from App.database import db
+
+# RRULE BYDAY codes, indexed by date.weekday()
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+class DriveSchedule(db.Model):
+    """A weekly route for one street, like ``FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TH``.
+    Drives are created from it ahead of time by ``materialize_schedules``."""
+    __tablename__ = "drive_schedule"
+
+    id = db.Column(db.Integer, primary_key=True)
+    driverId = db.Column(db.Integer, db.ForeignKey('driver.id'), nullable=False)
+    areaId = db.Column(db.Integer, db.ForeignKey('area.id'), nullable=False)
+    streetId = db.Column(db.Integer, db.ForeignKey('street.id'), nullable=False)
+    # Comma separated BYDAY codes, e.g. "MO,TH"
+    weekdays = db.Column(db.String(20), nullable=False)
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    time = db.Column(db.Time, nullable=False)
+    menu = db.Column(db.String(200), nullable=True)
+    eta = db.Column(db.Time, nullable=True)
+    starts_on = db.Column(db.Date, nullable=False)
+    until = db.Column(db.Date, nullable=True)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __init__(self, driverId, areaId, streetId, weekdays, time, starts_on,
+                 interval=1, until=None, menu=None, eta=None):
+        self.driverId = driverId
+        self.areaId = areaId
+        self.streetId = streetId
+        self.weekdays = ",".join(weekdays)
+        self.time = time
+        self.starts_on = starts_on
+        self.interval = interval
+        self.until = until
+        self.menu = menu
+        self.eta = eta
+        self.active = True
+
+    @property
+    def rrule(self):
+        rule = f"FREQ=WEEKLY;INTERVAL={self.interval};BYDAY={self.weekdays}"
+        if self.until:
+            rule += f";UNTIL={self.until.strftime('%Y%m%d')}"
+        return rule
+
+    def occurrences(self, start, end):
+        """Dates from ``start`` to ``end`` inclusive on which the rule runs."""
+        days = {WEEKDAYS.index(code) for code in self.weekdays.split(",")}
+        first_week = self.starts_on - timedelta(days=self.starts_on.weekday())
+        day = max(start, self.starts_on)
+        last = min(end, self.until) if self.until else end
+        while day <= last:
+            week = (day - first_week).days // 7
+            if day.weekday() in days and week % self.interval == 0:
+                yield day
+            day += timedelta(days=1)
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'driverId': self.driverId,
+            'areaId': self.areaId,
+            'streetId': self.streetId,
+            'weekdays': self.weekdays.split(","),
+            'interval': self.interval,
+            'rrule': self.rrule,
+            'time': self.time.strftime("%H:%M"),
+            'menu': self.menu,
+            'eta': self.eta.strftime("%H:%M") if self.eta else None,
+            'starts_on': self.starts_on.isoformat(),
+            'until': self.until.isoformat() if self.until else None,
+            'active': self.active,
+        }
@@ -0,0 +1,29 @@
+from App.database import db
+
+
+class DriveStreet(db.Model):
+    """One street on a drive's route. ``position`` 0 is the drive's own
+    ``streetId``, where the route starts."""
+    __tablename__ = "drive_street"
+    __table_args__ = (
+        db.Index('uq_drive_street_drive_street', 'driveId', 'streetId', unique=True),
+        # Drives on a street, answered from the index alone
+        db.Index('ix_drive_street_street_drive', 'streetId', 'driveId'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    driveId = db.Column(db.Integer, db.ForeignKey('drive.id'), nullable=False)
+    streetId = db.Column(db.Integer, db.ForeignKey('street.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+
+    def __init__(self, streetId, position, driveId=None):
+        self.driveId = driveId
+        self.streetId = streetId
+        self.position = position
+
+    def get_json(self):
+        return {
+            'driveId': self.driveId,
+            'streetId': self.streetId,
+            'position': self.position,
+        }
@@ -94,7 +94,7 @@ class Driver(User):
     def view_drives(self):
         from .drive import Drive
         
-        return Drive.query.filter_by(driverId=self.id).all()
+        return Drive.with_route().filter_by(driverId=self.id).all()
 
     def start_drive(self, driveId):
         from .drive import Drive
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from App.database import db
+
+
+class IdempotencyKey(db.Model):
+    """The result of a batch item sent with an idempotency key, returned
+    unchanged when the client retries with the same key."""
+    __tablename__ = "idempotency_key"
+    __table_args__ = (db.Index('uq_idempotency_key_resident_key', 'residentId', 'key', unique=True),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    residentId = db.Column(db.Integer, db.ForeignKey('resident.id'), nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    # SHA-256 of the operation, so a key reused for another one is refused
+    requestHash = db.Column(db.String(64), nullable=True)
+    result = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def get_json(self):
+        return {
+            'key': self.key,
+            'result': self.result,
+            'created_at': self.created_at.isoformat(),
+        }
@@ -1,6 +1,36 @@
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import validates
+
 from App.database import db
 
 
+def normalize_tags(tags):
+    """``["Whole-Grain ", "healthy"]`` or ``"Whole-Grain, healthy"`` ->
+    ``["whole-grain", "healthy"]``: lower case, trimmed, no blanks or
+    repeats, in the original order."""
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    normalized = []
+    for tag in tags:
+        tag = str(tag).strip().lower()[:50]
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
+
+
+class ItemTag(db.Model):
+    """One normalized tag of an item, so tag lookups use an index instead of
+    scanning the items' JSON."""
+    __tablename__ = "item_tag"
+    __table_args__ = (db.Index('uq_item_tag_tag_item', 'tag', 'itemId', unique=True),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    itemId = db.Column(db.Integer, db.ForeignKey('item.id'), nullable=False)
+    tag = db.Column(db.String(50), nullable=False)
+
+
 class Item(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
@@ -8,12 +38,22 @@ class Item(db.Model):
     description = db.Column(db.String(255))
     tags = db.Column(db.JSON)
 
+    tag_rows = db.relationship('ItemTag', cascade='all, delete-orphan')
+
     def __init__(self, name, price, description, tags):
        self.name = name
        self.price = price
        self.description = description
        self.tags = tags
 
+    @validates('tags')
+    def _index_tags(self, key, tags):
+       # Existing rows are kept rather than replaced, so an unchanged tag is
+       # never deleted and re-inserted against the unique index
+       existing = {row.tag: row for row in self.tag_rows}
+       self.tag_rows = [existing.get(tag) or ItemTag(tag=tag) for tag in normalize_tags(tags)]
+       return tags
+
     def get_json(self):
        return {
            'id': self.id,
@@ -22,4 +62,40 @@ class Item(db.Model):
            'description': self.description,
            'tags': self.tags
        }
-    
\ No newline at end of file
+
+
+# FULL-TEXT SEARCH
+
+# Postgres: a GIN index over this expression. Queries must repeat it exactly
+# for the planner to use the index.
+SEARCH_VECTOR = ("(setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                 "setweight(to_tsvector('simple', coalesce(description, '')), 'B'))")
+
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_item_search ON item USING gin ({SEARCH_VECTOR})",
+]
+
+# SQLite: an FTS5 table over item's name and description, kept in step by
+# triggers. ``prefix`` adds indexes for the short prefixes autocomplete asks for.
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS item_search USING fts5("
+    "name, description, content='item', content_rowid='id', "
+    "prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS item_search_insert AFTER INSERT ON item BEGIN "
+    "INSERT INTO item_search(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS item_search_delete AFTER DELETE ON item BEGIN "
+    "INSERT INTO item_search(item_search, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS item_search_update AFTER UPDATE ON item BEGIN "
+    "INSERT INTO item_search(item_search, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO item_search(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+]
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Item.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Item.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+# The triggers go with the table; the FTS table has to be dropped by hand
+event.listen(Item.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS item_search").execute_if(dialect="sqlite"))
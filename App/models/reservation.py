@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from App.database import db
+
+HELD = "held"
+CLAIMED = "claimed"
+RELEASED = "released"
+EXPIRED = "expired"
+
+
+class DriveStock(db.Model):
+    """Stock loaded on the van for one drive. ``available`` is what is left
+    after reservations and only changes through conditional updates."""
+    __tablename__ = "drive_stock"
+    __table_args__ = (db.Index('uq_drive_stock_drive_item', 'driveId', 'itemId', unique=True),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    driveId = db.Column(db.Integer, db.ForeignKey('drive.id'), nullable=False)
+    itemId = db.Column(db.Integer, db.ForeignKey('item.id'), nullable=False)
+    loaded = db.Column(db.Integer, nullable=False)
+    available = db.Column(db.Integer, nullable=False)
+
+    item = db.relationship('Item')
+
+    def __init__(self, driveId, itemId, loaded):
+        self.driveId = driveId
+        self.itemId = itemId
+        self.loaded = loaded
+        self.available = loaded
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'driveId': self.driveId,
+            'itemId': self.itemId,
+            'loaded': self.loaded,
+            'available': self.available,
+        }
+
+
+class Reservation(db.Model):
+    """Items set aside for a resident's stop until the van hands them over
+    (claimed), the resident cancels (released) or ``expires_at`` passes."""
+    __tablename__ = "reservation"
+
+    id = db.Column(db.Integer, primary_key=True)
+    driveId = db.Column(db.Integer, db.ForeignKey('drive.id'), nullable=False, index=True)
+    itemId = db.Column(db.Integer, db.ForeignKey('item.id'), nullable=False)
+    residentId = db.Column(db.Integer, db.ForeignKey('resident.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default=HELD)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __init__(self, driveId, itemId, residentId, quantity, expires_at):
+        self.driveId = driveId
+        self.itemId = itemId
+        self.residentId = residentId
+        self.quantity = quantity
+        self.expires_at = expires_at
+        self.status = HELD
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'driveId': self.driveId,
+            'itemId': self.itemId,
+            'residentId': self.residentId,
+            'quantity': self.quantity,
+            'status': self.status,
+            'expires_at': self.expires_at.isoformat(),
+        }
@@ -1,8 +1,8 @@
-from datetime import datetime
 from sqlalchemy.ext.mutable import MutableList
 from sqlalchemy import JSON
 
 from App.database import db
+from App.notifications import deliver, flush_digest
 from .user import User
 
 MAX_INBOX_SIZE = 50
@@ -17,6 +17,8 @@ class Resident(User):
     inbox = db.Column(MutableList.as_mutable(JSON), default=[])
     notification_preferences = db.Column(MutableList.as_mutable(JSON), default=["drive_scheduled", "menu_updated", "eta_updated"])
     subscribed_drives = db.Column(MutableList.as_mutable(JSON), default=[])
+    # Rate limit bucket and pending digest, see App.notifications
+    notification_state = db.Column(JSON, nullable=True)
     lat = db.Column(db.Float, nullable=True)
     lng = db.Column(db.Float, nullable=True)
 
@@ -104,24 +106,19 @@ class Resident(User):
 
     def receive_notif(self, message, notification_type="info", drive_id=None):
         """Receive a notification and store in inbox"""
-        if self.inbox is None:
-            self.inbox = []
-
-        if len(self.inbox) >= MAX_INBOX_SIZE:
-            self.inbox.pop(0)
-
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        notification = {
-            "timestamp": timestamp,
-            "message": message,
-            "type": notification_type,
-            "drive_id": drive_id,
-            "read": False
-        }
-        
-        self.inbox.append(notification)
+        self.add_notif(message, notification_type, drive_id)
         db.session.commit()
 
+    def add_notif(self, message, notification_type="info", drive_id=None):
+        """Store a notification without committing, for callers that
+        notify many residents in one transaction. It may be merged into a
+        recent one or held for the daily digest (see App.notifications)."""
+        return deliver(self, message, notification_type, drive_id, MAX_INBOX_SIZE)
+
+    def flush_digest(self, force=False):
+        """Add the pending digest to the inbox if a day has passed"""
+        return flush_digest(self, MAX_INBOX_SIZE, force=force)
+
     def mark_notification_read(self, notification_index):
         """Mark a specific notification as read"""
         if 0 <= notification_index < len(self.inbox):
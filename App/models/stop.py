@@ -2,6 +2,9 @@ from App.database import db
 
 
 class Stop(db.Model):
+    # One stop per resident per drive; lets bulk inserts skip duplicates
+    __table_args__ = (db.Index('uq_stop_drive_resident', 'driveId', 'residentId', unique=True),)
+
     id = db.Column(db.Integer, primary_key=True)
     driveId = db.Column(db.Integer, db.ForeignKey('drive.id'), nullable=False)
     residentId = db.Column(db.Integer,
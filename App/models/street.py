@@ -7,6 +7,8 @@ class Street(db.Model, SubjectMixin):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(20), nullable=False, unique=True)
     areaId = db.Column(db.Integer, db.ForeignKey('area.id'), nullable=False)
+    # Polyline as [[lat, lng], ...]; see App.geo
+    path = db.Column(db.JSON)
 
     residents = db.relationship("Resident", backref="street", lazy=True)
 
@@ -10,6 +10,8 @@ class User(db.Model):
     password = db.Column(db.String(256), nullable=False)
     logged_in = db.Column(db.Boolean, nullable=False, default=False)
     type = db.Column(db.String(50))
+    # Set only by ``flask user create_admin``; never from a request
+    is_admin = db.Column(db.Boolean, nullable=False, default=False)
 
     __mapper_args__ = {
         "polymorphic_on": type,
@@ -48,6 +50,6 @@ class User(db.Model):
         db.session.commit()
 
     def view_street_drives(self, areaId, streetId):
-        return Drive.query.filter_by(areaId=areaId, streetId=streetId).all()
+        return Drive.with_route().filter(Drive.areaId == areaId, Drive.on_street(streetId)).all()
     
 
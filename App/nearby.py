@@ -0,0 +1,186 @@
+"""Upcoming and in-progress drives near a point.
+
+Each worker keeps the active drives in memory and follows them through the
+domain events (scheduled, updated, started, ended, cancelled), so a lookup
+never touches the database:
+
+* the streets on active routes go in an STR-tree (``App.geo.STRtree``),
+  rebuilt on the next lookup after the set of active drives or the street
+  geometry changes;
+* live van positions go in a grid of roughly 1 km cells, updated in place
+  on every location update, since vans move far more often than drives
+  start or end.
+
+A lookup reads the tree and the grid cells around the point, keeps each
+drive's closest street or van, and ranks them by distance. The drives are
+also reloaded from the database every ``NEARBY_RELOAD_SECONDS`` in case an
+event was missed.
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from math import floor
+
+from flask import current_app
+
+from App import events, serializers
+from App.geo import STRtree, _around, bounding_box, distance_to_path, get_geo_index
+from App.models import Drive
+
+NEARBY_DEFAULTS = {
+    "NEARBY_RELOAD_SECONDS": 300,
+    # Assumed average speed of a van, for ETAs from its live position
+    "VAN_SPEED_KMH": 20,
+}
+
+ACTIVE = ("Upcoming", "In Progress")
+# Upcoming drives this far past their time are still shown; vans run late
+LATE_GRACE = timedelta(minutes=30)
+
+# Grid cell size in degrees, about 1.1 km of latitude
+CELL = 0.01
+
+
+def _cell(lat, lng):
+    return (floor(lat / CELL), floor(lng / CELL))
+
+
+def _entry(drive):
+    """The event/serializer dict for a drive, plus its expected arrival."""
+    day = date.fromisoformat(drive["date"])
+    at = datetime.strptime(drive["eta"] or drive["time"], "%H:%M").time()
+    return dict(drive, streetIds=drive.get("streetIds") or [drive["streetId"]],
+                expected=datetime.combine(day, at))
+
+
+class ActiveDrives:
+
+    def __init__(self, reload_seconds):
+        self.reload_seconds = reload_seconds
+        self._drives = {}
+        self._vans = {}
+        self._grid = {}
+        self._tree = STRtree([])
+        self._tree_key = None
+        self._changes = 0
+        self._loaded = None
+        self._lock = threading.RLock()
+
+    def load(self, drives):
+        with self._lock:
+            self._drives = {drive["id"]: _entry(drive) for drive in drives if drive["status"] in ACTIVE}
+            for drive_id in [drive_id for drive_id in self._vans if drive_id not in self._drives]:
+                self._remove_van(drive_id)
+            self._changes += 1
+            self._loaded = time.monotonic()
+
+    def apply(self, event, data):
+        """Bus handler for drive and location events."""
+        if event == events.LOCATION_UPDATED:
+            if data.get("driveId"):
+                self.move_van(data["driveId"], data["lat"], data["lng"])
+            return
+        with self._lock:
+            if data["status"] in ACTIVE:
+                self._drives[data["id"]] = _entry(data)
+            else:
+                self._drives.pop(data["id"], None)
+                self._remove_van(data["id"])
+            self._changes += 1
+
+    def move_van(self, drive_id, lat, lng):
+        with self._lock:
+            self._remove_van(drive_id)
+            self._vans[drive_id] = (lat, lng)
+            self._grid.setdefault(_cell(lat, lng), set()).add(drive_id)
+
+    def _remove_van(self, drive_id):
+        old = self._vans.pop(drive_id, None)
+        if old is not None:
+            cell = self._grid.get(_cell(*old))
+            cell.discard(drive_id)
+            if not cell:
+                del self._grid[_cell(*old)]
+
+    def due(self):
+        return self._loaded is None or time.monotonic() - self._loaded > self.reload_seconds
+
+    def _street_tree(self, geo):
+        key = (self._changes, geo.generation)
+        if key != self._tree_key:
+            entries = []
+            for drive in self._drives.values():
+                for street_id in drive["streetIds"]:
+                    path = geo.street_path(street_id)
+                    if path:
+                        entries.append((bounding_box(path), (drive["id"], street_id)))
+            self._tree, self._tree_key = STRtree(entries), key
+        return self._tree
+
+    def near(self, geo, lat, lng, metres, now, until, speed_kmh, limit=20):
+        """Active drives within ``metres``, closest first. In-progress drives
+        always qualify; upcoming ones if expected before ``until``."""
+        box = _around(lat, lng, metres)
+        closest = {}
+
+        def keep(drive_id, distance, source):
+            if distance <= metres and distance < closest.get(drive_id, (float("inf"),))[0]:
+                closest[drive_id] = (distance, source)
+
+        with self._lock:
+            for drive_id, street_id in self._street_tree(geo).query(box):
+                keep(drive_id, distance_to_path(geo.street_path(street_id), lat, lng), "street")
+            (low_lat, low_lng), (high_lat, high_lng) = _cell(box[0], box[1]), _cell(box[2], box[3])
+            for cell_lat in range(low_lat, high_lat + 1):
+                for cell_lng in range(low_lng, high_lng + 1):
+                    for drive_id in self._grid.get((cell_lat, cell_lng), ()):
+                        keep(drive_id, distance_to_path([self._vans[drive_id]], lat, lng), "van")
+            found = [(self._drives.get(drive_id), distance, source)
+                     for drive_id, (distance, source) in closest.items()]
+            vans = dict(self._vans)
+
+        results = []
+        for drive, distance, source in found:
+            if drive is None:
+                continue
+            if drive["status"] == "In Progress" and drive["id"] in vans:
+                # From the van's position, whichever way it was matched
+                van_distance = distance_to_path([vans[drive["id"]]], lat, lng)
+                eta = now + timedelta(hours=van_distance / 1000 / speed_kmh)
+            elif drive["status"] == "In Progress":
+                eta = max(drive["expected"], now)
+            elif now - LATE_GRACE <= drive["expected"] <= until:
+                eta = drive["expected"]
+            else:
+                continue
+            public = {key: value for key, value in drive.items() if key != "expected"}
+            results.append(dict(public, distance_m=round(distance, 1), matched=source,
+                                expected_at=eta.isoformat(timespec="minutes")))
+        results.sort(key=lambda result: (result["distance_m"], result["expected_at"]))
+        return results[:limit]
+
+
+def get_active_drives(app=None):
+    app = app or current_app
+    index = app.extensions.get("active_drives")
+    if index is None:
+        index = app.extensions["active_drives"] = ActiveDrives(float(app.config["NEARBY_RELOAD_SECONDS"]))
+    if index.due():
+        index.load(serializers.DRIVE.all(Drive.status.in_(ACTIVE), Drive.date >= date.today() - timedelta(days=1)))
+    return index
+
+
+def drives_near(lat, lng, metres=2000, hours=2, now=None, limit=20):
+    """Upcoming drives expected within ``hours`` and drives in progress,
+    within ``metres`` of the point by route street or live van, nearest
+    first, each with ``distance_m`` and ``expected_at``."""
+    now = now or datetime.now()
+    return get_active_drives().near(get_geo_index(), lat, lng, metres, now, now + timedelta(hours=hours),
+                                    float(current_app.config["VAN_SPEED_KMH"]), limit)
+
+
+def init_nearby(app):
+    index = app.extensions["active_drives"] = ActiveDrives(float(app.config["NEARBY_RELOAD_SECONDS"]))
+    for event in (events.DRIVE_SCHEDULED, events.DRIVE_CANCELLED, events.DRIVE_STARTED,
+                  events.DRIVE_ENDED, events.DRIVE_UPDATED, events.LOCATION_UPDATED):
+        events.subscribe(event, index.apply, app)
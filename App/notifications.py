@@ -0,0 +1,185 @@
+"""What reaches a resident's inbox, and when.
+
+Every notification goes through ``deliver``:
+
+* high priority types (arrivals, new or cancelled drives, and confirmations
+  of the resident's own stop requests and cancellations, single or batched)
+  are always added;
+* a type with a coalescing window replaces the resident's unread
+  notification of the same type and drive from within that window, so five
+  ETA changes in two minutes leave one entry with the latest ETA;
+* other notifications spend a token from a per-resident bucket (10 an hour
+  by default); without a token they wait for the digest;
+* low priority types go straight to the digest, which is added as a single
+  notification once a day.
+
+Residents tune this through ``notification_preferences``, alongside the
+type names they opt into: ``"digest:<type>"`` sends a type to the digest,
+``"instant:<type>"`` always adds it right away, and ``"rate:<n>"`` sets the
+bucket to ``n`` an hour.
+"""
+from datetime import datetime, timedelta
+
+HIGH, NORMAL, LOW = "high", "normal", "low"
+
+# type -> (priority, coalescing window in seconds)
+NOTIFICATION_POLICY = {
+    "arrival_alert": (HIGH, 600),
+    "drive_scheduled": (HIGH, 0),
+    "drive_cancelled": (HIGH, 0),
+    "eta_updated": (NORMAL, 120),
+    "menu_updated": (NORMAL, 120),
+    "stop_requested": (HIGH, 0),
+    "stop_cancelled": (HIGH, 0),
+    "stops_updated": (HIGH, 0),
+}
+DEFAULT_POLICY = (NORMAL, 0)
+
+BUCKET_PER_HOUR = 10
+DIGEST_INTERVAL = timedelta(days=1)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _preferences(resident):
+    digest, instant, rate = set(), set(), BUCKET_PER_HOUR
+    for preference in resident.notification_preferences or []:
+        kind, _, value = str(preference).partition(":")
+        if kind == "digest":
+            digest.add(value)
+        elif kind == "instant":
+            instant.add(value)
+        elif kind == "rate" and value.isdigit():
+            rate = int(value)
+    return digest, instant, rate
+
+
+def delivery_settings(resident):
+    """``({type: "instant", "digest" or ""}, rate)`` for the settings form."""
+    digest, instant, rate = _preferences(resident)
+    delivery = {kind: "instant" if kind in instant else "digest" if kind in digest else ""
+                for kind in NOTIFICATION_POLICY}
+    return delivery, rate
+
+
+def merge_preferences(current, opted_in, delivery=None, rate=None):
+    """``current`` with its plain type names replaced by ``opted_in``. The
+    ``digest:``/``instant:`` entries of the types in ``delivery`` and the
+    ``rate:`` entry (when ``rate`` is given) are replaced too; every other
+    entry is kept."""
+    delivery = delivery or {}
+    kept = []
+    for preference in current or []:
+        kind, separator, value = str(preference).partition(":")
+        if not separator or (kind in ("digest", "instant") and value in delivery) \
+                or (kind == "rate" and rate is not None):
+            continue
+        kept.append(preference)
+    overrides = [f"{choice}:{kind}" for kind, choice in delivery.items() if choice in ("digest", "instant")]
+    return list(opted_in) + kept + overrides + ([f"rate:{rate}"] if rate is not None else [])
+
+
+def _coalesce(inbox, notification, window, now):
+    for index in range(len(inbox) - 1, -1, -1):
+        existing = inbox[index]
+        if existing.get("read") or existing.get("type") != notification["type"] \
+                or existing.get("drive_id") != notification["drive_id"]:
+            continue
+        if now - datetime.strptime(existing["timestamp"], TIMESTAMP_FORMAT) > timedelta(seconds=window):
+            return False
+        notification["count"] = existing.get("count", 1) + 1
+        # Move it to the end, where the newest notifications live
+        inbox.pop(index)
+        inbox.append(notification)
+        return True
+    return False
+
+
+def _take_token(state, rate, now):
+    tokens = state.get("tokens", rate)
+    refilled = state.get("refilled")
+    if refilled is not None:
+        tokens = min(rate, tokens + (now.timestamp() - refilled) * rate / 3600)
+    state["refilled"] = now.timestamp()
+    if tokens < 1:
+        state["tokens"] = tokens
+        return False
+    state["tokens"] = tokens - 1
+    return True
+
+
+def _append(resident, notification, max_size):
+    if len(resident.inbox) >= max_size:
+        resident.inbox.pop(0)
+    resident.inbox.append(notification)
+
+
+def deliver(resident, message, notification_type, drive_id, max_size, now=None):
+    """Add, coalesce or defer one notification. Returns ``"added"``,
+    ``"coalesced"`` or ``"digest"``. Does not commit."""
+    now = now or datetime.now()
+    if resident.inbox is None:
+        resident.inbox = []
+    state = dict(resident.notification_state or {})
+    notification = {
+        "timestamp": now.strftime(TIMESTAMP_FORMAT),
+        "message": message,
+        "type": notification_type,
+        "drive_id": drive_id,
+        "read": False,
+    }
+    priority, window = NOTIFICATION_POLICY.get(notification_type, DEFAULT_POLICY)
+    digest, instant, rate = _preferences(resident)
+
+    _flush_if_due(resident, state, max_size, now)
+    if window and _coalesce(resident.inbox, notification, window, now):
+        outcome = "coalesced"
+    elif notification_type in instant or (priority == HIGH and notification_type not in digest):
+        _append(resident, notification, max_size)
+        outcome = "added"
+    elif priority == LOW or notification_type in digest or not _take_token(state, rate, now):
+        pending = state.setdefault("digest", [])
+        state["digest"] = pending + [[notification_type, drive_id, message]]
+        state.setdefault("digest_since", now.timestamp())
+        outcome = "digest"
+    else:
+        _append(resident, notification, max_size)
+        outcome = "added"
+    # Reassigned so the JSON column sees the change
+    resident.notification_state = state
+    return outcome
+
+
+def _flush_if_due(resident, state, max_size, now, force=False):
+    pending = state.get("digest")
+    if not pending:
+        return False
+    since = datetime.fromtimestamp(state.get("digest_since", now.timestamp()))
+    if not force and now - since < DIGEST_INTERVAL:
+        return False
+    counts = {}
+    for notification_type, _, _ in pending:
+        counts[notification_type] = counts.get(notification_type, 0) + 1
+    summary = ", ".join(f"{count} {kind.replace('_', ' ')}" for kind, count in sorted(counts.items()))
+    _append(resident, {
+        "timestamp": now.strftime(TIMESTAMP_FORMAT),
+        "message": f"Daily summary: {summary}",
+        "type": "digest",
+        "drive_id": None,
+        "read": False,
+        "items": [{"type": t, "drive_id": d, "message": m} for t, d, m in pending[-20:]],
+    }, max_size)
+    state.pop("digest", None)
+    state.pop("digest_since", None)
+    return True
+
+
+def flush_digest(resident, max_size, now=None, force=False):
+    """Add the resident's digest if it is due (or ``force``). Does not commit."""
+    state = dict(resident.notification_state or {})
+    if resident.inbox is None:
+        resident.inbox = []
+    flushed = _flush_if_due(resident, state, max_size, now or datetime.now(), force)
+    if flushed:
+        resident.notification_state = state
+    return flushed
@@ -0,0 +1,169 @@
+"""Push channel for drive updates.
+
+Drive, stop and location events are pushed to rooms (``drive:<id>``,
+``street:<id>``, ``driver:<id>``). Browsers listen over a WebSocket at ``/ws`` when
+flask-sock is installed, or over Server-Sent Events at ``/events``. Both
+are plain blocking loops, so under gevent workers each connection is a
+greenlet.
+
+The broker only fans out to connections in its own process. It learns about
+changes from ``App.events``, which delivers every domain event to every
+worker, and turns them into room messages.
+"""
+import json
+import queue
+import threading
+
+from flask import current_app, has_app_context
+
+from App import events
+
+REALTIME_DEFAULTS = {
+    # Seconds between keep-alive comments on idle /events streams
+    "REALTIME_KEEPALIVE": 15,
+    # Messages buffered per connection before the oldest are dropped
+    "REALTIME_QUEUE_SIZE": 100,
+}
+
+
+class Subscription:
+
+    def __init__(self, broker, size):
+        self.broker = broker
+        self.rooms = set()
+        self._queue = queue.Queue(maxsize=size)
+
+    def put(self, message):
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return
+            except queue.Full:
+                # A slow client loses old updates rather than stalling publishers
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def join(self, room):
+        self.broker.join(self, room)
+
+    def leave(self, room):
+        self.broker.leave(self, room)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, rooms=()):
+        subscription = Subscription(self, self.queue_size)
+        for room in rooms:
+            self.join(subscription, room)
+        return subscription
+
+    def join(self, subscription, room):
+        with self._lock:
+            self._rooms.setdefault(room, set()).add(subscription)
+            subscription.rooms.add(room)
+
+    def leave(self, subscription, room):
+        with self._lock:
+            members = self._rooms.get(room)
+            if members is not None:
+                members.discard(subscription)
+                if not members:
+                    del self._rooms[room]
+            subscription.rooms.discard(room)
+
+    def unsubscribe(self, subscription):
+        for room in list(subscription.rooms):
+            self.leave(subscription, room)
+
+    def publish(self, room, event, data):
+        """Deliver to this process's subscribers of ``room``."""
+        message = json.dumps({"room": room, "event": event, "data": data})
+        with self._lock:
+            members = list(self._rooms.get(room, ()))
+        for subscription in members:
+            subscription.put(message)
+
+
+def drive_room(drive_id):
+    return f"drive:{drive_id}"
+
+
+def street_room(street_id):
+    return f"street:{street_id}"
+
+
+def driver_room(driver_id):
+    return f"driver:{driver_id}"
+
+
+def can_join(user, room):
+    """Drivers may follow their own drives and any street; residents their
+    own street and the drives on it."""
+    from App.models import Drive, Driver, Resident
+
+    kind, _, key = room.partition(":")
+    if not key.isdigit():
+        return False
+    key = int(key)
+    if kind == "driver":
+        return isinstance(user, Driver) and user.id == key
+    if kind == "street":
+        return isinstance(user, Driver) or (isinstance(user, Resident) and user.streetId == key)
+    if kind == "drive":
+        drive = Drive.query.get(key)
+        if drive is None:
+            return False
+        if isinstance(user, Driver):
+            return drive.driverId == user.id
+        return isinstance(user, Resident) and user.streetId in drive.street_ids
+    return False
+
+
+def get_broker(app=None):
+    app = app or (current_app if has_app_context() else None)
+    return app.extensions.get("realtime") if app is not None else None
+
+
+def _rooms_for(event, data):
+    if event in (events.STOP_REQUESTED, events.STOP_CANCELLED):
+        return (drive_room(data["driveId"]), driver_room(data["driverId"]))
+    if event == events.LOCATION_UPDATED:
+        rooms = [driver_room(data["driverId"])]
+        if data.get("driveId"):
+            rooms.append(drive_room(data["driveId"]))
+        if data.get("streetId"):
+            rooms.append(street_room(data["streetId"]))
+        return rooms
+    streets = data.get("streetIds") or [data["streetId"]]
+    return (drive_room(data["id"]), *map(street_room, streets), driver_room(data["driverId"]))
+
+
+def init_realtime(app):
+    broker = Broker(app.config["REALTIME_QUEUE_SIZE"])
+    app.extensions["realtime"] = broker
+
+    def forward(event, data):
+        for room in _rooms_for(event, data):
+            broker.publish(room, event, data)
+
+    for event in (events.DRIVE_SCHEDULED, events.DRIVE_CANCELLED, events.DRIVE_STARTED,
+                  events.DRIVE_ENDED, events.DRIVE_UPDATED, events.STOP_REQUESTED,
+                  events.STOP_CANCELLED, events.LOCATION_UPDATED):
+        events.subscribe(event, forward, app)
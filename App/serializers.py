@@ -0,0 +1,183 @@
+"""Fast JSON paths for list endpoints.
+
+``get_json()`` on every ORM object means hydrating full instances (and any
+lazy relationships) only to copy a few attributes into a dict. The
+serializers here select just the needed columns and build the dicts straight
+from the result tuples, producing the same shapes as the models' ``get_json``.
+"""
+from operator import itemgetter
+
+from flask.json.provider import DefaultJSONProvider
+
+from App.database import db
+from App.models import User, Driver, Resident, Area, Street, Drive, DriveStreet, Stop, Item
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib provider is used without it
+    orjson = None
+
+
+def iso_date(value):
+    return value.isoformat() if value else None
+
+
+def hhmm(value):
+    return f"{value.hour:02d}:{value.minute:02d}" if value else None
+
+
+class RowSerializer:
+    """Serializes result rows using a field spec compiled once at import.
+
+    ``fields`` is a sequence of ``(key, column)`` or ``(key, column, converter)``.
+    """
+
+    def __init__(self, *fields):
+        self.keys = tuple(field[0] for field in fields)
+        self.columns = [field[1] for field in fields]
+        self.converters = tuple((i, field[2]) for i, field in enumerate(fields)
+                                if len(field) > 2 and field[2] is not None)
+
+    def select(self, *criteria, order_by=None):
+        stmt = db.select(*self.columns)
+        if criteria:
+            stmt = stmt.where(*criteria)
+        if order_by is not None:
+            stmt = stmt.order_by(order_by)
+        return stmt
+
+    def dump(self, rows):
+        keys = self.keys
+        if not self.converters:
+            return [dict(zip(keys, row)) for row in rows]
+        converters = self.converters
+        out = []
+        for row in rows:
+            values = list(row)
+            for i, convert in converters:
+                values[i] = convert(values[i])
+            out.append(dict(zip(keys, values)))
+        return out
+
+    def all(self, *criteria, order_by=None):
+        return self.dump(db.session.execute(self.select(*criteria, order_by=order_by)))
+
+
+class DriveRowSerializer(RowSerializer):
+    """Adds each drive's route as ``streetIds``, read in one query per call.
+    ``dump`` (used by exports) leaves it out, keeping rows flat."""
+
+    def all(self, *criteria, order_by=None):
+        drives = super().all(*criteria, order_by=order_by)
+        if drives:
+            routes = {}
+            for drive_id, street_id in db.session.execute(
+                db.select(DriveStreet.driveId, DriveStreet.streetId)
+                .where(DriveStreet.driveId.in_([drive["id"] for drive in drives]))
+                .order_by(DriveStreet.driveId, DriveStreet.position)
+            ):
+                routes.setdefault(drive_id, []).append(street_id)
+            for drive in drives:
+                drive["streetIds"] = routes.get(drive["id"], [drive["streetId"]])
+        return drives
+
+
+AREA = RowSerializer(("id", Area.id), ("name", Area.name))
+
+STREET = RowSerializer(("id", Street.id), ("name", Street.name), ("areaId", Street.areaId))
+
+DRIVE = DriveRowSerializer(
+    ("id", Drive.id),
+    ("driverId", Drive.driverId),
+    ("areaId", Drive.areaId),
+    ("streetId", Drive.streetId),
+    ("date", Drive.date, iso_date),
+    ("time", Drive.time, hhmm),
+    ("status", Drive.status),
+    ("menu", Drive.menu),
+    ("eta", Drive.eta, hhmm),
+)
+
+STOP = RowSerializer(("id", Stop.id), ("driveId", Stop.driveId), ("residentId", Stop.residentId))
+
+ITEM = RowSerializer(
+    ("id", Item.id),
+    ("name", Item.name),
+    ("price", Item.price),
+    ("description", Item.description),
+    ("tags", Item.tags),
+)
+
+
+# Users are polymorphic, so one outer-joined select feeds a key/getter pair
+# per type, matching User/Driver/Resident.get_json.
+_user = User.__table__
+_driver = Driver.__table__
+_resident = Resident.__table__
+_driver_area = Area.__table__.alias("driver_area")
+_driver_street = Street.__table__.alias("driver_street")
+
+_USER_SELECT = (
+    db.select(
+        _user.c.id, _user.c.username, _user.c.type,
+        _driver.c.status, _driver_area.c.name, _driver_street.c.name,
+        _resident.c.areaId, _resident.c.streetId, _resident.c.houseNumber,
+        _resident.c.inbox, _resident.c.notification_preferences, _resident.c.subscribed_drives,
+    )
+    .select_from(
+        _user.outerjoin(_driver, _driver.c.id == _user.c.id)
+        .outerjoin(_resident, _resident.c.id == _user.c.id)
+        .outerjoin(_driver_area, _driver_area.c.id == _driver.c.areaId)
+        .outerjoin(_driver_street, _driver_street.c.id == _driver.c.streetId)
+    )
+    .order_by(_user.c.id)
+)
+
+_USER_SHAPES = {
+    "Driver": (("id", "username", "status", "area", "street"), itemgetter(0, 1, 3, 4, 5)),
+    "Resident": (("id", "username", "areaId", "streetId", "houseNumber", "inbox",
+                  "notification_preferences", "subscribed_drives"),
+                 itemgetter(0, 1, 6, 7, 8, 9, 10, 11)),
+}
+_BASE_USER_SHAPE = (("id", "username"), itemgetter(0, 1))
+
+
+def users_json():
+    shapes = _USER_SHAPES
+    out = []
+    for row in db.session.execute(_USER_SELECT):
+        keys, getter = shapes.get(row[2], _BASE_USER_SHAPE)
+        out.append(dict(zip(keys, getter(row))))
+    return out
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, falling back to Flask's
+    ``default`` for types orjson does not know."""
+
+    # Dates go through ``default`` so they encode exactly as with the stdlib provider
+    option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        option = self.option
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype,
+        )
+
+
+def init_json(app):
+    if orjson is not None and app.config.get("JSON_USE_ORJSON", True):
+        app.json = ORJSONProvider(app)
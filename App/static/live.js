@@ -0,0 +1,27 @@
+// Live drive updates pushed by the server. Uses the /ws WebSocket when the
+// server offers it and falls back to Server-Sent Events on /events.
+function liveUpdates(rooms, onMessage) {
+    const query = 'rooms=' + encodeURIComponent(rooms.join(','));
+    let opened = false;
+
+    function useEventSource() {
+        const source = new EventSource('/events?' + query);
+        source.onmessage = event => onMessage(JSON.parse(event.data));
+    }
+
+    if (!window.WebSocket) {
+        useEventSource();
+        return;
+    }
+    const scheme = location.protocol === 'https:' ? 'wss://' : 'ws://';
+    const socket = new WebSocket(scheme + location.host + '/ws?' + query);
+    socket.onopen = () => { opened = true; };
+    socket.onmessage = event => onMessage(JSON.parse(event.data));
+    socket.onclose = () => {
+        if (opened) {
+            setTimeout(() => liveUpdates(rooms, onMessage), 5000);
+        } else {
+            useEventSource();
+        }
+    };
+}
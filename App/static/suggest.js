@@ -0,0 +1,44 @@
+// Street autocomplete backed by /streets/suggest. Typing in `input` fills its
+// <datalist> with matching streets, limited to the area chosen in
+// `areaSelect`, and picking one puts the street's id in `hidden`.
+function streetSuggest(input, hidden, areaSelect) {
+    const list = document.getElementById(input.getAttribute('list'));
+    let matches = {};
+    let timer;
+
+    input.addEventListener('input', () => {
+        hidden.value = matches[input.value] || '';
+        clearTimeout(timer);
+        if (!input.value.trim()) {
+            return;
+        }
+        timer = setTimeout(() => {
+            const params = new URLSearchParams({q: input.value, type: 'street'});
+            if (areaSelect && areaSelect.value) {
+                params.set('area_id', areaSelect.value);
+            }
+            fetch('/streets/suggest?' + params)
+                .then(response => response.json())
+                .then(data => {
+                    matches = {};
+                    list.innerHTML = '';
+                    data.items.forEach(street => {
+                        matches[street.name] = street.id;
+                        const option = document.createElement('option');
+                        option.value = street.name;
+                        list.appendChild(option);
+                    });
+                    hidden.value = matches[input.value] || '';
+                });
+        }, 150);
+    });
+
+    if (areaSelect) {
+        areaSelect.addEventListener('change', () => {
+            input.disabled = !areaSelect.value;
+            input.value = '';
+            hidden.value = '';
+            list.innerHTML = '';
+        });
+    }
+}
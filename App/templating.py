@@ -0,0 +1,98 @@
+"""Template compilation settings and the ``{% cache %}`` fragment tag.
+
+Wrap a mostly static block and name the tables it reads::
+
+    {% cache "menu_grid", role on "item" %}
+        {% for item in items() %}...{% endfor %}
+    {% endcache %}
+
+The first argument names the fragment and any further ones are values the
+output varies by. The rendered HTML is reused until a commit writes to one of
+the tables after ``on`` or ``TEMPLATE_FRAGMENT_TTL`` seconds pass. Pass query
+functions rather than results into the template so a hit skips the query too.
+"""
+import os
+import time
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+from App.database import data_version
+
+TEMPLATE_DEFAULTS = {
+    # Directory for compiled template bytecode shared across restarts and workers
+    "JINJA_BYTECODE_CACHE_DIR": None,
+    # Compile every template at startup; None means when auto-reload is off
+    # (i.e. not in debug) and not testing
+    "TEMPLATES_PRECOMPILE": None,
+    "TEMPLATE_FRAGMENT_CACHE": True,
+    "TEMPLATE_FRAGMENT_TTL": 60,
+    "TEMPLATE_FRAGMENT_MAX": 512,
+}
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache={}, fragment_cache_enabled=True,
+                           fragment_cache_ttl=60, fragment_cache_max=512)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key.append(parser.parse_expression())
+        tables = []
+        if parser.stream.skip_if("name:on"):
+            tables.append(parser.parse_expression())
+            while parser.stream.skip_if("comma"):
+                tables.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        args = [nodes.List(key), nodes.List(tables)]
+        return nodes.CallBlock(self.call_method("_render", args), [], [], body).set_lineno(lineno)
+
+    def _render(self, key, tables, caller):
+        env = self.environment
+        if not env.fragment_cache_enabled:
+            return caller()
+        cache = env.fragment_cache
+        cache_key = (*key, data_version(*tables))
+        now = time.monotonic()
+        hit = cache.get(cache_key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+        html = caller()
+        if len(cache) >= env.fragment_cache_max:
+            # Oldest first; entries for stale versions are never read again
+            for old in list(cache)[:len(cache) // 4 or 1]:
+                cache.pop(old, None)
+        cache[cache_key] = (now + env.fragment_cache_ttl, html)
+        return html
+
+
+def precompile_templates(app):
+    """Load every template into the environment's cache so the first request
+    on each worker (or every worker, with preload) skips compilation."""
+    env = app.jinja_env
+    for name in env.list_templates(extensions=("html",)):
+        env.get_template(name)
+
+
+def init_templates(app):
+    cache_dir = app.config["JINJA_BYTECODE_CACHE_DIR"]
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Must be set before jinja_env is first created
+        app.jinja_options = {**app.jinja_options, "bytecode_cache": FileSystemBytecodeCache(cache_dir)}
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache_enabled = bool(app.config["TEMPLATE_FRAGMENT_CACHE"])
+    app.jinja_env.fragment_cache_ttl = float(app.config["TEMPLATE_FRAGMENT_TTL"])
+    app.jinja_env.fragment_cache_max = int(app.config["TEMPLATE_FRAGMENT_MAX"])
+
+    precompile = app.config["TEMPLATES_PRECOMPILE"]
+    if precompile is None:
+        precompile = not app.jinja_env.auto_reload and not app.testing
+    if precompile:
+        precompile_templates(app)
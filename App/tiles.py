@@ -0,0 +1,206 @@
+"""Map tiles of stops and vans for the operator map.
+
+Tiles use the usual web map ``z/x/y`` scheme. Below ``CLUSTER_MAX_ZOOM`` a
+tile splits into an 8 x 8 grid, and each cell holding points comes back as a
+cluster with a count and the points' centre. From ``CLUSTER_MAX_ZOOM`` up a
+tile lists its points.
+
+Points are indexed in a ``PointPyramid``, which holds the cell counts for
+every zoom, each level merged from the one below, plus the points bucketed
+by tile at ``CLUSTER_MAX_ZOOM``. A tile is at most 64 cell lookups or one
+bucket scan, however many points the city has. Tiles are also cached by
+key. Stops on active drives are reindexed on the first request after a
+commit to ``stop``, ``drive`` or ``resident`` (or every ``MAP_INDEX_MAX_AGE``
+seconds). Vans are reindexed from the in-memory board (``App.vans``) when
+its version moves.
+"""
+import threading
+import time
+from collections import OrderedDict
+from math import atan, cos, degrees, exp, log, pi, radians, tan
+
+from flask import current_app
+
+from App.database import db, data_version
+from App.models import Drive, Resident, Stop
+from App.vans import get_van_board
+
+TILE_DEFAULTS = {
+    "MAP_INDEX_MAX_AGE": 60,
+    "MAP_TILE_CACHE_SIZE": 4096,
+}
+
+TABLES = ("stop", "drive", "resident")
+STOP, VAN = "stop", "van"
+ACTIVE = ("Upcoming", "In Progress")
+
+MAX_ZOOM = 20
+CLUSTER_MAX_ZOOM = 15
+# Clusters are a 2**CELL_BITS square grid per tile
+CELL_BITS = 3
+# Web mercator stops short of the poles
+MAX_LAT = 85.05112878
+MAX_VIEWPORT_TILES = 64
+
+
+def tile_of(lat, lng, zoom):
+    n = 2 ** zoom
+    lat = radians(min(max(lat, -MAX_LAT), MAX_LAT))
+    x = int((lng + 180) / 360 * n)
+    y = int((1 - log(tan(lat) + 1 / cos(lat)) / pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _lat_of(y, n):
+    return degrees(atan((exp(pi * (1 - 2 * y / n)) - exp(-pi * (1 - 2 * y / n))) / 2))
+
+
+def tile_box(zoom, x, y):
+    """``(min_lat, min_lng, max_lat, max_lng)`` of a tile."""
+    n = 2 ** zoom
+    return (_lat_of(y + 1, n), x / n * 360 - 180, _lat_of(y, n), (x + 1) / n * 360 - 180)
+
+
+def check_tile(zoom, x, y):
+    if not 0 <= zoom <= MAX_ZOOM or not (0 <= x < 2 ** zoom and 0 <= y < 2 ** zoom):
+        raise ValueError(f"No tile {zoom}/{x}/{y}; zoom goes from 0 to {MAX_ZOOM}.")
+
+
+class PointPyramid:
+    """Cell counts at every zoom over ``(kind, id, drive_id, lat, lng)``
+    points."""
+
+    def __init__(self, points):
+        self.buckets = {}
+        finest = CLUSTER_MAX_ZOOM - 1 + CELL_BITS
+        # Cell -> [count, sum of lats, sum of lngs, the point if it is alone]
+        cells = {}
+        for point in points:
+            self.buckets.setdefault(tile_of(point[3], point[4], CLUSTER_MAX_ZOOM), []).append(point)
+            cell = cells.setdefault(tile_of(point[3], point[4], finest), [0, 0.0, 0.0, point])
+            cell[0] += 1
+            cell[1] += point[3]
+            cell[2] += point[4]
+        self.levels = {finest: cells}
+        for level in range(finest - 1, CELL_BITS - 1, -1):
+            parents = {}
+            for (x, y), (count, lat, lng, alone) in self.levels[level + 1].items():
+                parent = parents.get((x >> 1, y >> 1))
+                if parent is None:
+                    parents[(x >> 1, y >> 1)] = [count, lat, lng, alone]
+                else:
+                    parent[0] += count
+                    parent[1] += lat
+                    parent[2] += lng
+                    parent[3] = None
+            self.levels[level] = parents
+
+    def tile(self, zoom, x, y):
+        """``(clusters, points)`` in the tile: clusters as ``(lat, lng,
+        count)``, points as given."""
+        if zoom >= CLUSTER_MAX_ZOOM:
+            shift = zoom - CLUSTER_MAX_ZOOM
+            box = tile_box(zoom, x, y)
+            return [], [point for point in self.buckets.get((x >> shift, y >> shift), ())
+                        if box[0] <= point[3] < box[2] and box[1] <= point[4] < box[3]]
+        cells, size = self.levels[zoom + CELL_BITS], 2 ** CELL_BITS
+        clusters, points = [], []
+        for cell_x in range(x * size, (x + 1) * size):
+            for cell_y in range(y * size, (y + 1) * size):
+                cell = cells.get((cell_x, cell_y))
+                if cell is None:
+                    continue
+                count, lat, lng, alone = cell
+                if count == 1:
+                    points.append(alone)
+                else:
+                    clusters.append((round(lat / count, 6), round(lng / count, 6), count))
+        return clusters, points
+
+
+class MapIndex:
+
+    def __init__(self, max_age, cache_size):
+        self.max_age = max_age
+        self.cache_size = cache_size
+        self._stops = PointPyramid([])
+        self._stops_key = 0
+        self._version = None
+        self._built = 0.0
+        self._vans = (None, PointPyramid([]))
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _stale(self):
+        return self._version != data_version(*TABLES) or time.monotonic() - self._built > self.max_age
+
+    def _rebuild_stops(self):
+        version = data_version(*TABLES)
+        points = [(STOP, stop_id, drive_id, lat, lng) for stop_id, drive_id, lat, lng in db.session.execute(
+            db.select(Stop.id, Stop.driveId, Resident.lat, Resident.lng)
+            .join(Resident, Resident.id == Stop.residentId).join(Drive, Drive.id == Stop.driveId)
+            .where(Drive.status.in_(ACTIVE), Resident.lat.is_not(None), Resident.lng.is_not(None))
+        )]
+        self._stops, self._version, self._built = PointPyramid(points), version, time.monotonic()
+        self._stops_key += 1
+
+    def _pyramids(self):
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self._rebuild_stops()
+        version, rows = get_van_board().frame()
+        if self._vans[0] != version:
+            self._vans = (version, PointPyramid([(VAN, row[0], row[1], row[3], row[4]) for row in rows]))
+        return ((STOP, self._stops_key, self._stops), (VAN, self._vans[0], self._vans[1]))
+
+    def tile(self, zoom, x, y):
+        check_tile(zoom, x, y)
+        clusters, points = [], []
+        for kind, version, pyramid in self._pyramids():
+            key = (kind, version, zoom, x, y)
+            with self._lock:
+                found = self._cache.get(key)
+                if found is not None:
+                    self._cache.move_to_end(key)
+            if found is None:
+                found = pyramid.tile(zoom, x, y)
+                with self._lock:
+                    self._cache[key] = found
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            clusters += [{"type": kind, "lat": lat, "lng": lng, "count": count} for lat, lng, count in found[0]]
+            points += [{"type": kind, "id": id_, "driveId": drive_id, "lat": lat, "lng": lng}
+                       for kind, id_, drive_id, lat, lng in found[1]]
+        return {"clusters": clusters, "points": points}
+
+
+def get_map_index(app=None):
+    app = app or current_app
+    index = app.extensions.get("map_index")
+    if index is None:
+        index = app.extensions["map_index"] = MapIndex(float(app.config["MAP_INDEX_MAX_AGE"]),
+                                                       int(app.config["MAP_TILE_CACHE_SIZE"]))
+    return index
+
+
+def get_tile(zoom, x, y):
+    return dict(get_map_index().tile(zoom, x, y), tile=f"{zoom}/{x}/{y}")
+
+
+def viewport(box, zoom):
+    """Clusters and points of every tile overlapping ``box`` at ``zoom``."""
+    check_tile(zoom, 0, 0)
+    low_x, low_y = tile_of(box[2], box[1], zoom)
+    high_x, high_y = tile_of(box[0], box[3], zoom)
+    if (high_x - low_x + 1) * (high_y - low_y + 1) > MAX_VIEWPORT_TILES:
+        raise ValueError("Viewport too large for this zoom.")
+    index = get_map_index()
+    tiles, clusters, points = [], [], []
+    for x in range(low_x, high_x + 1):
+        for y in range(low_y, high_y + 1):
+            found = index.tile(zoom, x, y)
+            tiles.append(f"{zoom}/{x}/{y}")
+            clusters += found["clusters"]
+            points += found["points"]
+    return {"zoom": zoom, "tiles": tiles, "clusters": clusters, "points": points}
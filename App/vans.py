@@ -0,0 +1,126 @@
+"""Where every van on a drive is, for map clients.
+
+Each worker keeps the last fix of every driver and which drivers are on a
+drive in progress, and follows both through the domain events: a location
+update moves a van, and a drive ending or being cancelled takes it off the
+board. The rows are rebuilt on each change, so serving ``/van_location``
+reads a snapshot and never touches the database. They are loaded from the
+database once, when the worker starts (or on first use if the tables did
+not exist yet).
+
+``version`` moves forward on every change; it is the time of the change in
+milliseconds, so versions from different workers line up closely enough for
+a client to skip frames it already has.
+"""
+import logging
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import exc
+
+from App import events
+from App.database import db
+from App.models import Drive, Driver
+
+logger = logging.getLogger(__name__)
+
+# Columns of each row in a frame; ``at`` is the fix's Unix time, None when
+# loaded from the database
+VAN_FIELDS = ("driverId", "driveId", "areaId", "lat", "lng", "at")
+
+
+class VanBoard:
+
+    def __init__(self):
+        self._fixes = {}
+        self._drives = {}
+        self._snapshot = (0, [])
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._snapshot[0]
+
+    def _publish(self):
+        rows = [[driver_id, drive_id, *self._fixes[driver_id]]
+                for driver_id, drive_id in sorted(self._drives.items()) if driver_id in self._fixes]
+        version = max(self._snapshot[0] + 1, int(time.time() * 1000))
+        self._snapshot = (version, rows)
+
+    def load(self):
+        fixes = {
+            driver_id: (area_id, lat, lng, None)
+            for driver_id, area_id, lat, lng in db.session.execute(
+                db.select(Driver.id, Driver.areaId, Driver.lat, Driver.lng)
+                .where(Driver.lat.is_not(None), Driver.lng.is_not(None)))
+        }
+        drives = dict(db.session.execute(
+            db.select(Drive.driverId, Drive.id).where(Drive.status == "In Progress")).all())
+        with self._lock:
+            # Fixes that arrived while loading are newer than the database's
+            self._fixes = {**fixes, **{k: v for k, v in self._fixes.items() if v[3] is not None}}
+            self._drives = {**drives, **self._drives}
+            self._publish()
+            self.loaded = True
+
+    def apply(self, event, data):
+        """Bus handler for drive and location events."""
+        with self._lock:
+            if event == events.LOCATION_UPDATED:
+                self._fixes[data["driverId"]] = (data.get("areaId"), data["lat"], data["lng"], data.get("at"))
+                if data.get("driveId"):
+                    self._drives[data["driverId"]] = data["driveId"]
+                elif data["driverId"] not in self._drives:
+                    return
+            elif event == events.DRIVE_STARTED:
+                self._drives[data["driverId"]] = data["id"]
+            elif self._drives.get(data["driverId"]) == data["id"]:
+                del self._drives[data["driverId"]]
+            else:
+                return
+            self._publish()
+
+    def frame(self, area_id=None, box=None):
+        """``(version, rows)``, optionally only the vans in ``area_id`` or
+        inside ``box`` (min lat, min lng, max lat, max lng)."""
+        version, rows = self._snapshot
+        if area_id is not None:
+            rows = [row for row in rows if row[2] == area_id]
+        if box is not None:
+            rows = [row for row in rows if box[0] <= row[3] <= box[2] and box[1] <= row[4] <= box[3]]
+        return version, rows
+
+
+def get_van_board(app=None):
+    board = (app or current_app).extensions["van_board"]
+    if not board.loaded:
+        board.load()
+    return board
+
+
+def parse_box(value):
+    """``"min_lat,min_lng,max_lat,max_lng"`` -> a tuple of floats."""
+    try:
+        box = tuple(float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be min_lat,min_lng,max_lat,max_lng.")
+    if len(box) != 4 or box[0] > box[2] or box[1] > box[3]:
+        raise ValueError("bbox must be min_lat,min_lng,max_lat,max_lng.")
+    return box
+
+
+def init_vans(app):
+    board = VanBoard()
+    app.extensions["van_board"] = board
+    for event in (events.DRIVE_STARTED, events.DRIVE_ENDED, events.DRIVE_CANCELLED, events.LOCATION_UPDATED):
+        events.subscribe(event, board.apply, app)
+    with app.app_context():
+        try:
+            board.load()
+        except exc.DBAPIError:
+            # No tables yet (a fresh database); loaded on first use instead
+            logger.info("Van positions not loaded at startup")
+        finally:
+            db.session.remove()
@@ -8,7 +8,12 @@ from .driver_views import driver_views
 from .resident_views import resident_views
 # from .admin_views import admin_views
 from .common_views import common_views
+from .export_views import export_views
+from .dispatch_views import dispatch_views
+from .map_views import map_views
+from .sync_views import sync_views
+from .realtime_views import realtime_views
 
 
-views = [user_views, index_views, auth_views, common_views, driver_views, resident_views]
+views = [user_views, index_views, auth_views, common_views, driver_views, resident_views, export_views, dispatch_views, map_views, sync_views, realtime_views]
 # blueprints must be added to this list
@@ -21,8 +21,8 @@ def login_page():
 @auth_views.route('/signup', methods=['GET'])
 def signup_page():
     from App.controllers import area as area_controller
-    areas = area_controller.get_all_areas()
-    return render_template('signup.html', areas=areas)
+    # Passed uncalled: the area list is fragment-cached in the template
+    return render_template('signup.html', areas=area_controller.get_all_areas)
 
 
 '''
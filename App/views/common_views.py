@@ -3,9 +3,13 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from App.controllers import area as area_controller
 from App.controllers import street as street_controller
 from App.controllers import drive as drive_controller
-from App.controllers import driver as driver_controller
 from App.controllers import item as item_controller
+from App.controllers import inventory as inventory_controller
 from App.controllers import user as user_controller
+from App.database import replica_reads
+from App.autocomplete import suggest as suggest_names
+from App import geo
+from App import vans
 
 common_views = Blueprint('common_views', __name__)
 
@@ -13,16 +17,32 @@ common_views = Blueprint('common_views', __name__)
 
 @common_views.route('/menu', methods=['GET'])
 @jwt_required(optional=True)
+@replica_reads
 def get_menu():
-    items = item_controller.get_all_items()
-
+    # The grid is fragment-cached per role, so the items are only
+    # queried when menu.html calls items() on a miss
     uid = get_jwt_identity()
     role = None
     if uid:
         user = user_controller.get_user(uid)
         role = user.type
 
-    return render_template("menu.html", items=items, role=role)
+    return render_template("menu.html", items=item_controller.get_all_items, role=role)
+
+@common_views.route('/items/search', methods=['GET'])
+@replica_reads
+def search_items():
+    try:
+        limit = min(int(request.args.get('limit', 20)), 100)
+    except ValueError:
+        return jsonify({'error': {'code': 'validation_error', 'message': 'limit must be a number'}}), 422
+    items = item_controller.search_items(request.args.get('q'), request.args.get('tag'), limit)
+    return jsonify({'items': [item.get_json() for item in items]}), 200
+
+@common_views.route('/items/suggest', methods=['GET'])
+@replica_reads
+def suggest_items():
+    return jsonify(item_controller.suggest(request.args.get('q'))), 200
 
 @common_views.route('/profile', methods=['GET'])
 @jwt_required()
@@ -42,23 +62,37 @@ def get_areas():
 
 
 @common_views.route('/streets', methods=['GET'])
+@replica_reads
 def get_streets():
     area_id = request.args.get('area_id')
     
-    if area_id:
-        try:
-            from App.models import Street
-            streets = Street.query.filter_by(areaId=area_id).all()
-            items = [s.get_json() for s in streets]
-            return jsonify({'items': items}), 200
-        except Exception as e:
-            print(f"Error getting streets: {e}")
-            return jsonify({'items': []}), 200
-    else:
-        from App.models import Street
-        streets = Street.query.all()
-        items = [s.get_json() for s in streets]
-        return jsonify({'items': items}), 200
+    try:
+        items = street_controller.get_streets_json(area_id)
+    except Exception as e:
+        print(f"Error getting streets: {e}")
+        items = []
+    return jsonify({'items': items}), 200
+
+@common_views.route('/streets/suggest', methods=['GET'])
+def suggest_streets():
+    try:
+        limit = min(int(request.args.get('limit', 10)), 50)
+        area_id = int(request.args['area_id']) if request.args.get('area_id') else None
+    except ValueError:
+        return jsonify({'error': {'code': 'validation_error', 'message': 'limit and area_id must be numbers'}}), 422
+    kind = request.args.get('type')
+    if kind not in (None, 'street', 'area'):
+        return jsonify({'error': {'code': 'validation_error', 'message': 'type must be street or area'}}), 422
+    return jsonify({'items': suggest_names(request.args.get('q', ''), limit, kind, area_id)}), 200
+
+@common_views.route('/geo/locate', methods=['GET'])
+@replica_reads
+def locate():
+    try:
+        lat, lng = geo.parse_points([[request.args.get('lat'), request.args.get('lng')]], 1)[0]
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
+    return jsonify(geo.locate(lat, lng)), 200
 
 @common_views.route('/streets/<int:street_id>/drives', methods=['GET'])
 def street_drives(street_id):
@@ -69,12 +103,21 @@ def street_drives(street_id):
     items = [d.get_json() if hasattr(d, 'get_json') else d for d in (drives or [])]
     return jsonify({'items': items}), 200
 
+@common_views.route('/drives/<int:drive_id>/stock', methods=['GET'])
+@jwt_required()
+@replica_reads
+def drive_stock(drive_id):
+    return jsonify({'items': inventory_controller.drive_stock_snapshot(drive_id)}), 200
+
 @common_views.route('/van_location', methods=['GET'])
 def van_location():
-    
-    loc = driver_controller.get_latest_driver_location()
-
-    if not loc:
-        return jsonify({"lat": 0, "lng": 0}), 200
+    # Served from the in-memory board; see App.vans
+    try:
+        box = vans.parse_box(request.args['bbox']) if request.args.get('bbox') else None
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
 
-    return jsonify({"lat": loc.last_lat, "lng": loc.last_lng}), 200
+    version, rows = vans.get_van_board().frame(request.args.get('area_id', type=int), box)
+    if request.args.get('since', type=int) == version:
+        return '', 304
+    return jsonify({'version': version, 'fields': vans.VAN_FIELDS, 'vans': rows}), 200
@@ -0,0 +1,25 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+
+from App.api.security import admin_required
+from App.controllers import dispatch as dispatch_controller
+
+dispatch_views = Blueprint('dispatch_views', __name__)
+
+
+@dispatch_views.route('/api/admin/dispatch', methods=['GET'])
+@jwt_required()
+@admin_required
+def plan_dispatch():
+    params = request.args
+
+    try:
+        plan = dispatch_controller.plan_dispatch(
+            params.get('date'),
+            params.get('capacity', dispatch_controller.VAN_CAPACITY),
+            params.get('time_limit', dispatch_controller.TIME_LIMIT),
+            max_time_limit=dispatch_controller.MAX_REQUEST_TIME_LIMIT)
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
+
+    return jsonify(plan), 200
@@ -10,7 +10,12 @@ from App.controllers import stop as stop_controller
 from App.controllers import area as area_controller
 from App.controllers import street as street_controller
 from App.controllers import item as item_controller
+from App.controllers import schedule as schedule_controller
+from App.controllers import inventory as inventory_controller
+from App.controllers import forecast as forecast_controller
 from App.api.security import role_required, current_user_id
+from App.database import replica_reads
+from App.middleware import change_etag
 from App.models import Drive, Stop
 from datetime import datetime, date
 
@@ -28,11 +33,10 @@ def api_me():
 @driver_views.route('/api/driver/drives', methods=['GET'])
 @jwt_required()
 @role_required('Driver')
+@change_etag
 def api_list_drives():
     uid = current_user_id()
-    driver = user_controller.get_user(uid)
-    all_drives = driver_controller.driver_view_drives(driver)
-    items = [d.get_json() if hasattr(d, 'get_json') else d for d in (all_drives or [])]
+    items = driver_controller.driver_view_drives_json(uid)
     return jsonify({'items': items}), 200
 
 @driver_views.route('/api/driver/drives', methods=['POST'])
@@ -41,21 +45,66 @@ def api_list_drives():
 def api_create_drive():
     data = request.get_json() or {}
     area_id = data.get('area_id')
-    street_id = data.get('street_id')
+    # street_ids: a multi-street route, in the order the van visits them
+    street_ids = data.get('street_ids') or [data.get('street_id')]
     date_str = data.get('date')
     time_str = data.get('time')
     menu = data.get('menu')
     eta = data.get('eta')
     
-    if not street_id or not date_str or not time_str:
+    if not isinstance(street_ids, list) or not street_ids[0] or not date_str or not time_str:
         return jsonify({'error': {'code': 'validation_error', 'message': 'street_id, date and time required'}}), 422
     
     uid = current_user_id()
     driver = user_controller.get_user(uid)
-    drive = driver_controller.driver_schedule_drive(driver, area_id, street_id, date_str, time_str, menu, eta)
+    try:
+        drive = driver_controller.driver_schedule_drive(driver, area_id, street_ids[0], date_str, time_str, menu, eta,
+                                                        route=street_ids[1:])
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
     out = drive.get_json() if hasattr(drive, 'get_json') else drive
     return jsonify(out), 201
 
+@driver_views.route('/api/driver/schedules', methods=['GET'])
+@jwt_required()
+@role_required('Driver')
+def api_list_schedules():
+    uid = current_user_id()
+    driver = user_controller.get_user(uid)
+    items = [s.get_json() for s in schedule_controller.get_driver_schedules(driver)]
+    return jsonify({'items': items}), 200
+
+@driver_views.route('/api/driver/schedules', methods=['POST'])
+@jwt_required()
+@role_required('Driver')
+def api_create_schedule():
+    data = request.get_json() or {}
+    if not data.get('street_id') or not data.get('weekdays') or not data.get('time'):
+        return jsonify({'error': {'code': 'validation_error', 'message': 'street_id, weekdays and time required'}}), 422
+
+    uid = current_user_id()
+    driver = user_controller.get_user(uid)
+    try:
+        schedule = schedule_controller.create_schedule(
+            driver, data.get('area_id'), data['street_id'], data['weekdays'], data['time'],
+            menu=data.get('menu'), eta_str=data.get('eta'), starts_on=data.get('starts_on'),
+            until=data.get('until'), interval=data.get('interval', 1))
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
+    return jsonify(schedule.get_json()), 201
+
+@driver_views.route('/api/driver/schedules/<int:schedule_id>', methods=['DELETE'])
+@jwt_required()
+@role_required('Driver')
+def api_stop_schedule(schedule_id):
+    uid = current_user_id()
+    driver = user_controller.get_user(uid)
+    try:
+        schedule_controller.stop_schedule(driver, schedule_id)
+    except ValueError as e:
+        return jsonify({'error': {'code': 'resource_not_found', 'message': str(e)}}), 404
+    return '', 204
+
 @driver_views.route('/api/driver/drives/<int:drive_id>/start', methods=['POST'])
 @jwt_required()
 @role_required('Driver')
@@ -93,30 +142,72 @@ def api_requested_stops(drive_id):
     items = [s.get_json() if hasattr(s, 'get_json') else s for s in (stops or [])]
     return jsonify({'items': items}), 200
 
+@driver_views.route('/api/driver/drives/<int:drive_id>/recommended-load', methods=['GET'])
+@jwt_required()
+@role_required('Driver')
+@replica_reads
+def api_recommended_load(drive_id):
+    uid = current_user_id()
+    drive = Drive.query.get(drive_id)
+    if not drive or drive.driverId != uid:
+        return jsonify({'error': {'code': 'resource_not_found', 'message': 'Drive not found'}}), 404
+    return jsonify(forecast_controller.recommend_load(drive)), 200
+
+@driver_views.route('/api/driver/drives/<int:drive_id>/stock', methods=['POST'])
+@jwt_required()
+@role_required('Driver')
+def api_load_drive_stock(drive_id):
+    data = request.get_json(silent=True) or {}
+    uid = current_user_id()
+    driver = user_controller.get_user(uid)
+    try:
+        items = inventory_controller.load_drive_stock(driver, drive_id, data.get('items'))
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
+    return jsonify({'items': items}), 200
+
+@driver_views.route('/api/driver/drives/<int:drive_id>/reservations/<int:resident_id>/claim', methods=['POST'])
+@jwt_required()
+@role_required('Driver')
+def api_claim_reservations(drive_id, resident_id):
+    uid = current_user_id()
+    driver = user_controller.get_user(uid)
+    try:
+        claimed = inventory_controller.claim_reservations(driver, drive_id, resident_id)
+    except ValueError as e:
+        return jsonify({'error': {'code': 'resource_not_found', 'message': str(e)}}), 404
+    return jsonify({'claimed': claimed}), 200
+
 @driver_views.route('/api/driver/location', methods=['POST'])
 @jwt_required()
 @role_required('Driver')
 def api_update_driver_location():
     uid = current_user_id()
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     lat = data.get("lat")
     lng = data.get("lng")
     
-    driver_controller.update_driver_location(uid, lat, lng)
+    try:
+        driver_controller.update_driver_location(uid, lat, lng)
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
     return jsonify({"status": "ok"}), 200
 
 @driver_views.route('/api/driver/drives/<int:drive_id>/map', methods=['GET'])
 @jwt_required()
 @role_required("Driver")
+@replica_reads
 def api_drive_map(drive_id):
-    stops = drive_controller.get_stops_for_drive(drive_id)
-    data = [s.get_json() for s in stops]
-    return jsonify(data), 200
+    drive = Drive.query.get(drive_id)
+    if not drive or drive.driverId != current_user_id():
+        return jsonify({'error': {'code': 'resource_not_found', 'message': 'Drive not found'}}), 404
+    return jsonify(drive_controller.get_stops_for_drive(drive_id)), 200
 
 # Web Views
 
 @driver_views.route('/driver/dashboard')
 @jwt_required()
+@replica_reads
 def driver_dashboard():
     if current_user.type != 'Driver':
         return redirect('/')
@@ -138,13 +229,19 @@ def driver_dashboard():
     # Get next upcoming drive
     upcoming_drives = [d for d in drives if d.status == "Upcoming"]
     next_drive = upcoming_drives[0] if upcoming_drives else None
+
+    # What is on the van against what the next drive is expected to sell
+    stock = {s.itemId: s for s in driver_controller.driver_view_stock(current_user)}
+    recommendation = forecast_controller.recommend_load(next_drive) if next_drive else None
     
     return render_template('driver_dashboard.html',
                          upcoming_drives=upcoming_drives,
                          active_drive=active_drive,
                          active_stops=active_stops,
                          next_drive=next_drive,
-                         pending_stops=len(active_stops))
+                         pending_stops=len(active_stops),
+                         stock=stock,
+                         recommendation=recommendation)
 
 @driver_views.route('/driver/drives/schedule', methods=['GET', 'POST'])
 @jwt_required()
@@ -170,8 +267,7 @@ def schedule_drive():
             flash(str(e))
             return redirect('/driver/drives/schedule')
     
-    areas = area_controller.get_all_areas()
-    return render_template('schedule_drive.html', areas=areas)
+    return render_template('schedule_drive.html', areas=area_controller.get_all_areas)
 
 @driver_views.route('/driver/drives', methods=['GET'])
 @jwt_required()
@@ -0,0 +1,27 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
+
+from App.api.security import admin_required
+from App.controllers import export as export_controller
+
+export_views = Blueprint('export_views', __name__)
+
+MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+@export_views.route('/api/admin/export/<dataset>', methods=['GET'])
+@jwt_required()
+@admin_required
+def export_dataset(dataset):
+    params = request.args
+    fmt = params.get('format', 'ndjson')
+    area_id = params.get('area_id', type=int)
+
+    try:
+        lines = export_controller.export_lines(dataset, fmt, params.get('from'), params.get('to'), area_id)
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
+
+    response = Response(stream_with_context(lines), mimetype=MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={dataset}.{fmt}'
+    return response
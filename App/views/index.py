@@ -1,5 +1,8 @@
 from flask import Blueprint, redirect, render_template, request, send_from_directory, jsonify
+from flask_jwt_extended import jwt_required
+from App.api.security import admin_required
 from App.controllers import create_user, initialize
+from App.database import pool_stats
 
 index_views = Blueprint('index_views', __name__, template_folder='../templates')
 
@@ -14,4 +17,10 @@ def init():
 
 @index_views.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({'status':'healthy'})
\ No newline at end of file
+    return jsonify({'status':'healthy'})
+
+@index_views.route('/health/db', methods=['GET'])
+@jwt_required()
+@admin_required
+def db_pool_health():
+    return jsonify({'pools': pool_stats()})
\ No newline at end of file
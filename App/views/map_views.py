@@ -0,0 +1,33 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+
+from App.api.security import admin_required
+from App import tiles, vans
+
+map_views = Blueprint('map_views', __name__)
+
+
+@map_views.route('/api/map/viewport', methods=['GET'])
+@jwt_required()
+@admin_required
+def map_viewport():
+    try:
+        box = vans.parse_box(request.args.get('bbox', ''))
+        zoom = request.args.get('zoom', type=int)
+        if zoom is None:
+            raise ValueError("zoom required")
+        found = tiles.viewport(box, zoom)
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
+    return jsonify(found), 200
+
+
+@map_views.route('/api/map/tiles/<int:zoom>/<int:x>/<int:y>', methods=['GET'])
+@jwt_required()
+@admin_required
+def map_tile(zoom, x, y):
+    try:
+        found = tiles.get_tile(zoom, x, y)
+    except ValueError as e:
+        return jsonify({'error': {'code': 'resource_not_found', 'message': str(e)}}), 404
+    return jsonify(found), 200
@@ -0,0 +1,79 @@
+import json
+
+from flask import Blueprint, Response, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, verify_jwt_in_request
+
+from App.api.security import current_user_id
+from App.controllers import user as user_controller
+from App.database import db
+from App.realtime import can_join, get_broker
+
+try:
+    from flask_sock import Sock
+except ImportError:  # optional, /events works without it
+    Sock = None
+
+realtime_views = Blueprint('realtime_views', __name__)
+
+
+def _rooms(value):
+    return [room for room in (value or '').split(',') if room]
+
+
+@realtime_views.route('/events', methods=['GET'])
+@jwt_required()
+def events():
+    user = user_controller.get_user(current_user_id())
+    rooms = _rooms(request.args.get('rooms'))
+    if not rooms:
+        return jsonify({'error': {'code': 'validation_error', 'message': 'rooms is required'}}), 422
+    if not all(can_join(user, room) for room in rooms):
+        return jsonify({'error': {'code': 'forbidden', 'message': 'cannot join room'}}), 403
+
+    subscription = get_broker().subscribe(rooms)
+    keepalive = current_app.config['REALTIME_KEEPALIVE']
+    # The stream can stay open for hours; don't hold a pooled connection
+    db.session.remove()
+
+    def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                message = subscription.get(timeout=keepalive)
+                yield f'data: {message}\n\n' if message is not None else ': keepalive\n\n'
+        finally:
+            subscription.close()
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+if Sock is not None:
+    sock = Sock()
+
+    @sock.route('/ws', bp=realtime_views)
+    def websocket(ws):
+        """Send ``{"subscribe": room}`` or ``{"unsubscribe": room}`` at any time;
+        rooms in the query string are joined on connect."""
+        verify_jwt_in_request()
+        user = user_controller.get_user(current_user_id())
+        subscription = get_broker().subscribe()
+        try:
+            for room in _rooms(request.args.get('rooms')):
+                if can_join(user, room):
+                    subscription.join(room)
+            db.session.remove()
+            while True:
+                incoming = ws.receive(timeout=0)
+                if incoming:
+                    command = json.loads(incoming)
+                    if command.get('subscribe') and can_join(user, command['subscribe']):
+                        subscription.join(command['subscribe'])
+                    elif command.get('unsubscribe'):
+                        subscription.leave(command['unsubscribe'])
+                    db.session.remove()
+                message = subscription.get(timeout=1)
+                if message is not None:
+                    ws.send(message)
+        finally:
+            subscription.close()
@@ -3,11 +3,14 @@
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
 from flask_jwt_extended import jwt_required, current_user
 from App.api.security import role_required, current_user_id
+from App.database import replica_reads
+from App.middleware import change_etag
 from App.controllers import resident as resident_controller
 from App.controllers import user as user_controller
 from App.controllers import stop as stop_controller
 from App.controllers import drive as drive_controller
 from App.models import Drive, Stop
+from App.notifications import NOTIFICATION_POLICY, delivery_settings, merge_preferences
 from datetime import datetime, date
 
 resident_views = Blueprint('resident_views', __name__, template_folder='../templates')
@@ -21,6 +24,35 @@ def api_me():
     uid = current_user_id()
     return jsonify({'id': uid}), 200
 
+@resident_views.route('/api/resident/location', methods=['POST'])
+@jwt_required()
+@role_required('Resident')
+def api_set_location():
+    data = request.get_json(silent=True) or {}
+    resident = user_controller.get_user(current_user_id())
+
+    try:
+        found = resident_controller.resident_set_location(resident, data.get('lat'), data.get('lng'))
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
+
+    return jsonify(found), 200
+
+@resident_views.route('/api/resident/drives/nearby', methods=['GET'])
+@jwt_required()
+@role_required('Resident')
+def api_nearby_drives():
+    resident = user_controller.get_user(current_user_id())
+
+    try:
+        drives = resident_controller.resident_nearby_drives(
+            resident, request.args.get('lat'), request.args.get('lng'),
+            request.args.get('radius_m', 2000), request.args.get('hours', 2))
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
+
+    return jsonify({'drives': drives}), 200
+
 @resident_views.route('/api/resident/stops', methods=['POST'])
 @jwt_required()
 @role_required('Resident')
@@ -34,13 +66,30 @@ def api_create_stop():
     resident = user_controller.get_user(uid)
     
     try:
-        stop = resident_controller.resident_request_stop(resident, drive_id)
+        stop = resident_controller.resident_request_stop(resident, drive_id, data.get('items'))
     except ValueError as e:
         return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 400
     
     out = stop.get_json() if hasattr(stop, 'get_json') else stop
     return jsonify(out), 201
 
+@resident_views.route('/api/resident/stops:batch', methods=['POST'])
+@jwt_required()
+@role_required('Resident')
+def api_batch_stops():
+    data = request.get_json(silent=True) or {}
+    uid = current_user_id()
+    resident = user_controller.get_user(uid)
+
+    try:
+        results = resident_controller.resident_batch_stops(resident, data.get('operations'))
+    except resident_controller.IdempotencyKeyReused as e:
+        return jsonify({'error': {'code': 'idempotency_key_reused', 'message': str(e)}}), 422
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
+
+    return jsonify({'results': results}), 200
+
 @resident_views.route('/api/resident/stops/<int:stop_id>', methods=['DELETE'])
 @jwt_required()
 @role_required('Resident')
@@ -58,6 +107,8 @@ def api_delete_stop(stop_id):
 @resident_views.route('/api/resident/inbox', methods=['GET'])
 @jwt_required()
 @role_required('Resident')
+@replica_reads
+@change_etag
 def api_inbox():
     uid = current_user_id()
     resident = user_controller.get_user(uid)
@@ -87,17 +138,19 @@ def api_driver_stats():
 @resident_views.route('/api/resident/stops_for_map', methods=['GET'])
 @jwt_required()
 @role_required('Resident')
+@replica_reads
 def api_stops_for_map():
     uid = current_user_id()
     resident = user_controller.get_user(uid)
     
     stops = stop_controller.get_resident_stops_for_map(resident)
-    return jsonify([s.get_json() for s in stops]), 200
+    return jsonify(stops), 200
 
 # Web Endpoints
 
 @resident_views.route('/resident/dashboard')
 @jwt_required()
+@replica_reads
 def resident_dashboard():
     if current_user.type != 'Resident':
         return redirect('/')
@@ -109,10 +162,10 @@ def resident_dashboard():
     active_stops = stop_controller.get_stops_by_resident(current_user.id)
     
     # Get today's drives in the resident's area and street
-    todays_drives = Drive.query.filter_by(
-        areaId=current_user.areaId,
-        streetId=current_user.streetId,
-        date=date.today()
+    todays_drives = Drive.query.filter(
+        Drive.areaId == current_user.areaId,
+        Drive.on_street(current_user.streetId),
+        Drive.date == date.today()
     ).all()
     
     return render_template('resident_dashboard.html',
@@ -242,26 +295,30 @@ def notification_settings():
         return redirect('/')
     
     if request.method == 'POST':
-        preferences = []
-        if request.form.get('drive_scheduled'):
-            preferences.append('drive_scheduled')
-        if request.form.get('menu_updated'):
-            preferences.append('menu_updated')
-        if request.form.get('eta_updated'):
-            preferences.append('eta_updated')
-        if request.form.get('arrival_alert'):
-            preferences.append('arrival_alert')
+        opted_in = [kind for kind in ('drive_scheduled', 'menu_updated', 'eta_updated', 'arrival_alert')
+                    if request.form.get(kind)]
+        # Delivery and rate fields only replace their entries when submitted
+        delivery = {kind: request.form[f'delivery_{kind}'] for kind in NOTIFICATION_POLICY
+                    if f'delivery_{kind}' in request.form}
+        rate = request.form.get('rate', '').strip()
+        if rate and not rate.isdigit():
+            flash('Notifications per hour must be a whole number.')
+            return redirect('/resident/settings')
+        preferences = merge_preferences(current_user.notification_preferences, opted_in,
+                                        delivery, int(rate) if rate else None)
         
         resident_controller.resident_update_notification_preferences(current_user, preferences)
         flash('Notification preferences updated!')
         return redirect('/resident/dashboard')
     
     current_prefs = current_user.notification_preferences or []
+    delivery, rate = delivery_settings(current_user)
     return render_template('notification_settings.html', 
-                         current_prefs=current_prefs)
+                         current_prefs=current_prefs, delivery=delivery, rate=rate)
 
 @resident_views.route('/resident/notifications', methods=['GET'])
 @jwt_required()
+@replica_reads
 def resident_notifications():
     if current_user.type != 'Resident':
         return redirect('/')
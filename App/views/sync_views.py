@@ -0,0 +1,23 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+
+from App.api.security import current_user_id
+from App.controllers import sync as sync_controller
+from App.controllers import user as user_controller
+from App.database import replica_reads
+
+sync_views = Blueprint('sync_views', __name__)
+
+
+@sync_views.route('/api/sync', methods=['GET'])
+@jwt_required()
+@replica_reads
+def api_sync():
+    user = user_controller.get_user(current_user_id())
+    try:
+        since = sync_controller.parse_sync_token(request.args.get('since'))
+        return jsonify(sync_controller.sync_changes(user, since)), 200
+    except sync_controller.SyncTokenExpired as e:
+        return jsonify({'error': {'code': 'sync_token_expired', 'message': str(e)}}), 410
+    except ValueError as e:
+        return jsonify({'error': {'code': 'validation_error', 'message': str(e)}}), 422
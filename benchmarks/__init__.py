@@ -0,0 +1,5 @@
+"""In-process micro-benchmarks for controller hot paths.
+
+Cases live in ``bench_*.py`` modules and register themselves with
+``harness.benchmark``. See ``__main__.py`` for usage.
+"""
@@ -0,0 +1,57 @@
+"""Run the in-process micro-benchmarks.
+
+    python -m benchmarks                     # run all, compare with baseline.json
+    python -m benchmarks -k "driver_*"       # only matching cases
+    python -m benchmarks --save              # record results as the new baseline
+
+Exits with status 1 when a case's median regresses past the tolerance.
+"""
+import argparse
+import importlib
+import pkgutil
+import sys
+
+from . import harness
+
+
+def load_cases():
+    """Import every ``bench_*`` module so its cases register."""
+    package = sys.modules[__package__]
+    for module in pkgutil.iter_modules(package.__path__):
+        if module.name.startswith("bench_"):
+            importlib.import_module(f"{__package__}.{module.name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("-k", dest="pattern", default="*", help="glob of case names to run")
+    parser.add_argument("--save", action="store_true", help="store results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown vs baseline median (0.5 == 50%%)")
+    args = parser.parse_args(argv)
+
+    load_cases()
+    results = harness.run(args.pattern)
+    baseline = harness.load_baseline()
+
+    print(f"{'Case':<45} {'median ms':>10} {'min ms':>10} {'baseline':>10}")
+    print("-" * 78)
+    for name, result in results.items():
+        base = baseline.get(name, {}).get("median_ms")
+        print(f"{name:<45} {result['median_ms']:>10.3f} {result['min_ms']:>10.3f} "
+              f"{base if base is not None else '-':>10}")
+
+    if args.save:
+        harness.save_baseline(results)
+        print("\nBaseline saved.")
+        return 0
+
+    regressions = harness.compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressed past tolerance: " + ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+
+from App.database import db
+from App.models import Area, Street, Driver, Resident, Drive
+from App.controllers.driver import driver_schedule_drive, notify_residents_of_arrival
+from App.controllers.resident import resident_request_stop
+from App.controllers.user import get_all_users_json
+from App.models.resident import MAX_INBOX_SIZE
+
+from .harness import benchmark
+
+
+def seed_street(residents, lat=10.64, lng=-61.40):
+    area = Area("Bench Area")
+    db.session.add(area)
+    db.session.flush()
+    street = Street("Bench Street", area.id)
+    db.session.add(street)
+    db.session.flush()
+    # Password hashing would dominate seeding and is not what we measure
+    with patch("App.models.user.generate_password_hash", return_value="x"):
+        driver = Driver("bench_driver", "pass", "Available", area.id, street.id)
+        db.session.add(driver)
+        for n in range(residents):
+            resident = Resident(f"res{n}", "pass", area.id, street.id, n)
+            resident.lat = lat + (n % 20) * 0.0005
+            resident.lng = lng + (n // 20) * 0.0005
+            db.session.add(resident)
+    db.session.commit()
+    return area, street, driver
+
+
+def future(days):
+    return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+@benchmark("driver_schedule_drive", rounds=10, params=[10, 100, 500])
+def bench_schedule_drive(residents):
+    area, street, driver = seed_street(residents)
+
+    def run(i):
+        driver_schedule_drive(driver, area.id, street.id, future(i + 1), "11:30")
+    return run
+
+
+@benchmark("resident_request_stop", rounds=50)
+def bench_request_stop():
+    area, street, driver = seed_street(51)
+    drive = driver_schedule_drive(driver, area.id, street.id, future(3), "11:30")
+    residents = Resident.query.order_by(Resident.id).all()
+
+    def run(i):
+        resident_request_stop(residents[i], drive.id)
+    return run
+
+
+@benchmark("Resident.receive_notif[full_inbox]", rounds=100)
+def bench_receive_notif():
+    area, street, driver = seed_street(1)
+    resident = Resident.query.first()
+    for n in range(MAX_INBOX_SIZE):
+        resident.inbox.append({"timestamp": "2025-01-01 00:00:00", "message": f"m{n}",
+                               "type": "info", "drive_id": None, "read": False})
+    db.session.commit()
+
+    def run(i):
+        resident.receive_notif(f"message {i}", "eta_updated", 1)
+    return run
+
+
+@benchmark("notify_residents_of_arrival", rounds=10, params=[200])
+def bench_notify_arrival(residents):
+    area, street, driver = seed_street(residents)
+    driver.last_lat, driver.last_lng = 10.64, -61.40
+
+    def run(i):
+        notify_residents_of_arrival(driver)
+    return run
+
+
+@benchmark("get_all_users_json", rounds=10, params=[1000])
+def bench_all_users_json(residents):
+    seed_street(residents)
+
+    def run(i):
+        db.session.expire_all()
+        get_all_users_json()
+    return run
+
+
+@benchmark("Drive.get_json", rounds=20, params=[5000])
+def bench_drive_get_json(count):
+    drives = []
+    for n in range(count):
+        drive = Drive(1, 1, 1, date(2025, 1, 1) + timedelta(days=n % 60), time(11, 30),
+                      "Upcoming", menu="Bread", eta=time(11, 45))
+        drive.id = n + 1
+        drives.append(drive)
+
+    def run(i):
+        [d.get_json() for d in drives]
+    return run
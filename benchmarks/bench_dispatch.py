@@ -0,0 +1,35 @@
+import random
+
+from App.controllers.dispatch import assign, cost_matrix
+
+from .harness import benchmark
+
+# (streets, vans) of the synthetic cities
+CITIES = {"200x10": (200, 10), "500x40": (500, 40)}
+
+
+def synthetic_city(streets, vans, seed=1):
+    """Streets with 1-8 stops each, in neighbourhoods of about a kilometre
+    spread over a 45 km city, and vans parked at random. Capacity leaves
+    about 10% spare."""
+    rng = random.Random(seed)
+    centres = [(rng.uniform(10.4, 10.8), rng.uniform(-61.6, -61.2)) for _ in range(max(streets // 25, 1))]
+    street_rows = []
+    for street_id in range(streets):
+        lat, lng = rng.choice(centres)
+        point = (lat + rng.gauss(0, 0.01), lng + rng.gauss(0, 0.01))
+        street_rows.append((street_id, rng.randint(1, 8), 1, point))
+    van_rows = [(van_id, 1, (rng.uniform(10.4, 10.8), rng.uniform(-61.6, -61.2))) for van_id in range(vans)]
+    demand = [stops for _, stops, _, _ in street_rows]
+    capacity = int(sum(demand) / vans * 1.1) + 1
+    return cost_matrix(van_rows, street_rows), demand, capacity
+
+
+@benchmark("dispatch_assign", rounds=3, params=list(CITIES))
+def bench_assign(city):
+    cost, demand, capacity = synthetic_city(*CITIES[city])
+
+    def run(i):
+        # Generous limit, so this times the search running to a local optimum
+        assign(cost, demand, capacity, time_limit=30)
+    return run
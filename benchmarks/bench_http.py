@@ -0,0 +1,27 @@
+from flask import current_app
+
+from .bench_controllers import seed_street
+from .harness import benchmark
+
+
+@benchmark("GET /api/users", rounds=30, params=["identity", "gzip", "br"])
+def bench_users_encoding(encoding):
+    seed_street(1000)
+    client = current_app.test_client()
+    headers = {"Accept-Encoding": encoding}
+
+    def run(i):
+        client.get("/api/users", headers=headers)
+    return run
+
+
+@benchmark("GET /api/users[304]", rounds=30)
+def bench_users_not_modified():
+    seed_street(1000)
+    client = current_app.test_client()
+    etag = client.get("/api/users").headers["ETag"]
+    headers = {"If-None-Match": etag}
+
+    def run(i):
+        client.get("/api/users", headers=headers)
+    return run
@@ -0,0 +1,18 @@
+import random
+
+from App.tiles import PointPyramid, tile_of
+
+from .harness import benchmark
+
+
+@benchmark("map_tile_clustered", rounds=200, params=[1_000, 100_000])
+def bench_clustered_tile(points):
+    rng = random.Random(1)
+    pyramid = PointPyramid([("stop", n, 1, rng.uniform(10.5, 10.8), rng.uniform(-61.5, -61.2))
+                            for n in range(points)])
+    x, y = tile_of(10.65, -61.35, 11)
+
+    # Uncached, so this is the cost of building a tile from the pyramid
+    def run(i):
+        pyramid.tile(11, x, y)
+    return run
@@ -0,0 +1,39 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+from App.controllers import create_area
+from App.database import db
+from App.geo import get_geo_index
+from App.models import Street
+from App.nearby import ActiveDrives
+
+from .harness import benchmark
+
+
+@benchmark("nearby_drives", rounds=50, params=[3_000])
+def bench_nearby(drives):
+    """Lookups around random points among ``drives`` upcoming one-street
+    drives, a third of them with a live van."""
+    rng = random.Random(5)
+    area = create_area("Benchmark Area")
+    day = date.today() + timedelta(days=2)
+    streets, active = [], []
+    for i in range(drives):
+        lat, lng = rng.uniform(10.5, 10.8), rng.uniform(-61.5, -61.2)
+        streets.append({"id": 1000 + i, "name": f"Street {i}", "areaId": area.id,
+                        "path": [[lat, lng], [lat + 0.002, lng + 0.001]]})
+        active.append({"id": 1000 + i, "driverId": 1, "areaId": area.id, "streetId": 1000 + i,
+                       "streetIds": [1000 + i], "date": day.isoformat(), "time": "09:00",
+                       "status": "Upcoming", "menu": None, "eta": None})
+    db.session.execute(db.insert(Street), streets)
+    db.session.commit()
+    index = ActiveDrives(300)
+    index.load(active)
+    for i in range(0, drives, 3):
+        index.move_van(1000 + i, rng.uniform(10.5, 10.8), rng.uniform(-61.5, -61.2))
+    geo = get_geo_index()
+    now = datetime.combine(day, time(8, 30))
+
+    def run(i):
+        index.near(geo, rng.uniform(10.5, 10.8), rng.uniform(-61.5, -61.2), 2000, now, now + timedelta(hours=2), 20)
+    return run
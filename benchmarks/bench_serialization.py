@@ -0,0 +1,120 @@
+from datetime import date, time, timedelta
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+from App.database import db
+from App.models import Drive, Street, User
+from App import serializers
+from App.controllers.user import get_all_users_json
+
+from .bench_controllers import seed_street
+from .harness import benchmark
+
+ROWS = 10_000
+
+
+def seed_drives(count):
+    area, street, driver = seed_street(0)
+    db.session.execute(db.insert(Drive), [
+        {"driverId": driver.id, "areaId": area.id, "streetId": street.id,
+         "date": date(2025, 1, 1) + timedelta(days=n % 60), "time": time(11, 30),
+         "status": "Upcoming", "menu": "Bread, Buns", "eta": time(11, 45)}
+        for n in range(count)
+    ])
+    db.session.commit()
+
+
+def seed_streets(count):
+    area, street, driver = seed_street(0)
+    db.session.execute(db.insert(Street), [
+        {"name": f"Street {n}", "areaId": area.id} for n in range(count)
+    ])
+    db.session.commit()
+
+
+@benchmark("drives_json[orm]", rounds=5, params=[ROWS])
+def bench_drives_orm(count):
+    seed_drives(count)
+
+    def run(i):
+        db.session.expunge_all()
+        [d.get_json() for d in Drive.query.all()]
+    return run
+
+
+@benchmark("drives_json[rows]", rounds=5, params=[ROWS])
+def bench_drives_rows(count):
+    seed_drives(count)
+
+    def run(i):
+        serializers.DRIVE.all()
+    return run
+
+
+@benchmark("streets_json[orm]", rounds=5, params=[ROWS])
+def bench_streets_orm(count):
+    seed_streets(count)
+
+    def run(i):
+        db.session.expunge_all()
+        [s.get_json() for s in Street.query.all()]
+    return run
+
+
+@benchmark("streets_json[rows]", rounds=5, params=[ROWS])
+def bench_streets_rows(count):
+    seed_streets(count)
+
+    def run(i):
+        serializers.STREET.all()
+    return run
+
+
+@benchmark("users_json[orm]", rounds=5, params=[ROWS])
+def bench_users_orm(count):
+    seed_street(count)
+
+    def run(i):
+        db.session.expunge_all()
+        [u.get_json() for u in db.session.scalars(db.select(User)).all()]
+    return run
+
+
+@benchmark("users_json[rows]", rounds=5, params=[ROWS])
+def bench_users_rows(count):
+    seed_street(count)
+
+    def run(i):
+        get_all_users_json()
+    return run
+
+
+def drive_payload(count):
+    seed_drives(count)
+    return {"items": serializers.DRIVE.all()}
+
+
+@benchmark("encode_drives[stdlib]", rounds=10, params=[ROWS])
+def bench_encode_stdlib(count):
+    payload = drive_payload(count)
+    provider = DefaultJSONProvider(current_app._get_current_object())
+
+    def run(i):
+        provider.response(payload)
+    return run
+
+
+def bench_encode_orjson(count):
+    payload = drive_payload(count)
+    provider = serializers.ORJSONProvider(current_app._get_current_object())
+
+    def run(i):
+        provider.response(payload)
+    return run
+
+
+# Only registered with orjson installed, so its timings never stand in for
+# the stdlib encoder's
+if serializers.orjson is not None:
+    benchmark("encode_drives[orjson]", rounds=10, params=[ROWS])(bench_encode_orjson)
@@ -0,0 +1,64 @@
+"""Cold-start cost of importing ``wsgi`` in a fresh interpreter.
+
+``startup[server]`` is what a gunicorn worker pays; ``startup[cli]`` is a
+``flask user ...`` invocation, which gets the slim app. For a breakdown of
+where the time goes run
+
+    python -m benchmarks.bench_startup
+"""
+import os
+import subprocess
+import sys
+
+from .harness import benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "server": "import wsgi",
+    "cli": "import sys; sys.argv = ['flask', 'user', 'list']; import wsgi",
+}
+
+_REPORT = "; import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+
+def start(mode, *flags):
+    env = dict(os.environ)
+    env.pop("FLASK_RUN_FROM_CLI", None)
+    if mode == "cli":
+        env["FLASK_RUN_FROM_CLI"] = "true"
+    return subprocess.run([sys.executable, *flags, "-c", MODES[mode] + _REPORT],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+@benchmark("startup", rounds=5, params=list(MODES))
+def bench_startup(mode):
+    def run(i):
+        start(mode)
+    return run
+
+
+def import_times(mode):
+    """Import time per top-level package (each module's own time, summed) in
+    ms, plus peak RSS in KB."""
+    proc = start(mode, "-X", "importtime")
+    totals = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        top = name.strip().split(".")[0]
+        totals[top] = totals.get(top, 0) + int(own) / 1000
+    return totals, int(proc.stdout.split()[-1])
+
+
+def main():
+    for mode in MODES:
+        totals, rss = import_times(mode)
+        print(f"\n{mode}: {sum(totals.values()):.0f} ms importing, {rss / 1024:.1f} MB peak RSS")
+        for name, ms in sorted(totals.items(), key=lambda item: -item[1])[:12]:
+            print(f"  {name:<24} {ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from flask import current_app
+
+from App.database import db
+from App.models import Item
+
+from .harness import benchmark
+
+
+@benchmark("GET /menu", rounds=50, params=["uncached", "fragment_cache"])
+def bench_menu(mode):
+    db.session.add_all(Item(name=f"Loaf {n}", price=5.0, description="Fresh daily", tags=["bread"])
+                       for n in range(200))
+    db.session.commit()
+    current_app.jinja_env.fragment_cache_enabled = mode == "fragment_cache"
+    client = current_app.test_client()
+
+    def run(i):
+        client.get("/menu")
+    return run
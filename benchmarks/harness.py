@@ -0,0 +1,103 @@
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import time
+from contextlib import contextmanager
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name -> (setup function, rounds)
+_registry = {}
+
+
+def benchmark(name, rounds=20, params=None):
+    """Register a benchmark case.
+
+    The decorated function does its (untimed) setup and returns a callable
+    taking the round number; only that callable is timed. With ``params``,
+    one case is registered per value as ``name[value]``.
+    """
+    def wrapper(fn):
+        if params is None:
+            _registry[name] = (fn, rounds)
+        else:
+            for value in params:
+                _registry[f"{name}[{value}]"] = (lambda v=value: fn(v), rounds)
+        return fn
+    return wrapper
+
+
+@contextmanager
+def fresh_app():
+    """In-memory app with empty tables, torn down after the case."""
+    from App.main import create_app
+    from App.database import db
+
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    try:
+        yield app
+    finally:
+        db.session.remove()
+        db.drop_all()
+        ctx.pop()
+
+
+def run_case(setup, rounds):
+    target = setup()
+    target(0)  # warm-up, not recorded
+    timings = []
+    for i in range(1, rounds + 1):
+        start = time.perf_counter()
+        target(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "rounds": rounds,
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+    }
+
+
+def run(pattern="*"):
+    results = {}
+    for name, (setup, rounds) in _registry.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        with fresh_app():
+            results[name] = run_case(setup, rounds)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    merged = load_baseline(path)
+    merged.update(results)
+    with open(path, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": dict(sorted(merged.items())),
+        }, f, indent=2)
+        f.write("\n")
+
+
+def compare(results, baseline, tolerance):
+    """Return the names whose median regressed by more than ``tolerance``
+    (0.5 == 50% slower) against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base and result["median_ms"] > base["median_ms"] * (1 + tolerance):
+            regressions.append(name)
+    return regressions
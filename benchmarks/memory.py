@@ -0,0 +1,116 @@
+"""Per-worker memory of a preforked server, with and without preloading.
+
+Forks workers the way gunicorn does, has each one serve a few requests, and
+reports their USS (memory only that worker holds) and PSS (its share of
+everything it maps) from /proc/<pid>/smaps_rollup. Linux only.
+
+    python -m benchmarks.memory
+    python -m benchmarks.memory --workers 8
+
+Modes:
+  isolated        each worker imports the app after fork (preload_app = False)
+  preload         the master imports the app, workers inherit it
+  preload+freeze  as preload, with gc.freeze() before forking (gunicorn_config.py)
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ("isolated", "preload", "preload+freeze")
+
+# Pages that pull in templates, the ORM and the JSON provider
+PATHS = ("/", "/health", "/streets", "/areas", "/menu")
+
+
+def memory(pid):
+    """USS and PSS of a process in KB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"uss": fields["Private_Clean"] + fields["Private_Dirty"], "pss": fields["Pss"]}
+
+
+def serve(app):
+    from App.database import db, dispose_engines
+
+    dispose_engines(app)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    for _ in range(3):
+        for path in PATHS:
+            client.get(path)
+    # A worker's collector eventually walks every tracked object
+    gc.collect()
+
+
+def measure(mode, workers):
+    """Fork the workers for one mode in this process and return their memory."""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    os.environ["FLASK_SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    if mode != "isolated":
+        from wsgi import app
+        if mode == "preload+freeze":
+            gc.collect()
+            gc.freeze()
+
+    ready_r, ready_w = os.pipe()
+    done_r, done_w = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(done_w)
+            if mode == "isolated":
+                from wsgi import app
+            serve(app)
+            os.write(ready_w, b".")
+            os.read(done_r, 1)  # hold still until the parent has measured
+            os._exit(0)
+        pids.append(pid)
+    os.close(ready_w)
+    for _ in range(workers):
+        os.read(ready_r, 1)
+    results = [memory(pid) for pid in pids]
+    os.close(done_w)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.workers)))
+        return 0
+
+    print(f"{'Mode':<16} {'USS/worker MB':>14} {'PSS/worker MB':>14} {'PSS total MB':>13}")
+    print("-" * 60)
+    for mode in MODES:
+        # Each mode needs an interpreter that has not imported the app yet
+        out = subprocess.run([sys.executable, "-m", "benchmarks.memory", "--mode", mode,
+                              "--workers", str(args.workers)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        results = json.loads(out.splitlines()[-1])
+        uss = sum(r["uss"] for r in results) / len(results) / 1024
+        pss = sum(r["pss"] for r in results) / len(results) / 1024
+        print(f"{mode:<16} {uss:>14.1f} {pss:>14.1f} {pss * len(results):>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
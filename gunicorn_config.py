@@ -1,19 +1,56 @@
 # gunicorn_config.py
+import gc
 import multiprocessing
+import os
 
 # The socket to bind.
 # "0.0.0.0" to bind to all interfaces. 8000 is the port number.
 bind = "0.0.0.0:8080"
 
 # The number of worker processes for handling requests.
-workers = 4
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
 
 # Use the 'gevent' worker type for async performance.
 worker_class = 'gevent'
 
+# Import the app once in the master so workers share its pages copy-on-write
+# instead of each importing Flask, SQLAlchemy, models and templates again.
+preload_app = True
+
+if worker_class == 'gevent' and preload_app:
+    # The app is now imported before gunicorn's gevent worker would patch,
+    # so patch here, before anything creates sockets, threads or locks.
+    from gevent import monkey
+    monkey.patch_all()
+
 # Log level
 loglevel = 'info'
 
 # Where to log to
 accesslog = '-'  # '-' means log to stdout
-errorlog = '-'  # '-' means log to stderr
\ No newline at end of file
+errorlog = '-'  # '-' means log to stderr
+
+
+def pre_fork(server, worker):
+    # Move everything the master has built into the permanent generation.
+    # Collections in the workers then skip those objects and never write to
+    # (and so copy) the shared pages they live on.
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Pools must not be shared across processes; each worker opens its own.
+    from App.database import dispose_engines
+    from App.events import get_bus
+    app = server.app.wsgi()
+    dispose_engines(app)
+
+    # Let psycopg2 yield to other greenlets while waiting on Postgres,
+    # otherwise one slow query blocks every request on the worker.
+    if worker_class == 'gevent':
+        from App.database import patch_psycopg2_for_gevent
+        patch_psycopg2_for_gevent()
+
+    # Each worker listens for the other workers' events on its own connection
+    get_bus(app).start()
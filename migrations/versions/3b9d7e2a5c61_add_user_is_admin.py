@@ -0,0 +1,27 @@
+"""add admin flag to users
+
+Revision ID: 3b9d7e2a5c61
+Revises: 9a2e6c4b7d15
+Create Date: 2026-10-20 14:21:06.538104
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9d7e2a5c61'
+down_revision = '9a2e6c4b7d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nobody is an admin until created with ``flask user create_admin``
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_admin', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('is_admin')
@@ -0,0 +1,24 @@
+"""index change_log.created_at for the sync rescan window
+
+Revision ID: 4e8b2d6f1a93
+Revises: b3f7c1d52e89
+Create Date: 2026-10-20 10:12:37.408215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8b2d6f1a93'
+down_revision = 'b3f7c1d52e89'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_change_log_created_at', 'change_log', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_change_log_created_at', table_name='change_log')
@@ -0,0 +1,34 @@
+"""add change log for delta sync
+
+Revision ID: 5c1f0e7a9b2d
+Revises: ae418cf492c4
+Create Date: 2026-10-19 10:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1f0e7a9b2d'
+down_revision = 'ae418cf492c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('rowId', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.Column('driverId', sa.Integer(), nullable=True),
+    sa.Column('residentId', sa.Integer(), nullable=True),
+    sa.Column('streetId', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('change_log')
@@ -0,0 +1,41 @@
+"""add idempotency keys and one stop per resident per drive
+
+Revision ID: 8d3a41c6e2f7
+Revises: 5c1f0e7a9b2d
+Create Date: 2026-10-19 14:05:12.503918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3a41c6e2f7'
+down_revision = '5c1f0e7a9b2d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('idempotency_key',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('residentId', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['residentId'], ['resident.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_idempotency_key_resident_key', 'idempotency_key', ['residentId', 'key'], unique=True)
+    # Keep the oldest of any duplicate stops the old check-then-insert let through
+    op.execute(
+        'DELETE FROM stop WHERE id NOT IN '
+        '(SELECT MIN(id) FROM stop GROUP BY "driveId", "residentId")'
+    )
+    op.create_index('uq_stop_drive_resident', 'stop', ['driveId', 'residentId'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_stop_drive_resident', table_name='stop')
+    op.drop_index('uq_idempotency_key_resident_key', table_name='idempotency_key')
+    op.drop_table('idempotency_key')
@@ -0,0 +1,26 @@
+"""add request hash to idempotency keys
+
+Revision ID: 9a2e6c4b7d15
+Revises: 4e8b2d6f1a93
+Create Date: 2026-10-20 11:03:52.117846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a2e6c4b7d15'
+down_revision = '4e8b2d6f1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('idempotency_key', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('requestHash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('idempotency_key', schema=None) as batch_op:
+        batch_op.drop_column('requestHash')
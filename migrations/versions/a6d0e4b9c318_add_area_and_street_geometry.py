@@ -0,0 +1,32 @@
+"""add area boundaries and street paths
+
+Revision ID: a6d0e4b9c318
+Revises: f1c3a8e6d274
+Create Date: 2026-10-19 23:12:48.905731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d0e4b9c318'
+down_revision = 'f1c3a8e6d274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('boundary', sa.JSON(), nullable=True))
+
+    with op.batch_alter_table('street', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('path', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('street', schema=None) as batch_op:
+        batch_op.drop_column('path')
+
+    with op.batch_alter_table('area', schema=None) as batch_op:
+        batch_op.drop_column('boundary')
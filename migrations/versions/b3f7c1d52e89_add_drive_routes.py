@@ -0,0 +1,38 @@
+"""add multi-street drive routes
+
+Revision ID: b3f7c1d52e89
+Revises: a6d0e4b9c318
+Create Date: 2026-10-19 23:48:02.574119
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f7c1d52e89'
+down_revision = 'a6d0e4b9c318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('drive_street',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('driveId', sa.Integer(), nullable=False),
+    sa.Column('streetId', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['driveId'], ['drive.id'], ),
+    sa.ForeignKeyConstraint(['streetId'], ['street.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_drive_street_drive_street', 'drive_street', ['driveId', 'streetId'], unique=True)
+    op.create_index('ix_drive_street_street_drive', 'drive_street', ['streetId', 'driveId'], unique=False)
+    # Every existing drive becomes a one-street route
+    op.execute('INSERT INTO drive_street ("driveId", "streetId", position) SELECT id, "streetId", 0 FROM drive')
+
+
+def downgrade():
+    op.drop_index('ix_drive_street_street_drive', table_name='drive_street')
+    op.drop_index('uq_drive_street_drive_street', table_name='drive_street')
+    op.drop_table('drive_street')
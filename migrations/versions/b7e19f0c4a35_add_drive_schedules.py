@@ -0,0 +1,42 @@
+"""add weekly drive schedules
+
+Revision ID: b7e19f0c4a35
+Revises: 8d3a41c6e2f7
+Create Date: 2026-10-19 16:40:03.771265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e19f0c4a35'
+down_revision = '8d3a41c6e2f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('drive_schedule',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('driverId', sa.Integer(), nullable=False),
+    sa.Column('areaId', sa.Integer(), nullable=False),
+    sa.Column('streetId', sa.Integer(), nullable=False),
+    sa.Column('weekdays', sa.String(length=20), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('time', sa.Time(), nullable=False),
+    sa.Column('menu', sa.String(length=200), nullable=True),
+    sa.Column('eta', sa.Time(), nullable=True),
+    sa.Column('starts_on', sa.Date(), nullable=False),
+    sa.Column('until', sa.Date(), nullable=True),
+    sa.Column('active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['areaId'], ['area.id'], ),
+    sa.ForeignKeyConstraint(['driverId'], ['driver.id'], ),
+    sa.ForeignKeyConstraint(['streetId'], ['street.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('drive_schedule')
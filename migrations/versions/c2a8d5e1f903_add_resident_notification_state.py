@@ -0,0 +1,26 @@
+"""add notification rate limit and digest state to residents
+
+Revision ID: c2a8d5e1f903
+Revises: b7e19f0c4a35
+Create Date: 2026-10-19 18:22:47.090135
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2a8d5e1f903'
+down_revision = 'b7e19f0c4a35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('resident', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notification_state', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('resident', schema=None) as batch_op:
+        batch_op.drop_column('notification_state')
@@ -0,0 +1,52 @@
+"""add per-drive stock and item reservations
+
+Revision ID: d41f6a2b8c57
+Revises: c2a8d5e1f903
+Create Date: 2026-10-19 20:03:15.448720
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f6a2b8c57'
+down_revision = 'c2a8d5e1f903'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('drive_stock',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('driveId', sa.Integer(), nullable=False),
+    sa.Column('itemId', sa.Integer(), nullable=False),
+    sa.Column('loaded', sa.Integer(), nullable=False),
+    sa.Column('available', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['driveId'], ['drive.id'], ),
+    sa.ForeignKeyConstraint(['itemId'], ['item.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_drive_stock_drive_item', 'drive_stock', ['driveId', 'itemId'], unique=True)
+    op.create_table('reservation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('driveId', sa.Integer(), nullable=False),
+    sa.Column('itemId', sa.Integer(), nullable=False),
+    sa.Column('residentId', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['driveId'], ['drive.id'], ),
+    sa.ForeignKeyConstraint(['itemId'], ['item.id'], ),
+    sa.ForeignKeyConstraint(['residentId'], ['resident.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reservation_driveId'), 'reservation', ['driveId'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_reservation_driveId'), table_name='reservation')
+    op.drop_table('reservation')
+    op.drop_index('uq_drive_stock_drive_item', table_name='drive_stock')
+    op.drop_table('drive_stock')
@@ -0,0 +1,35 @@
+"""add demand forecast models
+
+Revision ID: e5b2c7d9a106
+Revises: d41f6a2b8c57
+Create Date: 2026-10-19 21:37:51.260384
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b2c7d9a106'
+down_revision = 'd41f6a2b8c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('demand_model',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('streetId', sa.Integer(), nullable=False),
+    sa.Column('weekday', sa.SmallInteger(), nullable=False),
+    sa.Column('itemId', sa.Integer(), nullable=False),
+    sa.Column('level', sa.Float(), nullable=False),
+    sa.Column('observations', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_demand_model_street_weekday_item', 'demand_model', ['streetId', 'weekday', 'itemId'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_demand_model_street_weekday_item', table_name='demand_model')
+    op.drop_table('demand_model')
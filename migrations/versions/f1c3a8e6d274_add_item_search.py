@@ -0,0 +1,94 @@
+"""add item search index and normalized item tags
+
+Revision ID: f1c3a8e6d274
+Revises: e5b2c7d9a106
+Create Date: 2026-10-19 22:41:07.316502
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c3a8e6d274'
+down_revision = 'e5b2c7d9a106'
+branch_labels = None
+depends_on = None
+
+POSTGRES_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_item_search ON item USING gin ("
+    "(setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')))",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS item_search USING fts5("
+    "name, description, content='item', content_rowid='id', "
+    "prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS item_search_insert AFTER INSERT ON item BEGIN "
+    "INSERT INTO item_search(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS item_search_delete AFTER DELETE ON item BEGIN "
+    "INSERT INTO item_search(item_search, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS item_search_update AFTER UPDATE ON item BEGIN "
+    "INSERT INTO item_search(item_search, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO item_search(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+]
+
+
+def _tags(tags):
+    if isinstance(tags, str):
+        try:
+            tags = json.loads(tags)
+        except ValueError:
+            pass
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    normalized = []
+    for tag in tags or []:
+        tag = str(tag).strip().lower()[:50]
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
+
+
+def upgrade():
+    item_tag = op.create_table('item_tag',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('itemId', sa.Integer(), nullable=False),
+    sa.Column('tag', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['itemId'], ['item.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_item_tag_tag_item', 'item_tag', ['tag', 'itemId'], unique=True)
+
+    bind = op.get_bind()
+    rows = []
+    for item_id, tags in bind.execute(sa.text("SELECT id, tags FROM item")):
+        rows += [{'itemId': item_id, 'tag': tag} for tag in _tags(tags)]
+    if rows:
+        op.bulk_insert(item_tag, rows)
+
+    if bind.dialect.name == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+    elif bind.dialect.name == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO item_search(item_search) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_item_search")
+    elif bind.dialect.name == 'sqlite':
+        for trigger in ('item_search_insert', 'item_search_delete', 'item_search_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS item_search")
+    op.drop_index('uq_item_tag_tag_item', table_name='item_tag')
+    op.drop_table('item_tag')